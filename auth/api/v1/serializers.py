@@ -1,3 +1,4 @@
+import functools
 import logging
 from typing import Any, Dict
 
@@ -5,14 +6,18 @@ from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.settings import api_settings
 
-from django.contrib.auth.models import update_last_login
-from django.db import transaction
+from django.contrib.auth import authenticate
+from django.db import router, transaction
+from django.db.models.functions import Lower
 
-from rest_framework import serializers
+from rest_framework import exceptions, serializers
 
+from auth.utils.refresh import refresh_grace
+from auth.utils.tokens import RefreshToken
 from auth.utils.validator import password_validator
 from user.api.v1.serializers import UserSerializer
 from user.models import User
+from user.utils.last_login import last_login_recorder
 
 logger = logging.getLogger(__name__)
 
@@ -37,9 +42,26 @@ class RegisterUserSerializer(UserSerializer):
         fields = UserSerializer.Meta.fields + ["password"]
         read_only_fields = ["is_superuser", "is_staff", "id"]
 
+    def validate_email(self, email: str) -> str:
+        """Emails are unique per tenant, ignoring case (deleted users included)."""
+        exists = (
+            User._default_manager.alias(email_lower=Lower("email"))
+            .filter(tenant=self.context.get("tenant"), email_lower=email.lower())
+            .exists()
+        )
+        if exists:
+            raise serializers.ValidationError("user with this email already exists.")
+        return email
+
     def create(self, validated_data: Dict[str, Any]) -> User:
-        """Create a new user with email login."""
+        """
+        Create a new user with email login.
+
+        `save(encoded_password=...)` stores a password hashed beforehand,
+        e.g. by the async register view, instead of hashing it here.
+        """
         password = validated_data.pop("password")
+        encoded_password = validated_data.pop("encoded_password", None)
         validated_data["tenant"] = self.context.get("tenant")
 
         # Set username automatically (since it's still required by AbstractUser)
@@ -47,9 +69,12 @@ class RegisterUserSerializer(UserSerializer):
         if "username" not in validated_data or not validated_data["username"]:
             validated_data["username"] = email.split("@")[0]
 
-        with transaction.atomic():
+        with transaction.atomic(using=router.db_for_write(User)):
             user = User(**validated_data)
-            user.set_password(password)
+            if encoded_password:
+                user.password = encoded_password
+            else:
+                user.set_password(password)
             user.save()
             return user
 
@@ -57,33 +82,55 @@ class RegisterUserSerializer(UserSerializer):
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom login serializer that uses email for authentication."""
 
+    token_class = RefreshToken
+
     # Override fields for clarity
     email = serializers.EmailField(required=True)
     password = serializers.CharField(write_only=True)
 
     def validate(self, attrs: Dict[str, Any]) -> Dict:
         """Validate and return token pair + user data."""
-        # Map `email` → `username` because SimpleJWT expects USERNAME_FIELD
-        tenant = self.context.get("tenant")
-        attrs["username"] = attrs.get("email")
+        # The tenant is part of the credentials, so users of other tenants
+        # are rejected by the backend before any password hashing.
+        user = authenticate(
+            self.context.get("request"),
+            email=attrs["email"],
+            password=attrs["password"],
+            tenant=self.context.get("tenant"),
+        )
+        return self.get_token_data(user)
+
+    def get_token_data(self, user) -> Dict:
+        """Return the token pair + user data for an authenticated `user`."""
+        self.user = user
+        if not api_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise exceptions.AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
 
-        data = super().validate(attrs)
+        refresh = self.get_token(self.user)
+        data = {"refresh": str(refresh), "access": str(refresh.access_token)}
         data["user"] = UserSerializer(self.user).data
 
-        # Enforce that the user belongs to this tenant
-        if self.user.tenant != tenant:
-            raise serializers.ValidationError(
-                {"detail": "User does not belong to this tenant."}
-            )
-
-        # Optionally update last login timestamp
+        # Optionally update last login timestamp, buffered in Redis
         if api_settings.UPDATE_LAST_LOGIN:
-            update_last_login(None, self.user)
+            last_login_recorder.record(self.user)
 
         return data
 
 
 class CustomCookieTokenRefreshSerializer(CookieTokenRefreshSerializer):
-    """Custom refresh token serializer."""
+    """
+    Custom refresh token serializer.
+
+    Concurrent refreshes of the same token get the same new pair, see
+    `RefreshGrace`.
+    """
+
+    token_class = RefreshToken
 
     is_http_cookie_only = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        token = self.extract_refresh_token()
+        return refresh_grace.rotate(token, functools.partial(super().validate, attrs))
@@ -1,10 +1,12 @@
-from dj_rest_auth.jwt_auth import CookieTokenRefreshSerializer
+from asgiref.sync import sync_to_async
 from rest_framework_simplejwt.tokens import TokenError
 from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
 
+from django.core.exceptions import PermissionDenied
+
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from auth.api.v1.serializers import (
@@ -12,20 +14,30 @@ from auth.api.v1.serializers import (
     CustomTokenObtainPairSerializer,
     RegisterUserSerializer,
 )
+from auth.backends import TenantModelBackend
+from auth.utils.hashing import password_hashing_pool
 from auth.utils.jwt import (
+    clear_jwt_cookies,
     logout_and_revoke_tokens,
     refresh_and_set_jwt_cookies,
     set_cookies,
 )
+from base.api.v1.viewsets import AsyncAPIView
+from user.utils.token_version import revoke_user_tokens
+
 
+class RegisterView(AsyncAPIView):
+    """
+    Registration endpoint.
 
-class RegisterView(GenericAPIView):
-    """Registration endpoint"""
+    Async, so the password is hashed in `password_hashing_pool` rather than
+    on the thread shared by all sync views of the worker.
+    """
 
-    permission_classes = [AllowAny]
     serializer_class = RegisterUserSerializer
+    throttle_scope = "auth"
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         """Handle registration request."""
         tenant = getattr(request, "tenant", None)
         if not tenant:
@@ -34,22 +46,32 @@ class RegisterView(GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer = self.get_serializer(data=request.data, context={"tenant": tenant})
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        serializer = self.serializer_class(
+            data=request.data, context={"tenant": tenant}
+        )
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        encoded_password = await password_hashing_pool.make_password(
+            serializer.validated_data["password"]
+        )
+        await sync_to_async(serializer.save)(encoded_password=encoded_password)
         return Response(
             {"user": serializer.data, "message": "User registered successfully."},
             status=status.HTTP_201_CREATED,
         )
 
 
-class LoginView(GenericAPIView):
-    """Login endpoint"""
+class LoginView(AsyncAPIView):
+    """
+    Login endpoint.
+
+    Async, so the password is verified in `password_hashing_pool` rather
+    than on the thread shared by all sync views of the worker.
+    """
 
-    permission_classes = [AllowAny]
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_scope = "auth"
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         """Handle login request."""
         tenant = getattr(request, "tenant", None)
         if not tenant:
@@ -58,15 +80,28 @@ class LoginView(GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        serializer = self.get_serializer(data=request.data, context={"tenant": tenant})
-        serializer.is_valid(raise_exception=True)
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request, "tenant": tenant}
+        )
+        # Field validation only, the credentials are checked below
+        attrs = serializer.to_internal_value(request.data)
+        try:
+            user = await TenantModelBackend().aauthenticate(
+                request,
+                email=attrs["email"],
+                password=attrs["password"],
+                tenant=tenant,
+            )
+        except PermissionDenied:
+            user = None
+        data = await sync_to_async(serializer.get_token_data)(user)
         is_http_cookie_only = request.data.get("is_http_cookie_only", False)
 
         # Set both access and refresh tokens in cookies
         return set_cookies(
-            response=Response(serializer.validated_data),
-            access_token=serializer.validated_data["access"],
-            refresh_token=serializer.validated_data["refresh"],
+            response=Response(data),
+            access_token=data["access"],
+            refresh_token=data["refresh"],
             is_http_cookie_only=is_http_cookie_only,
         )
 
@@ -74,7 +109,7 @@ class LoginView(GenericAPIView):
 class TokenRefreshView(BaseTokenRefreshView):
     """Custom Token Refresh View to handle JWT token refresh."""
 
-    serializer_class = CookieTokenRefreshSerializer
+    serializer_class = CustomCookieTokenRefreshSerializer
 
     def finalize_response(self, request, response, *args, **kwargs):
         """Set the access token in the cookie."""
@@ -138,3 +173,23 @@ class LogoutView(GenericAPIView):
 
         except TokenError as error:
             return Response({"detail": f"{error}"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class LogoutAllView(GenericAPIView):
+    """
+    An endpoint for user to logout of every session at once, by revoking
+    all the tokens issued to them so far.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """Handle logout everywhere request."""
+        revoke_user_tokens(request.user)
+        response = Response(
+            {"detail": "Successfully logged out of all sessions"},
+            status=status.HTTP_200_OK,
+        )
+        if request.data.get("is_http_cookie_only", False):
+            clear_jwt_cookies(response)
+        return response
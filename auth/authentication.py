@@ -0,0 +1,32 @@
+from dj_rest_auth.jwt_auth import JWTCookieAuthentication
+from rest_framework_simplejwt.tokens import Token
+
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+
+from auth.utils.tokens import VERSION_CLAIM, TokenUser, is_revoked
+
+
+class ClaimsJWTAuthentication(JWTCookieAuthentication):
+    """
+    JWT (header or cookie) authentication that returns a `TokenUser` built
+    from the token's claims instead of loading the `User` row.
+
+    The only lookups per request are the cached `token_version` of the
+    user, bumped on password changes, deactivation and changes to the
+    embedded claims, and of their tenant; bumping either revokes every
+    token issued before. Tokens without a version claim (issued before it
+    existed) load the user as before.
+    """
+
+    def get_user(self, validated_token: Token):
+        if VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        user = TokenUser(validated_token)
+        if is_revoked(validated_token):
+            raise exceptions.AuthenticationFailed(
+                _("Token has been revoked."), code="token_revoked"
+            )
+        return user
@@ -0,0 +1,83 @@
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from auth.utils.hashing import password_hashing_pool
+
+UserModel = get_user_model()
+
+
+class TenantModelBackend(ModelBackend):
+    """
+    Authenticate a user of one tenant by email and password.
+
+    Only handles `authenticate(..., tenant=tenant)` calls (the login API);
+    anything else, like the admin login, falls through to `ModelBackend`.
+    The user is fetched with one query on `(lower(email), tenant)`, so an
+    account of another tenant is never loaded, let alone hashed against.
+    Unknown emails still run one (dummy) hash, so the response time
+    doesn't tell whether an email is registered elsewhere.
+
+    A failed tenant login raises `PermissionDenied`, which stops Django
+    from trying the next backend with the global email lookup.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if "tenant" not in kwargs:
+            return None
+
+        tenant = kwargs.pop("tenant")
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            raise PermissionDenied
+
+        user = self.get_tenant_user(tenant, username)
+        if user is None:
+            # Same cost as a wrong password, see ModelBackend.authenticate()
+            UserModel().set_password(password)
+            raise PermissionDenied
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        raise PermissionDenied
+
+    async def aauthenticate(self, request, email=None, password=None, tenant=None):
+        """
+        Async variant of the tenant login for async views.
+
+        The user is fetched in a thread and the password is hashed in
+        `password_hashing_pool`, so neither blocks the event loop. Raises
+        `PermissionDenied` on failure and `HashingPoolSaturated` when too
+        many logins are being hashed already. Unlike `authenticate()`, it
+        doesn't send `user_login_failed`.
+        """
+        if email is None or password is None:
+            raise PermissionDenied
+
+        user = await sync_to_async(self.get_tenant_user)(tenant, email)
+        if user is None:
+            await password_hashing_pool.make_password(password)
+            raise PermissionDenied
+
+        valid, must_update = await password_hashing_pool.verify_password(
+            password, user.password
+        )
+        if not valid or not self.user_can_authenticate(user):
+            raise PermissionDenied
+
+        # Upgrade the hash to the preferred hasher, like check_password()
+        if must_update:
+            encoded = await password_hashing_pool.make_password(password)
+            await sync_to_async(user.save_rehashed_password)(encoded)
+        return user
+
+    @staticmethod
+    def get_tenant_user(tenant, email: str):
+        """Return the live user of `tenant` with `email`, ignoring case."""
+        try:
+            return UserModel._default_manager.get_for_login(tenant, email)
+        except UserModel.DoesNotExist:
+            return None
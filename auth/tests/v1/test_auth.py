@@ -106,6 +106,31 @@ def test_register_user_success(api_client, endpoints, tenant):
     }
 
 
+@pytest.mark.django_db
+def test_register_email_is_unique_per_tenant(api_client, endpoints, tenant):
+    """An email taken in one tenant, in any case, is free in the others."""
+    UserFactory(email="test@test.com", tenant=tenant)
+    other_tenant = TenantFactory()
+    payload = {"email": "Test@Test.com", "password": "Testing@123"}
+
+    response = api_client.post(
+        endpoints["register"],
+        payload,
+        format="json",
+        HTTP_HOST=f"{tenant.subdomain}.localhost",
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data == {"email": ["user with this email already exists."]}
+
+    response = api_client.post(
+        endpoints["register"],
+        payload,
+        format="json",
+        HTTP_HOST=f"{other_tenant.subdomain}.localhost",
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+
 @pytest.mark.django_db
 def test_login_user_fail_without_subdomain(api_client, endpoints):
     """
@@ -160,9 +185,12 @@ def test_login_user_does_not_belong_to_tenant(api_client, endpoints):
     except AttributeError:
         response_data = json.loads(response.content)
 
-    # The login should fail because the user does not belong to tenant_2
-    assert response.status_code == status.HTTP_400_BAD_REQUEST
-    assert response_data == {"detail": ["User does not belong to this tenant."]}
+    # The login should fail because the user does not belong to tenant_2,
+    # without revealing that the email exists in another tenant
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response_data == {
+        "detail": "No active account found with the given credentials"
+    }
 
 
 @pytest.mark.django_db
@@ -0,0 +1,97 @@
+import pytest
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.urls import reverse
+
+from rest_framework import exceptions, status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from auth.authentication import ClaimsJWTAuthentication
+from auth.utils.tokens import RefreshToken, TokenUser
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory(), is_staff=True)
+
+
+def authenticate(token):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return ClaimsJWTAuthentication().authenticate(request)
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def test_token_user_comes_from_the_claims(self, user, django_assert_num_queries):
+        access = RefreshToken.for_user(user).access_token
+        authenticate(access)
+
+        # The version is cached after the first request
+        with django_assert_num_queries(0):
+            token_user, _ = authenticate(access)
+
+        assert isinstance(token_user, TokenUser)
+        assert token_user == user
+        assert token_user.tenant_id == user.tenant_id
+        assert token_user.user_type == user.user_type
+        assert token_user.is_staff is True
+        assert token_user.get_user() == user
+
+    def test_password_change_revokes_tokens(self, user):
+        refresh = RefreshToken.for_user(user)
+        authenticate(refresh.access_token)
+
+        user.set_password("Changed@123")
+        user.save(update_fields=["password"])
+
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticate(refresh.access_token)
+        with pytest.raises(TokenError):
+            RefreshToken(str(refresh))
+        assert authenticate(RefreshToken.for_user(user).access_token)
+
+    def test_deactivation_revokes_tokens(self, user):
+        access = RefreshToken.for_user(user).access_token
+        authenticate(access)
+
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticate(access)
+
+    def test_unrelated_changes_keep_tokens(self, user):
+        access = RefreshToken.for_user(user).access_token
+        version = user.token_version
+
+        user.first_name = "Renamed"
+        user.save()
+        user.save(update_fields=["last_login"])
+
+        assert User.objects.get(pk=user.pk).token_version == version
+        assert authenticate(access)
+
+    def test_tokens_without_claims_load_the_user(self, user):
+        access = AccessToken.for_user(user)
+
+        authenticated, _ = authenticate(access)
+
+        assert isinstance(authenticated, User)
+
+    def test_authenticated_endpoint(self, user):
+        client = APIClient()
+        refresh = RefreshToken.for_user(user)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+
+        response = client.post(
+            reverse("logout-user"),
+            {"refresh": str(refresh)},
+            HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+        )
+
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,95 @@
+import pytest
+
+from django.contrib.auth import authenticate
+
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+PASSWORD = "Password123!"
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory(subdomain="acme")
+
+
+@pytest.fixture
+def other_tenant():
+    return TenantFactory(subdomain="globex")
+
+
+@pytest.fixture
+def user(tenant):
+    return UserFactory(email="user@acme.com", password=PASSWORD, tenant=tenant)
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Record which users had a password checked or hashed."""
+    calls = []
+    check_password = User.check_password
+    set_password = User.set_password
+
+    def record_check(self, raw_password):
+        calls.append(("check", self.pk))
+        return check_password(self, raw_password)
+
+    def record_set(self, raw_password):
+        calls.append(("set", self.pk))
+        return set_password(self, raw_password)
+
+    monkeypatch.setattr(User, "check_password", record_check)
+    monkeypatch.setattr(User, "set_password", record_set)
+    return calls
+
+
+@pytest.mark.django_db
+class TestTenantModelBackend:
+
+    def test_authenticates_user_of_tenant(self, tenant, user):
+        result = authenticate(email="User@ACME.com", password=PASSWORD, tenant=tenant)
+
+        assert result == user
+
+    def test_same_email_in_another_tenant(self, tenant, other_tenant, user):
+        other = UserFactory(email=user.email, password=PASSWORD, tenant=other_tenant)
+
+        assert authenticate(email=user.email, password=PASSWORD, tenant=tenant) == user
+        credentials = {"email": user.email, "password": PASSWORD}
+        assert authenticate(tenant=other_tenant, **credentials) == other
+
+    def test_wrong_password(self, tenant, user):
+        assert authenticate(email=user.email, password="wrong", tenant=tenant) is None
+
+    def test_wrong_tenant_is_rejected_before_hashing(
+        self, other_tenant, user, hashes, django_assert_num_queries
+    ):
+        with django_assert_num_queries(1):
+            result = authenticate(
+                email=user.email, password=PASSWORD, tenant=other_tenant
+            )
+
+        assert result is None
+        # Only the dummy hash on a fresh instance, never the user's password
+        assert hashes == [("set", None)]
+
+    def test_wrong_tenant_does_not_fall_back_to_model_backend(self, other_tenant, user):
+        credentials = {"username": user.email, "password": PASSWORD}
+
+        assert authenticate(tenant=other_tenant, **credentials) is None
+
+    def test_soft_deleted_user_is_rejected(self, tenant, user):
+        user.delete()
+
+        assert authenticate(email=user.email, password=PASSWORD, tenant=tenant) is None
+
+    def test_inactive_user_is_rejected(self, tenant, user):
+        user.is_active = False
+        user.save()
+
+        assert authenticate(email=user.email, password=PASSWORD, tenant=tenant) is None
+
+    def test_calls_without_tenant_use_model_backend(self, user):
+        # e.g. the admin login form
+        assert authenticate(username=user.email, password=PASSWORD) == user
@@ -0,0 +1,204 @@
+from datetime import timedelta
+
+import pytest
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.utils.blacklist import DatabaseBlacklist, RedisBlacklist
+from auth.utils.tokens import RefreshToken
+from tenant.context import tenant_context
+from tenant.tests.v1.factories import TenantFactory
+from user.tasks import purge_expired_tokens
+from user.tests.v1.factories import UserFactory
+
+REDIS_BACKEND = "auth.utils.blacklist.RedisBlacklist"
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory())
+
+
+@pytest.fixture
+def redis_blacklist(redis_cache, settings):
+    settings.JWT_BLACKLIST_BACKEND = REDIS_BACKEND
+    return RedisBlacklist()
+
+
+@pytest.mark.django_db
+class TestDatabaseBlacklist:
+
+    def test_issued_token_is_outstanding(self, user):
+        token = RefreshToken.for_user(user)
+
+        assert OutstandingToken.objects.filter(jti=token["jti"], user=user).exists()
+
+    def test_blacklisted_token_is_rejected(self, user):
+        token = RefreshToken.for_user(user)
+        token.blacklist()
+
+        assert BlacklistedToken.objects.filter(token__jti=token["jti"]).exists()
+        with pytest.raises(TokenError):
+            RefreshToken(str(token))
+
+
+@pytest.mark.django_db
+class TestRedisBlacklist:
+
+    def test_issuing_writes_nothing(self, redis_blacklist, user):
+        RefreshToken.for_user(user)
+
+        assert not OutstandingToken.objects.exists()
+
+    def test_blacklisted_token_expires_with_the_token(
+        self, redis_blacklist, redis_cache, user, django_assert_num_queries
+    ):
+        token = RefreshToken.for_user(user)
+        with django_assert_num_queries(0):
+            token.blacklist()
+
+        remaining = token["exp"] - int(timezone.now().timestamp())
+        assert remaining - 1 <= redis_cache.ttl(redis_blacklist.key(token["jti"]))
+        assert redis_cache.ttl(redis_blacklist.key(token["jti"])) <= remaining
+        with pytest.raises(TokenError):
+            RefreshToken(str(token))
+
+    def test_expired_tokens_are_not_stored(self, redis_blacklist, redis_cache):
+        past = int((timezone.now() - timedelta(minutes=1)).timestamp())
+
+        assert redis_blacklist.add_many([("expired", past)]) == 0
+        assert not redis_cache.exists(redis_blacklist.key("expired"))
+
+    def test_rotated_token_cannot_be_reused(self, redis_blacklist, user, settings):
+        # Past the grace period in which a reuse gets the same new pair
+        settings.REFRESH_GRACE_SECONDS = 0
+        client = APIClient()
+        host = f"{user.tenant.subdomain}.localhost"
+        refresh = str(RefreshToken.for_user(user))
+
+        response = client.post(
+            reverse("refresh-token"), {"refresh": refresh}, HTTP_HOST=host
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["refresh"] != refresh
+
+        response = client.post(
+            reverse("refresh-token"), {"refresh": refresh}, HTTP_HOST=host
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_migration_copies_tokens_still_valid(self, redis_cache, user):
+        # Blacklisted while the database backend was active
+        valid = RefreshToken.for_user(user)
+        valid.blacklist()
+        expired = OutstandingToken.objects.create(
+            user=user,
+            jti="expired",
+            token="expired",
+            expires_at=timezone.now() - timedelta(minutes=1),
+        )
+        BlacklistedToken.objects.create(token=expired)
+
+        call_command("migrate_token_blacklist")
+
+        blacklist = RedisBlacklist()
+        assert blacklist.is_blacklisted(valid)
+        assert not redis_cache.exists(blacklist.key("expired"))
+
+
+@pytest.mark.django_db
+class TestPurgeExpiredTokens:
+
+    @staticmethod
+    def create_tokens(user, count, expires_at, blacklisted=False):
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user, jti=f"{expires_at}-{index}", token="x", expires_at=expires_at
+            )
+            for index in range(count)
+        )
+        if blacklisted:
+            BlacklistedToken.objects.bulk_create(
+                BlacklistedToken(token=token) for token in tokens
+            )
+        return tokens
+
+    def test_expired_tokens_are_deleted_in_batches(self, user, monkeypatch):
+        now = timezone.now()
+        self.create_tokens(user, 3, now - timedelta(days=1))
+        self.create_tokens(user, 2, now - timedelta(hours=1), blacklisted=True)
+        valid = self.create_tokens(user, 2, now + timedelta(days=1), blacklisted=True)
+        pauses = []
+        monkeypatch.setattr("auth.utils.blacklist.time.sleep", pauses.append)
+
+        stats = DatabaseBlacklist.purge_expired(batch_size=2, pause=0.1)
+
+        assert stats["outstanding"] == 5
+        assert stats["blacklisted"] == 2
+        assert stats["batches"] == 3
+        assert pauses == [0.1, 0.1]
+        assert set(OutstandingToken.objects.all()) == set(valid)
+        assert BlacklistedToken.objects.count() == 2
+
+    def test_task_uses_the_configured_batches(self, user, settings):
+        settings.TOKEN_PURGE_BATCH_SIZE = 10
+        settings.TOKEN_PURGE_PAUSE = 0
+        self.create_tokens(user, 3, timezone.now() - timedelta(days=1))
+
+        stats = purge_expired_tokens()
+
+        assert stats["outstanding"] == 3
+        assert stats["batches"] == 1
+        assert not OutstandingToken.objects.exists()
+
+
+@pytest.mark.django_db(databases=["default", "shard"])
+def test_purge_expired_tokens_on_every_shard(settings):
+    settings.DATABASE_SHARDS = ["default", "shard"]
+    expired = timezone.now() - timedelta(days=1)
+    for shard in settings.DATABASE_SHARDS:
+        tenant = TenantFactory(shard=shard)
+        user = UserFactory.build(tenant=tenant)
+        user.save(using=shard)
+        OutstandingToken.objects.using(shard).create(
+            user=user, jti=shard, token="x", expires_at=expired
+        )
+
+    stats = DatabaseBlacklist.purge_expired(pause=0)
+
+    assert stats["outstanding"] == 2
+    assert not OutstandingToken.objects.using("default").exists()
+    assert not OutstandingToken.objects.using("shard").exists()
+
+
+@pytest.mark.django_db(databases=["default", "shard"])
+def test_tokens_sent_to_another_tenants_host_use_their_own_shard(settings):
+    settings.DATABASE_SHARDS = ["default", "shard"]
+    user = UserFactory.build(tenant=TenantFactory(shard="shard"))
+    user.save(using="shard")
+    # The tenant of the request's host, whose shard the routers would pick
+    host_tenant = TenantFactory(shard="default")
+
+    with tenant_context(host_tenant):
+        token = RefreshToken.for_user(user)
+        token.blacklist()
+
+        with pytest.raises(TokenError):
+            RefreshToken(str(token))
+
+    assert (
+        BlacklistedToken.objects.using("shard").filter(token__jti=token["jti"]).exists()
+    )
+    assert not OutstandingToken.objects.using("default").exists()
+    with tenant_context(user.tenant), pytest.raises(TokenError):
+        RefreshToken(str(token))
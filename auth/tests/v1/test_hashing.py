@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.utils.hashing import (
+    HashingPoolSaturated,
+    PasswordHashingPool,
+    password_hashing_pool,
+    verify_password,
+)
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+PASSWORD = "Password123!"
+ARGON2_FIRST = [
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+]
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory())
+
+
+def login(user, password=PASSWORD):
+    return APIClient().post(
+        reverse("login-user"),
+        {"email": user.email, "password": password},
+        format="json",
+        HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+    )
+
+
+class TestPasswordHashingPool:
+
+    def test_runs_outside_the_calling_thread(self):
+        pool = PasswordHashingPool(workers=1, max_pending=1)
+
+        thread = async_to_sync(pool.run)(threading.current_thread)
+
+        assert thread is not threading.current_thread()
+        assert thread.name.startswith("password-hashing")
+        assert pool.pending == 0
+        pool.shutdown()
+
+    def test_saturated_pool_fails_fast(self):
+        pool = PasswordHashingPool(workers=1, max_pending=0)
+
+        with pytest.raises(HashingPoolSaturated):
+            async_to_sync(pool.make_password)(PASSWORD)
+        assert pool.pending == 0
+
+    def test_verify_password(self):
+        encoded = make_password(PASSWORD)
+
+        assert verify_password(PASSWORD, encoded) == (True, False)
+        assert verify_password("wrong", encoded) == (False, False)
+        assert verify_password(PASSWORD, make_password(None)) == (False, False)
+
+
+@pytest.mark.django_db
+class TestAsyncLogin:
+
+    def test_saturated_pool_answers_503(self, user, monkeypatch):
+        monkeypatch.setattr(password_hashing_pool, "max_pending", 0)
+
+        response = login(user)
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response["Retry-After"] == "1"
+
+    def test_wrong_password_is_rejected(self, user):
+        response = login(user, password="Wrong123!")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_login_upgrades_the_hash(self, user, settings):
+        settings.PASSWORD_HASHERS = ARGON2_FIRST
+
+        response = login(user)
+
+        assert response.status_code == status.HTTP_200_OK
+        stored = User.objects.get(pk=user.pk)
+        assert stored.password.startswith("argon2")
+        # Same password, so tokens issued before stay valid
+        assert stored.token_version == user.token_version
+        assert login(user).status_code == status.HTTP_200_OK
+
+    def test_sync_login_upgrades_the_hash(self, user, settings):
+        settings.PASSWORD_HASHERS = ARGON2_FIRST
+
+        assert authenticate(
+            None, email=user.email, password=PASSWORD, tenant=user.tenant
+        )
+
+        stored = User.objects.get(pk=user.pk)
+        assert stored.password.startswith("argon2")
+        assert stored.token_version == user.token_version
@@ -0,0 +1,138 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken as HMACAccessToken
+
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from auth.utils.keys import get_token_backend
+from auth.utils.tokens import AccessToken, RefreshToken
+from tenant.tests.v1.factories import TenantFactory
+from user.tests.v1.factories import UserFactory
+
+
+def write_key(path, private_key, public_only=False):
+    if public_only:
+        pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    else:
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    path.write_bytes(pem)
+    return str(path)
+
+
+@pytest.fixture
+def rsa_key(tmp_path):
+    return write_key(
+        tmp_path / "rsa.pem",
+        rsa.generate_private_key(public_exponent=65537, key_size=2048),
+    )
+
+
+@pytest.fixture
+def ed25519_key(tmp_path):
+    return write_key(tmp_path / "ed25519.pem", ed25519.Ed25519PrivateKey.generate())
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory())
+
+
+def jwks(client=None):
+    return (client or APIClient()).get(reverse("jwks")).json()
+
+
+@pytest.mark.django_db
+class TestKeyRing:
+
+    @pytest.mark.parametrize(
+        "key, algorithm", [("rsa_key", "RS256"), ("ed25519_key", "EdDSA")]
+    )
+    def test_tokens_verify_with_the_published_keys(
+        self, request, key, algorithm, user, settings
+    ):
+        settings.JWT_SIGNING_KEY_FILES = [request.getfixturevalue(key)]
+
+        access = str(RefreshToken.for_user(user).access_token)
+
+        header = jwt.get_unverified_header(access)
+        assert header["alg"] == algorithm
+        # What a gateway does with the JWKS, without the app
+        jwk = {key["kid"]: key for key in jwks()["keys"]}[header["kid"]]
+        claims = jwt.decode(access, jwt.PyJWK(jwk).key, algorithms=[jwk["alg"]])
+        assert claims["user_id"] == str(user.pk)
+        assert AccessToken(access)["user_id"] == str(user.pk)
+
+    def test_authenticates_requests(self, rsa_key, user, settings):
+        settings.JWT_SIGNING_KEY_FILES = [rsa_key]
+        access = RefreshToken.for_user(user).access_token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+        response = client.get(
+            reverse("search-users"),
+            {"q": "ada"},
+            HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+        )
+
+        assert jwt.get_unverified_header(str(access))["alg"] == "RS256"
+        assert response.status_code == 200
+
+    def test_rotation(self, rsa_key, ed25519_key, user, settings):
+        settings.JWT_SIGNING_KEY_FILES = [rsa_key]
+        refresh = str(RefreshToken.for_user(user))
+
+        # The new key signs, the previous one still verifies
+        settings.JWT_SIGNING_KEY_FILES = [ed25519_key, rsa_key]
+        assert RefreshToken(refresh)
+        header = jwt.get_unverified_header(str(RefreshToken.for_user(user)))
+        assert header["alg"] == "EdDSA"
+
+        settings.JWT_SIGNING_KEY_FILES = [ed25519_key]
+        with pytest.raises(TokenError):
+            RefreshToken(refresh)
+
+    def test_verify_only_keys(self, tmp_path, rsa_key, user, settings):
+        public = write_key(
+            tmp_path / "public.pem", ed25519.Ed25519PrivateKey.generate(), True
+        )
+        settings.JWT_SIGNING_KEY_FILES = [rsa_key, public]
+
+        assert len(get_token_backend().keys) == 2
+        assert len(jwks()["keys"]) == 2
+
+    def test_hmac_tokens_during_migration(self, rsa_key, user, settings):
+        legacy = str(HMACAccessToken.for_user(user))
+        settings.JWT_SIGNING_KEY_FILES = [rsa_key]
+
+        assert AccessToken(legacy)
+
+        settings.JWT_ACCEPT_HMAC = False
+        with pytest.raises(TokenError):
+            AccessToken(legacy)
+
+    def test_without_keys_tokens_use_hmac(self, user):
+        access = RefreshToken.for_user(user).access_token
+
+        assert jwt.get_unverified_header(str(access))["alg"] == "HS256"
+        assert jwks() == {"keys": []}
+
+    def test_jwks_is_cacheable(self, rsa_key, settings):
+        settings.JWT_SIGNING_KEY_FILES = [rsa_key]
+        settings.JWKS_MAX_AGE = 3600
+
+        response = APIClient().get(reverse("jwks"))
+
+        assert response["Cache-Control"] == "public, max-age=3600"
+        assert set(response.json()["keys"][0]) >= {"kid", "alg", "kty", "n", "e"}
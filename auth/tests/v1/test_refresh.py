@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from django.db import connections
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.utils.refresh import refresh_grace
+from auth.utils.tokens import RefreshToken
+from tenant.tests.v1.factories import TenantFactory
+from user.tests.v1.factories import UserFactory
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory())
+
+
+def refresh(user, token):
+    return APIClient().post(
+        reverse("refresh-token"),
+        {"refresh": token},
+        format="json",
+        HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+    )
+
+
+@pytest.mark.django_db
+class TestRefreshGrace:
+
+    def test_repeated_refresh_gets_the_same_pair(self, user):
+        token = str(RefreshToken.for_user(user))
+
+        first = refresh(user, token)
+        second = refresh(user, token)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data["refresh"] == first.data["refresh"]
+        assert second.data["access"] == first.data["access"]
+        # Rotation still happened once
+        assert refresh(user, first.data["refresh"]).status_code == status.HTTP_200_OK
+
+    def test_without_grace_the_old_token_is_rejected(self, user, settings):
+        settings.REFRESH_GRACE_SECONDS = 0
+        token = str(RefreshToken.for_user(user))
+
+        assert refresh(user, token).status_code == status.HTTP_200_OK
+        assert refresh(user, token).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_pair_requires_the_same_token(self, user):
+        token = str(RefreshToken.for_user(user))
+        refresh(user, token)
+        # Same jti, but a different (unsigned) token
+        header, payload, _ = token.split(".")
+
+        response = refresh(user, f"{header}.{payload}.forged")
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cache_errors_after_rotating_return_the_pair(self, user, monkeypatch):
+        token = str(RefreshToken.for_user(user))
+
+        def fail(*args, **kwargs):
+            raise ConnectionError
+
+        monkeypatch.setattr(refresh_grace.cache, "set", fail)
+        response = refresh(user, token)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert refresh(user, response.data["refresh"]).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_refreshes_get_the_same_pair(user):
+    token = str(RefreshToken.for_user(user))
+    tabs = 4
+    barrier = threading.Barrier(tabs)
+    responses = []
+
+    def tab():
+        barrier.wait()
+        try:
+            responses.append(refresh(user, token))
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=tab) for _ in range(tabs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [200] * tabs
+    assert len({response.data["refresh"] for response in responses}) == 1
+    assert len({response.data["access"] for response in responses}) == 1
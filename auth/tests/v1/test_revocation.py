@@ -0,0 +1,189 @@
+import pytest
+
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+
+from rest_framework import exceptions, status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from auth.authentication import ClaimsJWTAuthentication
+from auth.utils.tokens import RefreshToken
+from tenant.models import Tenant
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+from user.utils.token_version import revoke_tenant_tokens, revoke_user_tokens
+
+SESSIONS = 2000
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory()
+
+
+@pytest.fixture
+def user(tenant):
+    return UserFactory(tenant=tenant)
+
+
+def authenticate(token):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+    return ClaimsJWTAuthentication().authenticate(request)
+
+
+def is_revoked(access):
+    try:
+        authenticate(access)
+    except exceptions.AuthenticationFailed:
+        return True
+    return False
+
+
+def sessions(users, count):
+    return [
+        RefreshToken.for_user(users[index % len(users)]).access_token
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+class TestRevocation:
+
+    def test_user_sessions_are_revoked_at_once(self, user, django_assert_num_queries):
+        other = UserFactory(tenant=user.tenant)
+        tokens = sessions([user], SESSIONS)
+        kept = sessions([other], 1)[0]
+
+        with django_assert_num_queries(1):
+            revoke_user_tokens(user)
+
+        assert all(is_revoked(access) for access in tokens)
+        assert not is_revoked(kept)
+        user.refresh_from_db()
+        assert not is_revoked(RefreshToken.for_user(user).access_token)
+
+    def test_tenant_sessions_are_revoked_at_once(
+        self, tenant, django_assert_num_queries
+    ):
+        password = make_password("Password123!")
+        users = User.objects.bulk_create(
+            User(
+                email=f"user-{index}@example.com",
+                username=f"user-{index}",
+                password=password,
+                tenant=tenant,
+            )
+            for index in range(200)
+        )
+        tokens = sessions(users, SESSIONS)
+        kept = sessions([UserFactory(tenant=TenantFactory())], 1)[0]
+
+        with django_assert_num_queries(1):
+            revoke_tenant_tokens(tenant)
+
+        assert all(is_revoked(access) for access in tokens)
+        assert not is_revoked(kept)
+        assert not is_revoked(RefreshToken.for_user(users[0]).access_token)
+
+    def test_refresh_tokens_are_revoked(self, user):
+        refresh = str(RefreshToken.for_user(user))
+
+        revoke_tenant_tokens(user.tenant)
+
+        response = APIClient().post(
+            reverse("refresh-token"),
+            {"refresh": refresh},
+            HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.parametrize("revoke", ["user", "tenant"])
+    def test_saving_a_stale_instance_keeps_tokens_revoked(self, user, revoke):
+        refresh = str(RefreshToken.for_user(user))
+        stale_user = User.objects.get(pk=user.pk)
+        stale_tenant = Tenant.objects.get(pk=user.tenant_id)
+
+        if revoke == "user":
+            revoke_user_tokens(user)
+        else:
+            revoke_tenant_tokens(user.tenant)
+        stale_user.first_name = "Renamed"
+        stale_user.save()
+        stale_tenant.name = "Renamed"
+        stale_tenant.save()
+
+        response = APIClient().post(
+            reverse("refresh-token"),
+            {"refresh": refresh},
+            HTTP_HOST=f"{user.tenant.subdomain}.localhost",
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_canceled_tenant_is_logged_out(self, tenant, user):
+        access = RefreshToken.for_user(user).access_token
+        tenant.payment_status = Tenant.PaymentStatusChoices.PAST_DUE
+        tenant.save()
+        assert not is_revoked(access)
+
+        tenant.payment_status = Tenant.PaymentStatusChoices.CANCELED
+        tenant.save()
+
+        assert is_revoked(access)
+        assert Tenant.objects.get(pk=tenant.pk).token_version == tenant.token_version
+
+
+@pytest.mark.django_db
+class TestRevocationViews:
+
+    def client_for(self, user):
+        client = APIClient()
+        access = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def test_logout_everywhere(self, user):
+        access = RefreshToken.for_user(user).access_token
+
+        response = self.client_for(user).post(
+            reverse("logout-all"), HTTP_HOST=f"{user.tenant.subdomain}.localhost"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert is_revoked(access)
+
+    def test_tenant_admin_revokes_a_user(self, tenant, user):
+        admin = UserFactory(tenant=tenant, user_type=User.UserTypeChoices.TENANT_ADMIN)
+        stranger = UserFactory(tenant=TenantFactory())
+        access = RefreshToken.for_user(user).access_token
+        client = self.client_for(admin)
+        host = f"{tenant.subdomain}.localhost"
+
+        response = client.post(
+            reverse("revoke-user-tokens", args=[user.pk]), HTTP_HOST=host
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert is_revoked(access)
+
+        response = client.post(
+            reverse("revoke-user-tokens", args=[stranger.pk]), HTTP_HOST=host
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_tenant_admin_revokes_the_tenant(self, tenant, user):
+        admin = UserFactory(tenant=tenant, user_type=User.UserTypeChoices.TENANT_ADMIN)
+        access = RefreshToken.for_user(user).access_token
+
+        response = self.client_for(admin).post(
+            reverse("revoke-tenant-tokens"), HTTP_HOST=f"{tenant.subdomain}.localhost"
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert is_revoked(access)
+
+    def test_users_cannot_revoke_the_tenant(self, tenant, user):
+        response = self.client_for(user).post(
+            reverse("revoke-tenant-tokens"), HTTP_HOST=f"{tenant.subdomain}.localhost"
+        )
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
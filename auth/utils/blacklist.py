@@ -0,0 +1,211 @@
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from django_redis import get_redis_connection
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from tenant.utils.shards import get_shard_for_id
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "jwt:blacklist"
+
+
+class TokenBlacklist:
+    """
+    Where revoked refresh tokens are recorded.
+
+    `outstand()` is called for every issued refresh token, `blacklist()` on
+    logout and rotation, and `is_blacklisted()` whenever a refresh token is
+    verified. The backend is chosen with `JWT_BLACKLIST_BACKEND`.
+    """
+
+    def outstand(self, token: Token, user=None) -> None:
+        raise NotImplementedError
+
+    def blacklist(self, token: Token) -> None:
+        raise NotImplementedError
+
+    def is_blacklisted(self, token: Token) -> bool:
+        raise NotImplementedError
+
+
+class DatabaseBlacklist(TokenBlacklist):
+    """
+    simplejwt's `token_blacklist` tables: an `OutstandingToken` row per
+    issued refresh token and a `BlacklistedToken` row per revoked one.
+
+    The rows live on the shard of the token's tenant. Queries name it
+    explicitly: the routers would pick the shard of the request's tenant,
+    which for a token sent to another tenant's host is the wrong one.
+    """
+
+    def outstand(self, token: Token, user=None) -> None:
+        self._get_outstanding(token, user)
+
+    def blacklist(self, token: Token) -> None:
+        BlacklistedToken.objects.using(self._get_shard(token)).get_or_create(
+            token=self._get_outstanding(token)
+        )
+
+    def is_blacklisted(self, token: Token) -> bool:
+        return (
+            BlacklistedToken.objects.using(self._get_shard(token))
+            .filter(token__jti=token[api_settings.JTI_CLAIM])
+            .exists()
+        )
+
+    @staticmethod
+    def purge_expired(
+        batch_size: Optional[int] = None, pause: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Delete expired outstanding tokens and their blacklist entries.
+
+        Unlike `flushexpiredtokens`, which deletes everything in a single
+        statement, rows go in batches of `batch_size` ordered by
+        `expires_at` (see the `token_outstanding_expires_at_idx` index),
+        each in its own short transaction, sleeping `pause` seconds in
+        between so concurrent logins and refreshes aren't held up.
+
+        Tokens are sharded with their users, so every shard is purged in
+        turn, reading and deleting on the shard's primary explicitly: the
+        routers would send both to `default` (or a replica) without a
+        current tenant.
+        """
+        batch_size = batch_size or settings.TOKEN_PURGE_BATCH_SIZE
+        pause = settings.TOKEN_PURGE_PAUSE if pause is None else pause
+        # Tokens issued while purging expire later, so this bound is enough
+        cutoff = timezone.now()
+        started = time.monotonic()
+        stats = {"outstanding": 0, "blacklisted": 0, "batches": 0}
+
+        for using in settings.DATABASE_SHARDS or [DEFAULT_DB_ALIAS]:
+            while True:
+                ids = list(
+                    OutstandingToken.objects.using(using)
+                    .filter(expires_at__lt=cutoff)
+                    .order_by("expires_at")
+                    .values_list("pk", flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+
+                # Blacklist entries first, so deleting the tokens has nothing
+                # left to cascade to.
+                blacklisted, _ = (
+                    BlacklistedToken.objects.using(using)
+                    .filter(token_id__in=ids)
+                    .delete()
+                )
+                outstanding, _ = (
+                    OutstandingToken.objects.using(using).filter(pk__in=ids).delete()
+                )
+                stats["blacklisted"] += blacklisted
+                stats["outstanding"] += outstanding
+                stats["batches"] += 1
+                logger.info(
+                    "Purged %d expired tokens (%d blacklisted) on %s in batch %d.",
+                    outstanding,
+                    blacklisted,
+                    using,
+                    stats["batches"],
+                )
+
+                if len(ids) < batch_size:
+                    break
+                time.sleep(pause)
+
+        stats["seconds"] = round(time.monotonic() - started, 3)
+        return stats
+
+    @staticmethod
+    def _get_shard(token: Token) -> str:
+        return get_shard_for_id(token.get("tenant_id"))
+
+    def _get_outstanding(self, token: Token, user=None) -> OutstandingToken:
+        using = self._get_shard(token)
+        outstanding, _ = OutstandingToken.objects.using(using).get_or_create(
+            jti=token[api_settings.JTI_CLAIM],
+            defaults={
+                "user": user or self._get_user(token, using),
+                "created_at": token.current_time,
+                "token": str(token),
+                "expires_at": datetime_from_epoch(token["exp"]),
+            },
+        )
+        return outstanding
+
+    @staticmethod
+    def _get_user(token: Token, using: str):
+        User = get_user_model()
+        user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+        return (
+            User.objects.using(using)
+            .filter(**{api_settings.USER_ID_FIELD: user_id})
+            .first()
+        )
+
+
+class RedisBlacklist(TokenBlacklist):
+    """
+    One `jwt:blacklist:<jti>` key per revoked token in the Redis behind
+    `CACHES[cache_alias]`, expiring together with the token.
+
+    Issued tokens aren't recorded, so issuing and rotating a token costs a
+    single `SET` instead of two table inserts, and the blacklist never
+    needs purging. Errors reaching Redis propagate: a token whose state
+    can't be checked is rejected rather than accepted.
+    """
+
+    def __init__(self, cache_alias: str = "default"):
+        self.cache_alias = cache_alias
+
+    @property
+    def client(self):
+        # Raises NotImplementedError for caches other than django_redis
+        return get_redis_connection(self.cache_alias)
+
+    @staticmethod
+    def key(jti: str) -> str:
+        return f"{KEY_PREFIX}:{jti}"
+
+    def outstand(self, token: Token, user=None) -> None:
+        pass
+
+    def blacklist(self, token: Token) -> None:
+        self.add_many([(token[api_settings.JTI_CLAIM], token["exp"])])
+
+    def is_blacklisted(self, token: Token) -> bool:
+        return bool(self.client.exists(self.key(token[api_settings.JTI_CLAIM])))
+
+    def add_many(self, entries: Iterable[Tuple[str, int]]) -> int:
+        """Blacklist `(jti, exp)` pairs; return how many haven't expired yet."""
+        now = int(time.time())
+        added = 0
+        with self.client.pipeline(transaction=False) as pipe:
+            for jti, exp in entries:
+                # Expired tokens fail verification anyway
+                if exp > now:
+                    pipe.set(self.key(jti), 1, ex=exp - now)
+                    added += 1
+            pipe.execute()
+        return added
+
+
+def get_token_blacklist(backend: Optional[str] = None) -> TokenBlacklist:
+    """Return an instance of `backend`, `JWT_BLACKLIST_BACKEND` by default."""
+    return import_string(backend or settings.JWT_BLACKLIST_BACKEND)()
@@ -0,0 +1,116 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    is_password_usable,
+    make_password,
+)
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions, status
+
+
+class HashingPoolSaturated(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Too many sign-ins in progress, try again shortly.")
+    default_code = "hashing_pool_saturated"
+    # Sent as Retry-After by DRF's exception handler
+    wait = 1
+
+
+def verify_password(password: Optional[str], encoded: str) -> Tuple[bool, bool]:
+    """
+    Return whether `password` matches `encoded` and, if so, whether the hash
+    should be upgraded to the preferred hasher, like Django's
+    `check_password()` without saving anything.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False, False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    if not hasher.verify(password, encoded):
+        return False, False
+    preferred = get_hasher("default")
+    must_update = hasher.algorithm != preferred.algorithm
+    return True, must_update or preferred.must_update(encoded)
+
+
+class PasswordHashingPool:
+    """
+    Bounded thread pool for password hashing on the async code path.
+
+    PBKDF2 and Argon2 release the GIL, so `PASSWORD_HASHING_WORKERS`
+    threads hash in parallel without blocking the event loop or the
+    single thread running sync views. At most `PASSWORD_HASHING_MAX_PENDING`
+    hashes may be queued or running; beyond that `run()` raises
+    `HashingPoolSaturated` (503) immediately instead of letting requests
+    pile up behind each other.
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, max_pending: Optional[int] = None
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers or settings.PASSWORD_HASHING_WORKERS,
+                    thread_name_prefix="password-hashing",
+                )
+            return self._executor
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func, *args):
+        """Run `func(*args)` in the pool, unless it is saturated."""
+        limit = self.max_pending
+        if limit is None:
+            limit = settings.PASSWORD_HASHING_MAX_PENDING
+        with self._lock:
+            if self._pending >= limit:
+                raise HashingPoolSaturated
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor, functools.partial(func, *args)
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def make_password(self, password: str) -> str:
+        return await self.run(make_password, password)
+
+    async def verify_password(
+        self, password: Optional[str], encoded: str
+    ) -> Tuple[bool, bool]:
+        return await self.run(verify_password, password, encoded)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hashing_pool = PasswordHashingPool()
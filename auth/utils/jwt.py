@@ -2,12 +2,13 @@ from typing import Dict
 
 from dj_rest_auth.app_settings import api_settings as rest_auth_settings
 from rest_framework_simplejwt.settings import api_settings as jwt_settings
-from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
 from django.utils import timezone
 
 from rest_framework.response import Response
 
+from auth.utils.tokens import AccessToken, RefreshToken
+
 
 def set_all_jwt_cookies(
     response: Response,
@@ -107,34 +108,43 @@ def logout_and_revoke_tokens(
     token = RefreshToken(refresh_token)
     token.blacklist()
 
+    if is_http_cookie_only:
+        clear_jwt_cookies(response)
+
+    return response
+
+
+def clear_jwt_cookies(response: Response) -> Response:
+    """
+    Expire the JWT cookies set by `set_all_jwt_cookies`.
+    """
     force_token_expiration = timezone.now() - jwt_settings.REFRESH_TOKEN_LIFETIME
     refresh_cookie_path = rest_auth_settings.JWT_AUTH_REFRESH_COOKIE_PATH
     cookie_secure: bool = rest_auth_settings.JWT_AUTH_SECURE
     cookie_httponly = rest_auth_settings.JWT_AUTH_HTTPONLY
     cookie_samesite = rest_auth_settings.JWT_AUTH_SAMESITE
 
-    if is_http_cookie_only:
-        cookie_name = rest_auth_settings.JWT_AUTH_COOKIE
-        refresh_cookie_name = rest_auth_settings.JWT_AUTH_REFRESH_COOKIE
-
-        response.set_cookie(
-            key=cookie_name,
-            value="",  # Clear cookie value
-            expires=force_token_expiration,
-            httponly=cookie_httponly,
-            secure=cookie_secure,
-            samesite=cookie_samesite,
-        )
+    cookie_name = rest_auth_settings.JWT_AUTH_COOKIE
+    refresh_cookie_name = rest_auth_settings.JWT_AUTH_REFRESH_COOKIE
 
-        response.set_cookie(
-            key=refresh_cookie_name,
-            value="",  # Clear cookie value
-            expires=force_token_expiration,
-            httponly=cookie_httponly,
-            secure=cookie_secure,
-            samesite=cookie_samesite,
-            path=refresh_cookie_path,
-        )
+    response.set_cookie(
+        key=cookie_name,
+        value="",  # Clear cookie value
+        expires=force_token_expiration,
+        httponly=cookie_httponly,
+        secure=cookie_secure,
+        samesite=cookie_samesite,
+    )
+
+    response.set_cookie(
+        key=refresh_cookie_name,
+        value="",  # Clear cookie value
+        expires=force_token_expiration,
+        httponly=cookie_httponly,
+        secure=cookie_secure,
+        samesite=cookie_samesite,
+        path=refresh_cookie_path,
+    )
 
     return response
 
@@ -0,0 +1,209 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import (
+    TokenBackendError,
+    TokenBackendExpiredToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+# JWK members hashed into a key's thumbprint (RFC 7638), by key type
+THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    """A key of the key ring, parsed once; `private_key` is None for public keys."""
+
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Any = None
+
+    @property
+    def jwk(self) -> Dict[str, str]:
+        return {
+            **public_jwk(self.public_key),
+            "kid": self.kid,
+            "alg": self.algorithm,
+            "use": "sig",
+        }
+
+
+def public_jwk(public_key) -> Dict[str, str]:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        return ECAlgorithm.to_jwk(public_key, as_dict=True)
+    return OKPAlgorithm.to_jwk(public_key, as_dict=True)
+
+
+def get_algorithm(public_key) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(
+        public_key.curve, ec.SECP256R1
+    ):
+        return "ES256"
+    raise ImproperlyConfigured(
+        f"Unsupported JWT signing key {type(public_key).__name__}, "
+        "use RSA, Ed25519 or EC P-256 keys."
+    )
+
+
+def thumbprint(jwk: Dict[str, str]) -> str:
+    members = {name: jwk[name] for name in THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(
+        json.dumps(members, separators=(",", ":"), sort_keys=True).encode()
+    ).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def load_key(pem: bytes) -> SigningKey:
+    """Parse a PEM private key, or a public key that only verifies."""
+    if b"PRIVATE KEY" in pem:
+        private_key = load_pem_private_key(pem, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key = None
+        public_key = load_pem_public_key(pem)
+    return SigningKey(
+        kid=thumbprint(public_jwk(public_key)),
+        algorithm=get_algorithm(public_key),
+        public_key=public_key,
+        private_key=private_key,
+    )
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    Token backend signing with the first of `keys` and verifying with any
+    of them, chosen by the token's `kid` header.
+
+    Keys are RSA (RS256), Ed25519 (EdDSA) or EC P-256 (ES256); their `kid`
+    is their RFC 7638 thumbprint and their public halves are published by
+    `JWKSView`, so other services can verify tokens without calling back.
+    Tokens without a `kid` are verified with SimpleJWT's HS256 settings
+    while `accept_hmac` is true, so tokens issued before the switch keep
+    working. Without keys, tokens are signed with HS256 as before.
+    """
+
+    def __init__(self, keys: List[SigningKey], accept_hmac: bool = True):
+        super().__init__(
+            api_settings.ALGORITHM,
+            api_settings.SIGNING_KEY,
+            api_settings.VERIFYING_KEY,
+            api_settings.AUDIENCE,
+            api_settings.ISSUER,
+            api_settings.JWK_URL,
+            api_settings.LEEWAY,
+            api_settings.JSON_ENCODER,
+        )
+        if keys and keys[0].private_key is None:
+            raise ImproperlyConfigured("The first JWT signing key must be private.")
+        self.keys = {key.kid: key for key in keys}
+        self.active_key = keys[0] if keys else None
+        self.accept_hmac = accept_hmac or not keys
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        key = self.active_key
+        if key is None:
+            return super().encode(payload)
+
+        payload = payload.copy()
+        if self.audience is not None:
+            payload["aud"] = self.audience
+        if self.issuer is not None:
+            payload["iss"] = self.issuer
+        return jwt.encode(
+            payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify: bool = True) -> Dict[str, Any]:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError as exc:
+            raise TokenBackendError(_("Token is invalid")) from exc
+
+        if kid is None:
+            if not self.accept_hmac:
+                raise TokenBackendError(_("Token is invalid"))
+            return super().decode(token, verify=verify)
+
+        key = self.keys.get(kid)
+        if key is None:
+            raise TokenBackendError(_("Token is invalid"))
+        try:
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    "verify_aud": self.audience is not None,
+                    "verify_signature": verify,
+                },
+            )
+        except jwt.ExpiredSignatureError as exc:
+            raise TokenBackendExpiredToken(_("Token is expired")) from exc
+        except jwt.InvalidTokenError as exc:
+            raise TokenBackendError(_("Token is invalid")) from exc
+
+    @cached_property
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        return {"keys": [key.jwk for key in self.keys.values()]}
+
+
+_token_backend: Optional[KeyRingTokenBackend] = None
+
+
+def get_token_backend() -> KeyRingTokenBackend:
+    """
+    Return the backend of `JWT_SIGNING_KEY_FILES`, whose keys are read and
+    parsed once per process.
+    """
+    global _token_backend
+    if _token_backend is None:
+        keys = []
+        for path in settings.JWT_SIGNING_KEY_FILES:
+            with open(path, "rb") as file:
+                keys.append(load_key(file.read()))
+        _token_backend = KeyRingTokenBackend(keys, settings.JWT_ACCEPT_HMAC)
+    return _token_backend
+
+
+@receiver(setting_changed)
+def reset_token_backend(setting, **kwargs):
+    global _token_backend
+    if setting in ("JWT_SIGNING_KEY_FILES", "JWT_ACCEPT_HMAC", "SIMPLE_JWT"):
+        _token_backend = None
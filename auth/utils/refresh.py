@@ -0,0 +1,108 @@
+import hashlib
+import hmac
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import jwt
+from rest_framework_simplejwt.settings import api_settings
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "jwt:refresh:grace"
+PENDING = "pending"
+POLL_INTERVAL = 0.05
+
+
+class RefreshGrace:
+    """
+    Make rotating the same refresh token idempotent for a few seconds.
+
+    With `ROTATE_REFRESH_TOKENS` and `BLACKLIST_AFTER_ROTATION`, a token
+    refreshed twice at once (e.g. by two browser tabs) is blacklisted by
+    the first refresh and the second fails, logging the user out. Instead,
+    the first refresh claims `jwt:refresh:grace:<old jti>` in the cache and
+    stores the new pair under it for `REFRESH_GRACE_SECONDS`; refreshes of
+    the same token meanwhile wait up to `REFRESH_GRACE_WAIT` seconds for
+    that pair and get it back rather than rotating again.
+
+    The pair is only handed out for the exact same token string, compared
+    by digest, so knowing a `jti` is not enough to obtain it.
+    """
+
+    def __init__(self, cache_alias: Optional[str] = None):
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or settings.REFRESH_GRACE_CACHE]
+
+    @staticmethod
+    def key(jti: str) -> str:
+        return f"{KEY_PREFIX}:{jti}"
+
+    def rotate(self, token: str, rotate: Callable[[], Dict]) -> Dict:
+        """Return `rotate()`, or the pair it returned for `token` moments ago."""
+        grace = settings.REFRESH_GRACE_SECONDS
+        jti = self._get_jti(token)
+        if not grace or jti is None:
+            return rotate()
+
+        key = self.key(jti)
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        try:
+            claimed = self.cache.add(key, PENDING, timeout=grace)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to claim the refresh token.", exc_info=True)
+            return rotate()
+
+        if claimed:
+            try:
+                data = rotate()
+            except Exception:
+                self._forget(key)
+                raise
+            # The token is rotated already: failing to share the new pair
+            # only costs concurrent refreshes their grace
+            try:
+                self.cache.set(key, {"digest": digest, "data": data}, timeout=grace)
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("Unable to store the rotated pair.", exc_info=True)
+            return data
+
+        rotated = self._wait(key)
+        if rotated is not None and hmac.compare_digest(rotated["digest"], digest):
+            return rotated["data"]
+        # The other refresh failed or was for a different token: let
+        # rotating report why this one can't be refreshed
+        return rotate()
+
+    @staticmethod
+    def _get_jti(token: str) -> Optional[str]:
+        # Only used as a key; the token is verified by `rotate()`
+        try:
+            payload = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            return None
+        return payload.get(api_settings.JTI_CLAIM)
+
+    def _forget(self, key: str) -> None:
+        try:
+            self.cache.delete(key)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to release the refresh token.", exc_info=True)
+
+    def _wait(self, key: str) -> Optional[Dict]:
+        # Blocks the worker thread while polling, see REFRESH_GRACE_WAIT
+        deadline = time.monotonic() + settings.REFRESH_GRACE_WAIT
+        while True:
+            value = self.cache.get(key)
+            if value != PENDING or time.monotonic() >= deadline:
+                return value if isinstance(value, dict) else None
+            time.sleep(POLL_INTERVAL)
+
+
+refresh_grace = RefreshGrace()
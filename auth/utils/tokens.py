@@ -0,0 +1,130 @@
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken as BaseAccessToken
+from rest_framework_simplejwt.tokens import BlacklistMixin
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.tokens import Token
+
+from django.utils.translation import gettext_lazy as _
+
+from auth.utils.blacklist import get_token_blacklist
+from auth.utils.keys import get_token_backend
+from tenant.utils.shards import get_shard_for_id
+from user.models import User
+from user.utils.token_version import get_tenant_token_version, get_token_version
+
+# User fields embedded in every token, see `TokenUser`
+USER_CLAIMS = ("tenant_id", "user_type", "is_staff", "is_superuser")
+VERSION_CLAIM = "ver"
+TENANT_VERSION_CLAIM = "tver"
+
+
+def is_revoked(token: Token) -> bool:
+    """
+    Whether the user's or their tenant's `token_version` moved past the
+    one in `token`, e.g. on a password change or "log out everywhere".
+    """
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    tenant_id = token.get("tenant_id")
+    if get_token_version(user_id, tenant_id) != token[VERSION_CLAIM]:
+        return True
+    # Tokens issued before tenant versions existed count as version 0
+    return tenant_id is not None and get_tenant_token_version(tenant_id) != token.get(
+        TENANT_VERSION_CLAIM, 0
+    )
+
+
+class AccessToken(BaseAccessToken):
+    """Access token signed and verified by the `JWT_SIGNING_KEY_FILES` key ring."""
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    Refresh token whose outstanding and blacklisted state is kept by the
+    `JWT_BLACKLIST_BACKEND` instead of always by the database.
+
+    It and the access tokens derived from it carry the `USER_CLAIMS` and
+    the `token_version` of the user and their tenant; a token whose
+    versions are behind is rejected like a blacklisted one. Both are signed by the
+    `JWT_SIGNING_KEY_FILES` key ring.
+    """
+
+    access_token_class = AccessToken
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+    @classmethod
+    def for_user(cls, user) -> "RefreshToken":
+        # Skip BlacklistMixin.for_user, which always inserts an OutstandingToken
+        token = super(BlacklistMixin, cls).for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token[VERSION_CLAIM] = user.token_version
+        if user.tenant_id is not None:
+            token[TENANT_VERSION_CLAIM] = get_tenant_token_version(user.tenant_id)
+        get_token_blacklist().outstand(token, user=user)
+        return token
+
+    def verify(self) -> None:
+        super().verify()
+        self.check_version()
+
+    def check_version(self) -> None:
+        # Tokens issued before versions were embedded only have the blacklist
+        if VERSION_CLAIM not in self.payload:
+            return
+        if is_revoked(self):
+            raise TokenError(_("Token has been revoked"))
+
+    def check_blacklist(self) -> None:
+        if get_token_blacklist().is_blacklisted(self):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) -> None:
+        get_token_blacklist().blacklist(self)
+
+    def outstand(self) -> None:
+        get_token_blacklist().outstand(self)
+
+
+class TokenUser:
+    """
+    Authenticated user built from the claims of a `RefreshToken` or the
+    access tokens derived from it, without loading the `User` row.
+
+    Use `get_user()` where the full model is needed.
+    """
+
+    __slots__ = ("id", "tenant_id", "user_type", "is_staff", "is_superuser", "token")
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token: Token):
+        self.token = token
+        self.id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        for claim in USER_CLAIMS:
+            setattr(self, claim, token[claim])
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_user(self) -> User:
+        return User._base_manager.using(get_shard_for_id(self.tenant_id)).get(
+            pk=self.id
+        )
+
+    def __str__(self) -> str:
+        return f"TokenUser {self.id}"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, (TokenUser, User)) and self.pk == other.pk
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
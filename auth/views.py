@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
+
+from auth.utils.keys import get_token_backend
+
+
+class JWKSView(View):
+    """
+    Public keys verifying the JWTs, as a JSON Web Key Set, for gateways and
+    services that verify the `access_token` locally. Empty while tokens are
+    signed with HS256.
+    """
+
+    def get(self, request, *args, **kwargs):
+        response = JsonResponse(get_token_backend().jwks)
+        patch_cache_control(response, public=True, max_age=settings.JWKS_MAX_AGE)
+        return response
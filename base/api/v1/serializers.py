@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
 
 class BaseSerializer(serializers.ModelSerializer):
@@ -10,3 +11,16 @@ class BaseSerializer(serializers.ModelSerializer):
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
     deleted_at = serializers.DateTimeField(read_only=True)
+
+    def build_standard_field(self, field_name, model_field):
+        """
+        Check unique fields against every tenant's rows, as the database
+        does: the default manager only sees the current tenant's.
+        """
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field
+        )
+        for validator in field_kwargs.get("validators", []):
+            if isinstance(validator, UniqueValidator):
+                validator.queryset = model_field.model._base_manager.all()
+        return field_class, field_kwargs
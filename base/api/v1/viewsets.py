@@ -1,6 +1,19 @@
-from rest_framework import filters
+from asgiref.sync import sync_to_async
+
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from rest_framework import exceptions, filters
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
 from rest_framework.viewsets import GenericViewSet
 
+from base.pagination import KeysetPagination
+
 
 class BaseViewset(GenericViewSet):
     """
@@ -10,3 +23,55 @@ class BaseViewset(GenericViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ["created_at", "updated_at"]
     ordering = ["-created_at"]
+    pagination_class = KeysetPagination
+
+
+class AsyncAPIView(View):
+    """
+    Abstract async view for public JSON endpoints, since DRF's `APIView`
+    only runs synchronously.
+
+    Handlers are `async def` methods receiving a DRF `Request` and returning
+    a DRF `Response`; `APIException`s are rendered by DRF's exception
+    handler. `throttle_classes` are applied; authentication and permissions
+    are not, and CSRF isn't enforced, like for DRF views without session auth.
+    """
+
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+    renderer_class = JSONRenderer
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, parsers=[parser() for parser in self.parser_classes])
+        self.request = request
+        try:
+            # A Redis round trip, not worth the thread shared by sync views
+            await sync_to_async(self.check_throttles, thread_sensitive=False)(request)
+            response = await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = exception_handler(exc, {"request": request, "view": self})
+        return self.finalize_response(request, response)
+
+    def check_throttles(self, request):
+        durations = [
+            throttle.wait()
+            for throttle in (cls() for cls in self.throttle_classes)
+            if not throttle.allow_request(request, self)
+        ]
+        if durations:
+            raise exceptions.Throttled(max(filter(None, durations), default=None))
+
+    def finalize_response(self, request, response):
+        if isinstance(response, Response):
+            response.accepted_renderer = self.renderer_class()
+            response.accepted_media_type = self.renderer_class.media_type
+            response.renderer_context = {
+                "request": request,
+                "response": response,
+                "view": self,
+            }
+        return response
@@ -0,0 +1,89 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+
+from base.routers import pin_state
+
+PIN_COOKIE_NAME = "db_pinned"
+
+
+class ReplicaPinningMiddleware:
+    """
+    Give a client read-your-writes consistency while replicas catch up.
+
+    When a request writes to the primary, the response sets a short-lived
+    cookie and the client's requests read from the primary until it
+    expires (`DATABASE_REPLICA_PIN_SECONDS`). A client that just registered
+    through `RegisterView` can therefore log in right away. The cookie only
+    ever moves reads to the primary, so it doesn't need to be signed.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with pin_state(pinned=self._is_pinned(request)) as state:
+            response = self.get_response(request)
+        return self._process_response(response, state)
+
+    async def __acall__(self, request):
+        with pin_state(pinned=self._is_pinned(request)) as state:
+            response = await self.get_response(request)
+        return self._process_response(response, state)
+
+    @staticmethod
+    def _is_pinned(request) -> bool:
+        return bool(settings.DATABASE_REPLICAS) and PIN_COOKIE_NAME in request.COOKIES
+
+    @staticmethod
+    def _process_response(response, state):
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Send the client's quota as `RateLimit-Limit`, `RateLimit-Remaining` and
+    `RateLimit-Reset` (seconds) headers, when `TenantRateThrottle` limited
+    the request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self._process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self._process_response(request, await self.get_response(request))
+
+    @staticmethod
+    def _process_response(request, response):
+        rate_limit = getattr(request, "rate_limit", None)
+        if rate_limit is not None:
+            for header, value in rate_limit.headers.items():
+                response[header] = value
+        return response
@@ -1,9 +1,17 @@
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
 from django.conf import settings
-from django.db import models
+from django.db import models, router
 from django.utils import timezone
 
+from base.managers import (
+    AliveManager,
+    AllObjectsManager,
+    DeletedManager,
+    TenantScopedManager,
+)
+from tenant.context import tenant_context
+
 OPTIONAL = {"null": True, "blank": True}
 
 
@@ -31,6 +39,57 @@ class BaseModel(models.Model):
     )
     is_active = models.BooleanField(default=True)
 
+    # `objects` stays the default manager so existing querysets, the admin
+    # and related lookups keep seeing soft-deleted rows.
+    objects = TenantScopedManager()
+    alive = AliveManager()
+    deleted = DeletedManager()
+    all_objects = AllObjectsManager()
+
+    # Fields only written by saves naming them in `update_fields`, e.g.
+    # counters bumped with an UPDATE: saving an instance loaded before the
+    # bump would write the old value back.
+    explicit_update_fields: Tuple[str, ...] = ()
+
+    def save(
+        self,
+        force_insert: bool = False,
+        force_update: bool = False,
+        using: Optional[str] = None,
+        update_fields: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Save every loaded field except `explicit_update_fields`."""
+        using = using or router.db_for_write(self.__class__, instance=self)
+        # Like Django's own narrowing to the loaded fields, only for updates
+        # of the row the instance was loaded from
+        updating = not (force_insert or self._state.adding) and using == self._state.db
+        if self.explicit_update_fields and update_fields is None and updating:
+            skipped = {*self.explicit_update_fields, *self.get_deferred_fields()}
+            update_fields = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not (field.primary_key or {field.name, field.attname} & skipped)
+            ]
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+    def validate_unique(self, exclude=None) -> None:
+        """
+        Check unique fields against every tenant's rows, as the database
+        does, rather than only the current tenant's that `objects` sees.
+        """
+        with tenant_context(None):
+            super().validate_unique(exclude=exclude)
+
+    def validate_constraints(self, exclude=None) -> None:
+        """Check `Meta.constraints` against every tenant's rows."""
+        with tenant_context(None):
+            super().validate_constraints(exclude=exclude)
+
     def delete(self, using: Optional[str] = None, keep_parents: bool = False) -> None:
         """
         Soft delete—stamp metadata instead of hard remove.
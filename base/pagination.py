@@ -0,0 +1,249 @@
+import base64
+import binascii
+import json
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset: QuerySet, threshold: Optional[int] = None) -> int:
+    """
+    Return the number of rows of `queryset`, estimated by PostgreSQL's
+    planner when there are more than `threshold` of them.
+
+    A whole table is estimated from `pg_class.reltuples` and a filtered
+    queryset from its `EXPLAIN`, so the cost doesn't grow with the table
+    like `COUNT(*)`'s does. Estimates are as accurate as the table's
+    statistics (refreshed by autovacuum's ANALYZE); below `threshold`
+    (`ESTIMATED_COUNT_THRESHOLD` by default) rows are counted exactly,
+    as on other databases.
+    """
+    if threshold is None:
+        threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    estimate = None
+    query = queryset.query
+    if not query.where and not query.distinct and not query.is_sliced:
+        estimate = _table_estimate(connection, queryset.model._meta.db_table)
+    if estimate is None:
+        plan = json.loads(queryset.explain(format="json"))
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    return estimate if estimate > threshold else queryset.count()
+
+
+def _table_estimate(connection, table: str) -> Optional[int]:
+    with connection.cursor() as cursor:
+        # to_regclass() follows the search_path, like the queries do
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(table)],
+        )
+        row = cursor.fetchone()
+    # -1 (or 0 before PostgreSQL 14) until the table is first analyzed
+    if row is None or row[0] <= 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    `Paginator` whose count of a queryset is `estimate_count()`'s.
+
+    For the admin (`ModelAdmin.paginator`) and DRF's `PageNumberPagination`
+    (`django_paginator_class`), which otherwise run an exact `COUNT(*)`
+    per page. Pages past an estimate that is too low are out of range.
+    """
+
+    count_threshold: Optional[int] = None
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):
+            return estimate_count(self.object_list, self.count_threshold)
+        return super().count
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """`PageNumberPagination` with `EstimatedCountPaginator`'s counts."""
+
+    django_paginator_class = EstimatedCountPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginate by the position of the last row seen rather than by offset.
+
+    Rows are ordered by the view's ordering (the first field of
+    `OrderingFilter`'s, `-created_at` for `BaseViewset`) with `id` as the
+    tie breaker, and a page is the `page_size` rows after the cursor's
+    `(value, id)`. Page 10,000 is thus one index range scan like page 1,
+    instead of skipping `OFFSET` rows, and no `COUNT(*)` runs.
+
+    Cursors are opaque and bound to the request's tenant: a cursor of
+    another tenant is rejected rather than leaking where its rows sort.
+    `?count=true` adds the total, estimated by the planner on large
+    tables, see `estimate_count()`.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering = ("-created_at",)
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None) -> Optional[List[Any]]:
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.tenant_id = self.get_tenant_id(request)
+        self.model = queryset.model
+        self.field, descending = self.get_ordering(request, queryset, view)
+        self.count = None
+        if self.include_count(request):
+            self.count = estimate_count(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor["reverse"]
+        # Walking backwards, rows are fetched in the opposite order
+        self.descending = descending != reverse
+        queryset = queryset.order_by(*self._order_by(self.descending))
+        if cursor is not None:
+            queryset = queryset.filter(self._after(cursor["value"], cursor["id"]))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = cursor is not None if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data) -> Response:
+        response = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            response["count"] = self.count
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema: Dict) -> Dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "example": 123},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def get_tenant_id(request) -> Optional[int]:
+        tenant = getattr(request, "tenant", None)
+        return tenant.id if tenant is not None else None
+
+    def get_ordering(self, request, queryset, view) -> Tuple[str, bool]:
+        """Return the field rows are ordered by and whether it's descending."""
+        ordering = None
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        field = (ordering or self.ordering)[0]
+        return field.lstrip("-"), field.startswith("-")
+
+    def include_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() in ("1", "true")
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        position = {
+            "v": self._field().value_to_string(row),
+            "i": row.pk,
+            "r": int(reverse),
+            "t": self.tenant_id,
+        }
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(position, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> Optional[Dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if position["t"] != self.tenant_id:
+                raise ValueError("Cursor of another tenant")
+            # Cursors come from clients: only what `encode_cursor` writes
+            if not isinstance(position["v"], str) or not isinstance(position["i"], int):
+                raise TypeError("Malformed cursor")
+            return {
+                "value": position["v"],
+                "id": position["i"],
+                "reverse": bool(position["r"]),
+            }
+        except (binascii.Error, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _order_by(self, descending: bool) -> List[str]:
+        prefix = "-" if descending else ""
+        return [f"{prefix}{self.field}", f"{prefix}pk"]
+
+    def _after(self, value: str, pk: int) -> Q:
+        """Rows after `(value, pk)` in the current order."""
+        try:
+            value = self._field().to_python(value)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+        op = "lt" if self.descending else "gt"
+        bound = "lte" if self.descending else "gte"
+        after = Q(**{f"{self.field}__{op}": value})
+        tied = Q(**{self.field: value, f"pk__{op}": pk})
+        # The redundant bound keeps the scan on an index of the field
+        return Q(**{f"{self.field}__{bound}": value}) & (after | tied)
+
+    def _field(self):
+        return self.model._meta.get_field(self.field)
@@ -0,0 +1,93 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class PinState:
+    """Whether the current request reads from the primary, and whether it wrote."""
+
+    __slots__ = ("pinned", "wrote")
+
+    def __init__(self, pinned: bool = False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+# Set per request by `ReplicaPinningMiddleware`. The state is mutated rather
+# than replaced so writes made in `sync_to_async` threads are seen by the
+# middleware as well.
+_pin_state: ContextVar[Optional[PinState]] = ContextVar("db_pin_state", default=None)
+
+
+def get_pin_state() -> Optional[PinState]:
+    return _pin_state.get()
+
+
+@contextmanager
+def pin_state(pinned: bool = False):
+    """Track reads and writes of a block of code, e.g. a request."""
+    state = PinState(pinned)
+    token = _pin_state.set(state)
+    try:
+        yield state
+    finally:
+        _pin_state.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Read from the primary for the duration of the block.
+
+    Example:
+        with use_primary():
+            user = User.objects.get(email=email)
+    """
+    with pin_state(pinned=True) as state:
+        yield state
+
+
+class ReplicaRouter:
+    """
+    Send reads to a random replica from `DATABASE_REPLICAS` and writes to the
+    primary.
+
+    Reads stay on the primary when they happen inside a transaction, after
+    the current request wrote, or while the client is pinned by
+    `ReplicaPinningMiddleware` after a recent write. Without replicas
+    configured every query goes to `default`, as before.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas:
+            return None
+
+        state = get_pin_state()
+        if state is not None and (state.pinned or state.wrote):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = get_pin_state()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
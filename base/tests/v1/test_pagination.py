@@ -0,0 +1,183 @@
+import base64
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import mixins
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from base.api.v1.serializers import BaseSerializer
+from base.api.v1.viewsets import BaseViewset
+from base.pagination import EstimatedCountPaginator, estimate_count
+from tenant.models import Tenant
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+
+class UserSerializer(BaseSerializer):
+    class Meta:
+        model = User
+        fields = ["id", "email", "created_at"]
+
+
+class UserViewset(mixins.ListModelMixin, BaseViewset):
+    serializer_class = UserSerializer
+
+    def get_queryset(self):
+        return User.objects.filter(tenant=self.request.tenant)
+
+
+list_users = UserViewset.as_view({"get": "list"})
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory()
+
+
+@pytest.fixture
+def users(tenant):
+    users = UserFactory.create_batch(8, tenant=tenant)
+    # Ties on created_at are broken by id
+    same_time = timezone.now()
+    User.objects.filter(pk__in=[user.pk for user in users[2:6]]).update(
+        created_at=same_time
+    )
+    return list(User.objects.filter(tenant=tenant).order_by("-created_at", "-pk"))
+
+
+def get(tenant, url="/users/", **params):
+    request = APIRequestFactory().get(url, params)
+    request.tenant = tenant
+    force_authenticate(request, UserFactory.build(tenant=tenant))
+    return list_users(request).data
+
+
+def follow(tenant, link):
+    return get(tenant, link) if link else None
+
+
+def ids(page):
+    return [row["id"] for row in page["results"]]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walks_every_row_once(self, tenant, users):
+        pages = [get(tenant, page_size=3)]
+        while pages[-1]["next"]:
+            pages.append(follow(tenant, pages[-1]["next"]))
+
+        assert [len(page["results"]) for page in pages] == [3, 3, 2]
+        assert sum(map(ids, pages), []) == [user.pk for user in users]
+        assert pages[0]["previous"] is None
+        assert "count" not in pages[0]
+
+    def test_previous_link_returns_the_previous_page(self, tenant, users):
+        first = get(tenant, page_size=3)
+        second = follow(tenant, first["next"])
+        third = follow(tenant, second["next"])
+
+        assert ids(follow(tenant, third["previous"])) == ids(second)
+        assert ids(follow(tenant, second["previous"])) == ids(first)
+        assert follow(tenant, second["previous"])["previous"] is None
+
+    def test_ordering_parameter(self, tenant, users):
+        page = get(tenant, ordering="created_at", page_size=8)
+        second = get(tenant, ordering="created_at", page_size=4)
+
+        assert ids(page) == [user.pk for user in reversed(users)]
+        assert ids(follow(tenant, second["next"])) == ids(page)[4:]
+
+    def test_pages_after_the_first_are_one_query(
+        self, tenant, users, django_assert_num_queries
+    ):
+        link = get(tenant, page_size=3)["next"]
+
+        with django_assert_num_queries(1):
+            get(tenant, link)
+
+    def test_cursor_of_another_tenant_is_rejected(self, tenant, users):
+        link = get(tenant, page_size=3)["next"]
+        cursor = parse_qs(urlparse(link).query)["cursor"][0]
+
+        response = get(TenantFactory(), cursor=cursor)
+
+        assert response == {"detail": "Invalid cursor"}
+
+    def test_invalid_cursor(self, tenant, users):
+        assert get(tenant, cursor="not a cursor") == {"detail": "Invalid cursor"}
+
+    @pytest.mark.parametrize(
+        "position",
+        [{"v": 1}, {"v": None}, {"v": ["2024-01-01"]}, {"i": "1"}, {"i": [1]}],
+    )
+    def test_forged_cursor(self, tenant, users, position):
+        cursor = {"v": "2024-01-01T00:00:00+00:00", "i": 1, "r": 0, "t": tenant.pk}
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor | position).encode())
+
+        assert get(tenant, cursor=encoded.decode()) == {"detail": "Invalid cursor"}
+
+    def test_count(self, tenant, users):
+        page = get(tenant, count="true")
+
+        assert isinstance(page["count"], int)
+        assert list(page)[-1] == "results"
+
+
+@pytest.mark.django_db
+class TestEstimateCount:
+
+    def test_counts_small_querysets_exactly(self, users):
+        with CaptureQueriesContext(connection) as queries:
+            assert estimate_count(User.objects.all()) == len(users)
+
+        assert "COUNT(" in queries[-1]["sql"]
+
+    def test_estimates_tables_from_pg_class(self):
+        TenantFactory.create_batch(5)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tenant_tenant")
+
+        with CaptureQueriesContext(connection) as queries:
+            assert estimate_count(Tenant.objects.all(), threshold=0) == 5
+
+        assert len(queries) == 1
+        assert "pg_class" in queries[0]["sql"]
+
+    def test_estimates_filtered_querysets_from_the_plan(self, tenant, users):
+        with CaptureQueriesContext(connection) as queries:
+            count = estimate_count(User.objects.filter(tenant=tenant), threshold=0)
+
+        assert count > 0
+        assert queries[-1]["sql"].startswith("EXPLAIN")
+
+    def test_paginator(self, users):
+        paginator = EstimatedCountPaginator(User.objects.order_by("pk"), 3)
+
+        assert paginator.count == len(users)
+        assert paginator.num_pages == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "changelist", ["user_user", "tenant_tenant", "tenant_tenantpayment"]
+)
+def test_admin_changelists_do_not_count(client, settings, changelist):
+    settings.ESTIMATED_COUNT_THRESHOLD = 0
+    client.force_login(UserFactory.create_superuser())
+    url = reverse(f"admin:{changelist}_changelist")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"created_at__gte": "2000-01-01"})
+
+    assert response.status_code == 200
+    assert not [query for query in queries if "COUNT(" in query["sql"]]
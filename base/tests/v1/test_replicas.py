@@ -0,0 +1,150 @@
+import pytest
+
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from base.middleware import PIN_COOKIE_NAME, ReplicaPinningMiddleware
+from base.routers import ReplicaRouter, pin_state, use_primary
+from tenant.models import Tenant
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+
+DATABASES = ["default", "replica"]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+class TestReplicaRouter:
+
+    def test_without_replicas_everything_uses_default(self, settings):
+        settings.DATABASE_REPLICAS = []
+
+        assert ReplicaRouter().db_for_read(User) is None
+
+    def test_reads_go_to_replicas(self, replicas):
+        assert ReplicaRouter().db_for_read(User) == "replica"
+
+    def test_writes_go_to_primary_and_pin_the_request(self, replicas):
+        router = ReplicaRouter()
+
+        with pin_state() as state:
+            assert router.db_for_write(User) == "default"
+            assert router.db_for_read(User) == "default"
+
+        assert state.wrote
+        assert router.db_for_read(User) == "replica"
+
+    def test_use_primary(self, replicas):
+        with use_primary():
+            assert ReplicaRouter().db_for_read(User) == "default"
+
+    def test_replicas_are_never_migrated(self, replicas):
+        router = ReplicaRouter()
+
+        assert router.allow_migrate("replica", "user") is False
+        assert router.allow_migrate("default", "user") is None
+
+
+# The `replica` test database never receives the primary's writes (see
+# conftest.py), so reads that reach it don't see rows created in the test.
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+class TestReplicaReads:
+
+    def test_reads_use_the_replica(self, replicas):
+        TenantFactory()
+
+        assert not Tenant.objects.exists()
+        assert Tenant.objects.using("default").exists()
+
+    def test_reads_inside_a_transaction_use_the_primary(self, replicas):
+        TenantFactory()
+
+        with transaction.atomic():
+            assert Tenant.objects.exists()
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+class TestReplicaPinningMiddleware:
+
+    def test_write_sets_pin_cookie(self, replicas, settings):
+        def view(request):
+            TenantFactory()
+            return HttpResponse("ok")
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().get("/"))
+
+        cookie = response.cookies[PIN_COOKIE_NAME]
+        assert cookie["max-age"] == settings.DATABASE_REPLICA_PIN_SECONDS
+        assert cookie["httponly"]
+
+    def test_reads_do_not_set_pin_cookie(self, replicas):
+        def view(request):
+            Tenant.objects.exists()
+            return HttpResponse("ok")
+
+        response = ReplicaPinningMiddleware(view)(RequestFactory().get("/"))
+
+        assert PIN_COOKIE_NAME not in response.cookies
+
+    def test_pinned_client_reads_from_primary(self, replicas):
+        TenantFactory()
+        seen = []
+
+        def view(request):
+            seen.append(Tenant.objects.exists())
+            return HttpResponse("ok")
+
+        request = RequestFactory().get("/")
+        request.COOKIES[PIN_COOKIE_NAME] = "1"
+        ReplicaPinningMiddleware(view)(request)
+
+        assert seen == [True]
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+class TestReadYourWrites:
+
+    @pytest.fixture
+    def tenant(self, replicas):
+        # Tenant resolution reads from the primary, so requests find the
+        # tenant even though the replica can't see it.
+        return TenantFactory(subdomain="acme")
+
+    def register_and_login(self, client, forget_cookies=False):
+        credentials = {"email": "new@acme.com", "password": "Testing@123"}
+        response = client.post(
+            reverse("register-user"),
+            credentials,
+            format="json",
+            HTTP_HOST="acme.localhost",
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+        if forget_cookies:
+            client.cookies.clear()
+        return client.post(
+            reverse("login-user"),
+            credentials,
+            format="json",
+            HTTP_HOST="acme.localhost",
+        )
+
+    def test_login_right_after_registration(self, tenant):
+        response = self.register_and_login(APIClient())
+
+        assert response.status_code == status.HTTP_200_OK
+        assert User.objects.using("default").filter(email="new@acme.com").exists()
+
+    def test_without_the_pin_login_hits_the_lagging_replica(self, tenant):
+        client = APIClient()
+        response = self.register_and_login(client, forget_cookies=True)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import pytest
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from base.throttling import TenantRateThrottle
+from tenant.models import Tenant
+from tenant.tests.v1.factories import TenantFactory
+
+
+@pytest.fixture
+def rates(settings):
+    settings.THROTTLE_PLAN_RATES = {
+        Tenant.PlanChoices.FREE: {"anon": "2/min", "auth": "1/min"},
+        Tenant.PlanChoices.PRO: {"anon": "5/min"},
+    }
+
+
+def throttle_request(tenant, ip="10.0.0.1", scope=None, **headers):
+    request = APIRequestFactory().get("/", REMOTE_ADDR=ip, **headers)
+    request.tenant = tenant
+    request.user = None
+    return (
+        TenantRateThrottle().allow_request(
+            request, SimpleNamespace(throttle_scope=scope)
+        ),
+        request,
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("redis_cache", "rates")
+class TestTenantRateThrottle:
+
+    def test_limit_follows_the_plan(self):
+        free = TenantFactory(plan=Tenant.PlanChoices.FREE)
+        pro = TenantFactory(plan=Tenant.PlanChoices.PRO)
+
+        assert [throttle_request(free)[0] for _ in range(3)] == [True, True, False]
+        assert all(throttle_request(pro)[0] for _ in range(5))
+
+    def test_clients_are_counted_apart(self):
+        tenant, other = TenantFactory(), TenantFactory()
+        throttle_request(tenant)
+        throttle_request(tenant)
+
+        assert throttle_request(tenant, ip="10.0.0.2")[0]
+        assert throttle_request(other)[0]
+        assert throttle_request(tenant, scope="auth")[0]
+
+    def test_forwarded_for_cant_be_forged(self):
+        tenant = TenantFactory()
+
+        allowed = [
+            throttle_request(tenant, HTTP_X_FORWARDED_FOR=f"192.0.2.{index}")[0]
+            for index in range(3)
+        ]
+
+        assert allowed == [True, True, False]
+
+    def test_clients_behind_the_proxy(self, settings):
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, "NUM_PROXIES": 1}
+        tenant = TenantFactory()
+
+        def through_nginx(client, forged):
+            # nginx appends the address the request came from
+            forwarded_for = f"{forged}, {client}"
+            return throttle_request(
+                tenant, ip="172.18.0.5", HTTP_X_FORWARDED_FOR=forwarded_for
+            )[0]
+
+        allowed = [through_nginx("203.0.113.7", f"192.0.2.{i}") for i in range(3)]
+        assert allowed == [True, True, False]
+        assert through_nginx("203.0.113.8", "192.0.2.1")
+
+    def test_quota_is_recorded(self):
+        tenant = TenantFactory()
+
+        _, request = throttle_request(tenant)
+
+        assert request.rate_limit.headers == {
+            "RateLimit-Limit": "2",
+            "RateLimit-Remaining": "1",
+            "RateLimit-Reset": "30",
+        }
+
+    def test_scopes_without_rate_are_not_limited(self):
+        tenant = TenantFactory(plan=Tenant.PlanChoices.PRO)
+
+        assert all(throttle_request(tenant, scope="auth")[0] for _ in range(10))
+
+    def test_throttled_login(self):
+        tenant = TenantFactory()
+        client = APIClient()
+
+        def login():
+            return client.post(
+                reverse("login-user"),
+                {"email": "nobody@example.com", "password": "Password123!"},
+                format="json",
+                HTTP_HOST=f"{tenant.subdomain}.localhost",
+            )
+
+        assert login().status_code == status.HTTP_401_UNAUTHORIZED
+        response = login()
+
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response["RateLimit-Remaining"] == "0"
+        assert 0 < int(response["Retry-After"]) <= 60
+
+
+def test_without_redis_requests_are_allowed(rates):
+    assert throttle_request(None)[0]
@@ -0,0 +1,154 @@
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from django.conf import settings
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+# Generic cell rate algorithm: the key holds the "theoretical arrival time"
+# (TAT, in ms) of the next request. Each request pushes it `interval` ms
+# further; a request is refused when that would put the TAT more than
+# `period` ms ahead of now. One key per client, one round trip, atomic.
+#
+# Returns {allowed, remaining, reset ms, retry after ms}.
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local period = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), math.ceil(new_tat - now), 0}
+"""
+
+
+@dataclass
+class RateLimit:
+    """Quota of the request's client, sent back as `RateLimit-*` headers."""
+
+    limit: int
+    remaining: int
+    reset: int
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+        }
+
+
+class TenantRateThrottle(SimpleRateThrottle):
+    """
+    Rate limit per `(tenant, user or IP, scope)` with the tenant's plan's
+    rates.
+
+    The scope is the view's `throttle_scope`, else `user` or `anon`; rates
+    come from `THROTTLE_PLAN_RATES[tenant.plan][scope]`, and from
+    `DEFAULT_THROTTLE_RATES` for requests without a tenant. Scopes without
+    a rate aren't limited.
+
+    Requests are counted with `GCRA_SCRIPT` in the Redis of
+    `THROTTLE_CACHE`, which unlike DRF's cache throttles doesn't race
+    between concurrent requests nor store every request's timestamp. The
+    client's quota is kept on the request as `rate_limit` for
+    `RateLimitHeadersMiddleware`. When Redis isn't available requests are
+    let through.
+    """
+
+    cache_format = "throttle:%(tenant)s:%(scope)s:%(ident)s"
+    _script = None
+
+    def __init__(self):
+        # The rate depends on the request's tenant, see `allow_request()`
+        self.retry_after: Optional[float] = None
+
+    @classmethod
+    def get_script(cls, client):
+        if cls._script is None:
+            cls._script = client.register_script(GCRA_SCRIPT)
+        return cls._script
+
+    @staticmethod
+    def get_scope(request, view) -> str:
+        scope = getattr(view, "throttle_scope", None)
+        if scope:
+            return scope
+        return "user" if request.user and request.user.is_authenticated else "anon"
+
+    @staticmethod
+    def get_rates(tenant) -> Dict[str, Optional[str]]:
+        if tenant is None:
+            return api_settings.DEFAULT_THROTTLE_RATES
+        return settings.THROTTLE_PLAN_RATES.get(tenant.plan, {})
+
+    def get_cache_key(self, request, view) -> str:
+        tenant = getattr(request, "tenant", None)
+        if request.user and request.user.is_authenticated:
+            ident = f"user:{request.user.pk}"
+        else:
+            ident = f"ip:{self.get_ident(request)}"
+        return self.cache_format % {
+            "tenant": tenant.pk if tenant else "none",
+            "scope": self.scope,
+            "ident": ident,
+        }
+
+    def allow_request(self, request, view) -> bool:
+        tenant = getattr(request, "tenant", None)
+        self.scope = self.get_scope(request, view)
+        rate = self.get_rates(tenant).get(self.scope)
+        if rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(rate)
+
+        try:
+            client = get_redis_connection(settings.THROTTLE_CACHE)
+        except NotImplementedError:
+            # Not a Redis cache (e.g. tests' locmem), throttling is off
+            return True
+        period = self.duration * 1000
+        try:
+            allowed, remaining, reset, retry_after = self.get_script(client)(
+                keys=[self.get_cache_key(request, view)],
+                args=[int(time.time() * 1000), period / self.num_requests, period],
+                client=client,
+            )
+        except RedisError:
+            logger.warning("Unable to throttle the request.", exc_info=True)
+            return True
+
+        self.retry_after = retry_after / 1000
+        self.record(
+            request, RateLimit(self.num_requests, remaining, math.ceil(reset / 1000))
+        )
+        return bool(allowed)
+
+    @staticmethod
+    def record(request, rate_limit: RateLimit) -> None:
+        # Kept on the HttpRequest, which the middleware sees; with several
+        # throttles the one closest to its limit is reported
+        request = getattr(request, "_request", request)
+        current = getattr(request, "rate_limit", None)
+        if current is None or rate_limit.remaining < current.remaining:
+            request.rate_limit = rate_limit
+
+    def wait(self) -> Optional[float]:
+        return self.retry_after
@@ -0,0 +1,216 @@
+"""
+Concurrent logins per worker, and what they do to other requests.
+
+Drives the ASGI application in-process, the way a single UvicornWorker
+serves it, with `--concurrency` logins in flight at a time while a probe
+requests a cheap sync view every 10 ms:
+
+- sync view: the previous DRF `LoginView`; it hashes on the one thread
+  that runs every sync view of the worker, so the probe queues behind it
+- async view: the current `LoginView`, hashing in `password_hashing_pool`
+- async view + argon2: the same with `Argon2PasswordHasher` preferred
+
+Usage:
+    python -m benchmarks.async_login [--logins 200] [--concurrency 16]
+        [--redis redis://localhost:6379/15]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from django.urls import path
+
+from benchmarks.utils import benchmark_database, percentile, print_table, setup_django
+
+PASSWORD = "Password123!"
+HOST = "acme.localhost"
+
+
+def previous_login_view():
+    from rest_framework.generics import GenericAPIView
+    from rest_framework.permissions import AllowAny
+    from rest_framework.response import Response
+
+    from auth.api.v1.serializers import CustomTokenObtainPairSerializer
+
+    class PreviousLoginView(GenericAPIView):
+        permission_classes = [AllowAny]
+        serializer_class = CustomTokenObtainPairSerializer
+
+        def post(self, request, *args, **kwargs):
+            serializer = self.get_serializer(
+                data=request.data, context={"tenant": request.tenant}
+            )
+            serializer.is_valid(raise_exception=True)
+            return Response(serializer.validated_data)
+
+    return PreviousLoginView.as_view()
+
+
+def probe_view(request):
+    from django.http import HttpResponse
+
+    return HttpResponse("ok")
+
+
+urlpatterns = []
+
+
+def create_users(count: int, hasher: str):
+    from django.contrib.auth.hashers import make_password
+
+    from tenant.models import Tenant
+    from user.models import User
+
+    tenant, _ = Tenant.objects.get_or_create(name="Acme", subdomain="acme")
+    password = make_password(PASSWORD, hasher=hasher)
+    User.objects.filter(tenant=tenant).delete()
+    User.objects.bulk_create(
+        User(
+            email=f"user-{index}@example.com",
+            username=f"user-{index}",
+            password=password,
+            tenant=tenant,
+        )
+        for index in range(count)
+    )
+
+
+async def request(app, method: str, path: str, body: bytes = b"") -> int:
+    """Send one request straight to the ASGI `app`; return the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", HOST.encode()),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": (HOST, 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def run_scenario(url: str, logins: int, concurrency: int):
+    from django.core.handlers.asgi import ASGIHandler
+
+    app = ASGIHandler()
+    queue = asyncio.Queue()
+    for index in range(logins):
+        queue.put_nowait(index)
+    probes = []
+    done = asyncio.Event()
+
+    async def worker():
+        while not queue.empty():
+            index = queue.get_nowait()
+            email = f"user-{index % concurrency}@example.com"
+            body = json.dumps({"email": email, "password": PASSWORD}).encode()
+            assert await request(app, "POST", url, body) == 200
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await request(app, "GET", "/probe")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+
+    probing = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probing
+
+    return [
+        logins / elapsed,
+        statistics.fmean(probes) * 1e3,
+        percentile(probes, 50) * 1e3,
+        percentile(probes, 99) * 1e3,
+    ]
+
+
+def run(logins: int, concurrency: int, redis_url: str) -> None:
+    from asgiref.sync import async_to_sync
+
+    from django.conf import settings
+    from django.test import override_settings
+
+    from auth.api.v1.viewsets import LoginView
+
+    urlpatterns[:] = [
+        path("sync-login", previous_login_view()),
+        path("async-login", LoginView.as_view()),
+        path("probe", probe_view),
+    ]
+    scenarios = [
+        ("sync view", "/sync-login", "pbkdf2_sha256"),
+        ("async view", "/async-login", "pbkdf2_sha256"),
+        ("async view + argon2", "/async-login", "argon2"),
+    ]
+
+    # The production middleware: development adds WhiteNoise, whose sync-only
+    # middleware would run every view on the sync thread
+    middleware = [
+        name for name in settings.MIDDLEWARE if not name.startswith("whitenoise.")
+    ]
+    caches = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": redis_url}
+    }
+    rows = []
+    for label, url, hasher in scenarios:
+        hashers = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+        if hasher == "argon2":
+            hashers.insert(0, "django.contrib.auth.hashers.Argon2PasswordHasher")
+        with override_settings(
+            ROOT_URLCONF=__name__,
+            ALLOWED_HOSTS=[HOST],
+            CACHES=caches,
+            MIDDLEWARE=middleware,
+            PASSWORD_HASHERS=hashers,
+        ):
+            create_users(concurrency, hasher)
+            stats = async_to_sync(run_scenario)(url, logins, concurrency)
+        rows.append([label, *stats])
+
+    print_table(
+        ["view", "logins/s", "probe mean ms", "probe p50 ms", "probe p99 ms"], rows
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--redis", default="redis://localhost:6379/15")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.logins, args.concurrency, args.redis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Login throughput on a single core, before and after `TenantModelBackend`.
+
+"before" is the previous `CustomTokenObtainPairSerializer`: a global email
+lookup, the full password hash and token issuance, and only then the
+tenant check. "after" is the current serializer, which passes the tenant
+to `authenticate()`. Scenarios:
+
+- valid: right tenant, right password
+- wrong tenant: right password, but the user belongs to another tenant
+- unknown: the email isn't registered anywhere
+
+Usage:
+    python -m benchmarks.auth_login [--users 100000] [--logins 20]
+"""
+
+import argparse
+import itertools
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    print_table,
+    setup_django,
+    summarize,
+)
+
+PASSWORD = "Password123!"
+
+
+def previous_serializer_class():
+    from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+    from rest_framework import serializers
+
+    class PreviousLoginSerializer(TokenObtainPairSerializer):
+        email = serializers.EmailField(required=True)
+        password = serializers.CharField(write_only=True)
+
+        def validate(self, attrs):
+            tenant = self.context.get("tenant")
+            attrs["username"] = attrs.get("email")
+            data = super().validate(attrs)
+            if self.user.tenant != tenant:
+                raise serializers.ValidationError(
+                    {"detail": "User does not belong to this tenant."}
+                )
+            return data
+
+    return PreviousLoginSerializer
+
+
+def create_users(count: int):
+    from django.contrib.auth.hashers import make_password
+
+    from tenant.models import Tenant
+    from user.models import User
+
+    acme = Tenant.objects.create(name="Acme", subdomain="acme")
+    globex = Tenant.objects.create(name="Globex", subdomain="globex")
+    password = make_password(PASSWORD)
+    for start in range(0, count, 5_000):
+        User.objects.bulk_create(
+            User(
+                email=f"user-{index}@example.com",
+                username=f"user-{index}",
+                password=password,
+                tenant=acme if index % 2 else globex,
+            )
+            for index in range(start, min(start + 5_000, count))
+        )
+    return acme
+
+
+def run(users: int, logins: int) -> None:
+    from rest_framework.exceptions import APIException, ValidationError
+
+    from auth.api.v1.serializers import CustomTokenObtainPairSerializer
+
+    acme = create_users(users)
+    emails = {
+        # Odd users belong to acme, even users to globex
+        "valid": [f"user-{index}@example.com" for index in range(1, users, 2)],
+        "wrong tenant": [f"user-{index}@example.com" for index in range(0, users, 2)],
+        "unknown": [f"missing-{index}@example.com" for index in range(logins)],
+    }
+
+    def login(serializer_class, names):
+        def attempt():
+            serializer = serializer_class(
+                data={"email": next(names), "password": PASSWORD},
+                context={"tenant": acme},
+            )
+            try:
+                serializer.is_valid(raise_exception=True)
+            except (APIException, ValidationError):
+                pass
+
+        return attempt
+
+    rows = []
+    for scenario, addresses in emails.items():
+        for label, serializer_class in (
+            ("before", previous_serializer_class()),
+            ("after", CustomTokenObtainPairSerializer),
+        ):
+            attempt = login(serializer_class, itertools.cycle(addresses))
+            stats = summarize(measure(attempt, logins))
+            per_second = 1e6 / stats["mean_us"]
+            rows.append([scenario, label, per_second, *stats.values()])
+
+    print_table(
+        ["scenario", "serializer", "logins/s", "mean µs", "p50 µs", "p99 µs"], rows
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.users, args.logins)
+
+
+if __name__ == "__main__":
+    main()
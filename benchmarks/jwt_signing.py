@@ -0,0 +1,89 @@
+"""
+Cost of signing and verifying an access token with each key type.
+
+Signing happens once per login/refresh in Django; verifying happens on
+every authenticated request, and with an asymmetric key it can happen in
+a gateway holding only the JWKS instead of in a Django worker.
+
+Usage:
+    python -m benchmarks.jwt_signing [--iterations 2000]
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.utils import measure, print_table, setup_django, summarize
+
+# Its outstand() is a no-op; the database one would insert an OutstandingToken
+BLACKLIST = "auth.utils.blacklist.RedisBlacklist"
+
+
+def write_keys(directory: Path):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    keys = {
+        "RS256": rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate(),
+        "ES256": ec.generate_private_key(ec.SECP256R1()),
+    }
+    paths = {"HS256": []}
+    for algorithm, key in keys.items():
+        path = directory / f"{algorithm}.pem"
+        path.write_bytes(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        paths[algorithm] = [str(path)]
+    return paths
+
+
+def run(iterations: int) -> None:
+    from django.test import override_settings
+
+    from auth.utils.tokens import AccessToken, RefreshToken
+
+    # Only the claims are read by RefreshToken.for_user
+    user = SimpleNamespace(
+        pk=1,
+        id=1,
+        tenant_id=1,
+        user_type="tenant",
+        is_staff=False,
+        is_superuser=False,
+        token_version=0,
+    )
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for algorithm, files in write_keys(Path(directory)).items():
+            with override_settings(
+                JWT_SIGNING_KEY_FILES=files, JWT_BLACKLIST_BACKEND=BLACKLIST
+            ):
+                access = RefreshToken.for_user(user).access_token
+                encoded = str(access)
+                sign = summarize(measure(lambda: str(access), iterations))
+                verify = summarize(
+                    measure(lambda: AccessToken(encoded, verify=True), iterations)
+                )
+            rows.append([algorithm, len(encoded), sign["mean_us"], verify["mean_us"]])
+
+    print_table(["algorithm", "token bytes", "sign µs", "verify µs"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2_000)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
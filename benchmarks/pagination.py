@@ -0,0 +1,138 @@
+"""
+List endpoint pagination cost at page 1 and page 10,000.
+
+A tenant with `--users` users is listed `--page-size` users at a time by
+`-created_at`, like a `BaseViewset` list endpoint:
+
+- page number: DRF's `PageNumberPagination`, a `COUNT(*)` plus `OFFSET`
+- estimated page number: `base.pagination.EstimatedCountPagination`, the
+  planner's estimate instead of the `COUNT(*)`
+- keyset: `base.pagination.KeysetPagination`, from the cursor a client
+  following `next` links would hold on that page
+- keyset + count: the same with `?count=true`, the planner's estimate
+
+Another tenant with as many users shares the table, so neither the count
+nor the scans can just read the whole table.
+
+Usage:
+    python -m benchmarks.pagination [--users 100100] [--page-size 10]
+        [--iterations 50]
+"""
+
+import argparse
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    print_table,
+    setup_django,
+    summarize,
+)
+
+DEEP_PAGE = 10_000
+
+
+def create_users(tenant, count: int) -> None:
+    from user.models import User
+
+    batch = []
+    for index in range(count):
+        batch.append(
+            User(
+                email=f"user-{index}@{tenant.subdomain}.com",
+                username=f"user-{index}",
+                password="!",
+                tenant=tenant,
+            )
+        )
+        if len(batch) == 10_000:
+            User.objects.bulk_create(batch)
+            batch = []
+    User.objects.bulk_create(batch)
+
+
+def make_request(tenant, **params):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get("/users/", params))
+    request.tenant = tenant
+    return request
+
+
+def run(users: int, page_size: int, iterations: int) -> None:
+    from django.db import connection
+
+    from rest_framework.pagination import PageNumberPagination
+
+    from base.api.v1.viewsets import BaseViewset
+    from base.pagination import EstimatedCountPagination, KeysetPagination
+    from tenant.models import Tenant
+    from user.models import User
+
+    tenant = Tenant.objects.create(name="Acme", subdomain="acme")
+    create_users(tenant, users)
+    create_users(Tenant.objects.create(name="Globex", subdomain="globex"), users)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE user_user")
+
+    queryset = User.objects.filter(tenant=tenant)
+    ordered = queryset.order_by("-created_at", "-pk")
+    view = BaseViewset()
+
+    def page_number(page, pagination_class=PageNumberPagination):
+        paginator = pagination_class()
+        paginator.page_size = page_size
+        request = make_request(tenant, page=page)
+        return lambda: paginator.paginate_queryset(ordered, request, view)
+
+    def keyset(page, **params):
+        if page > 1:
+            # Where the `next` link of page - 1 points
+            boundary = ordered[(page - 1) * page_size - 1]
+            paginator = KeysetPagination()
+            paginator.base_url = "/users/"
+            paginator.model, paginator.field = User, "created_at"
+            paginator.tenant_id = tenant.id
+            link = paginator.encode_cursor(boundary, reverse=False)
+            params["cursor"] = parse_qs(urlparse(link).query)["cursor"][0]
+        request = make_request(tenant, page_size=page_size, **params)
+        return lambda: KeysetPagination().paginate_queryset(queryset, request, view)
+
+    scenarios = [
+        ("page number", page_number),
+        (
+            "estimated page number",
+            lambda page: page_number(page, EstimatedCountPagination),
+        ),
+        ("keyset", keyset),
+        ("keyset + count", lambda page: keyset(page, count="true")),
+    ]
+    # Fewer --users than 10,000 pages measure the last full page instead
+    pages = (1, min(DEEP_PAGE, users // page_size))
+    rows = []
+    for label, paginate in scenarios:
+        for page in pages:
+            func = paginate(page)
+            assert len(func()) == page_size
+            stats = summarize(measure(func, iterations))
+            rows.append([label, f"{page:,}", stats["p50_us"], stats["p99_us"]])
+
+    print_table(["pagination", "page", "p50 µs", "p99 µs"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_100)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.users, args.page_size, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
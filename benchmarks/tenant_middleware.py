@@ -0,0 +1,114 @@
+"""
+Latency and throughput of TenantMiddleware on the ASGI request path.
+
+"before" runs the middleware as a sync-only middleware, adapted by
+Django's handler exactly as it is in an ASGI deployment: the middleware
+is wrapped in `sync_to_async` and the async view below it in
+`async_to_sync`. "after" awaits the async-capable middleware directly.
+
+Each simulated request runs inside its own `ThreadSensitiveContext`, as
+`django.core.handlers.asgi.ASGIHandler` does.
+
+Usage:
+    python -m benchmarks.tenant_middleware [--concurrency 50] [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.utils import benchmark_database, percentile, print_table, setup_django
+
+
+async def drive(handler, requests, concurrency: int):
+    """Send `requests` through `handler` from `concurrency` workers."""
+    from asgiref.sync import ThreadSensitiveContext
+
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    timings = []
+
+    async def worker():
+        while not queue.empty():
+            request = queue.get_nowait()
+            start = time.perf_counter()
+            async with ThreadSensitiveContext():
+                await handler(request)
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return timings, time.perf_counter() - start
+
+
+def build_handlers():
+    from django.core.handlers.base import BaseHandler
+    from django.http import HttpResponse
+
+    from tenant.middleware import TenantMiddleware
+
+    async def view(request):
+        return HttpResponse("ok")
+
+    class SyncOnlyTenantMiddleware(TenantMiddleware):
+        async_capable = False
+
+    adapt = BaseHandler().adapt_method_mode
+    before = adapt(
+        True,
+        SyncOnlyTenantMiddleware(adapt(False, view, True)),
+        False,
+        name="SyncOnlyTenantMiddleware",
+    )
+    after = TenantMiddleware(view)
+    return {"before (sync_to_async)": before, "after (async)": after}
+
+
+def run(concurrency: int, total: int) -> None:
+    from django.test import RequestFactory
+
+    from tenant.models import Tenant
+    from tenant.utils.resolver import tenant_resolver
+
+    subdomains = [f"tenant-{index}" for index in range(100)]
+    Tenant.objects.bulk_create(
+        Tenant(name=name, slug=name, subdomain=name) for name in subdomains
+    )
+    for subdomain in subdomains:
+        tenant_resolver.resolve(subdomain)
+
+    factory = RequestFactory()
+    rows = []
+    for label, handler in build_handlers().items():
+        requests = [
+            factory.get("/", HTTP_HOST=f"{subdomains[index % 100]}.localhost")
+            for index in range(total)
+        ]
+        timings, elapsed = asyncio.run(drive(handler, requests, concurrency))
+        rows.append(
+            [
+                label,
+                percentile(timings, 50) * 1e3,
+                percentile(timings, 99) * 1e3,
+                total / elapsed,
+            ]
+        )
+
+    print(f"{total:,} requests, concurrency {concurrency}")
+    print_table(["middleware", "p50 ms", "p99 ms", "req/s"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.concurrency, args.requests)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Tenant resolution cost at 10, 10k and 100k tenants.
+
+Compares the previous per-request `Tenant.objects.get(subdomain=...)` with
+each tier of `tenant.utils.resolver.TenantResolver`:
+
+- database: both cache tiers miss
+- shared: in-process LRU miss, `CACHES["default"]` hit
+- local: in-process LRU hit, over a hot set that fits in the LRU
+
+and, for subdomains that don't exist, the previous `DoesNotExist` round
+trip with the Bloom filter/negative cache in front of the database.
+
+Usage:
+    python -m benchmarks.tenant_resolution [--lookups 2000]
+"""
+
+import argparse
+import itertools
+import random
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    print_table,
+    setup_django,
+    summarize,
+)
+
+TENANT_COUNTS = (10, 10_000, 100_000)
+
+
+def create_tenants(count: int) -> list:
+    from tenant.models import Tenant
+    from tenant.utils.resolver import tenant_resolver
+
+    Tenant.objects.all().delete()
+    tenants = (
+        Tenant(
+            name=f"Tenant {index}",
+            slug=f"tenant-{index}",
+            subdomain=f"tenant-{index}",
+            policy="x" * 4096,
+        )
+        for index in range(count)
+    )
+    batch = []
+    for tenant in tenants:
+        batch.append(tenant)
+        if len(batch) == 5_000:
+            Tenant.objects.bulk_create(batch)
+            batch = []
+    Tenant.objects.bulk_create(batch)
+
+    # bulk_create bypasses the signals that keep the Bloom filter current
+    tenant_resolver.bloom.rebuild()
+    return [f"tenant-{index}" for index in range(count)]
+
+
+def run(lookups: int) -> None:
+    from django.core.cache import cache
+
+    from tenant.models import Tenant
+    from tenant.utils.resolver import tenant_resolver
+
+    rows = []
+    for count in TENANT_COUNTS:
+        subdomains = create_tenants(count)
+        sample = random.choices(subdomains, k=lookups)
+        hot_set = random.sample(subdomains, k=min(count, 256))
+        unknown = [f"unknown-{index}" for index in range(lookups)]
+
+        def baseline(names=itertools.cycle(sample)):
+            Tenant.objects.get(subdomain=next(names))
+
+        def cold(names=itertools.cycle(sample)):
+            name = next(names)
+            tenant_resolver.invalidate(subdomains=[name])
+            tenant_resolver.resolve(name)
+
+        def shared(names=itertools.cycle(sample)):
+            tenant_resolver.local.clear()
+            tenant_resolver.resolve(next(names))
+
+        def local(names=itertools.cycle(hot_set)):
+            tenant_resolver.resolve(next(names))
+
+        def baseline_unknown(names=itertools.cycle(unknown)):
+            try:
+                Tenant.objects.get(subdomain=next(names))
+            except Tenant.DoesNotExist:
+                pass
+
+        def resolver_unknown(names=itertools.cycle(unknown)):
+            tenant_resolver.resolve(next(names))
+
+        def warm_hot_set():
+            for name in hot_set:
+                tenant_resolver.resolve(name)
+
+        cache.clear()
+        tenant_resolver.clear()
+        for label, func in (
+            ("Tenant.objects.get", baseline),
+            ("resolver: database", cold),
+            ("resolver: shared", shared),
+            ("resolver: local", local),
+            ("unknown: Tenant.objects.get", baseline_unknown),
+            ("unknown: resolver", resolver_unknown),
+        ):
+            if func is local:
+                warm_hot_set()
+            stats = summarize(measure(func, lookups))
+            rows.append([f"{count:,}", label, *stats.values()])
+
+    print_table(["tenants", "strategy", "mean µs", "p50 µs", "p99 µs"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Throttle cost and accuracy under concurrent requests of one client.
+
+`--threads` threads send `--requests` requests in total for the same
+client, whose limit is `--limit` per hour:
+
+- drf cache: DRF's `AnonRateThrottle` over the Redis cache, which reads
+  the client's list of timestamps, appends to it and writes it back
+- tenant gcra: `TenantRateThrottle`, one atomic Lua script call
+
+"admitted" should equal the limit; anything above it is requests that
+got through because concurrent read-modify-writes overwrote each other.
+
+Usage:
+    python -m benchmarks.throttle [--requests 5000] [--threads 8]
+        [--limit 1000] [--redis redis://localhost:6379/15]
+"""
+
+import argparse
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.utils import print_table, setup_django
+
+
+def make_request(tenant):
+    from rest_framework.test import APIRequestFactory
+
+    request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+    request.tenant = tenant
+    request.user = None
+    return request
+
+
+def hammer(throttle_class, request, requests: int, threads: int):
+    view = SimpleNamespace(throttle_scope=None)
+    admitted = []
+    per_thread = requests // threads
+
+    def worker():
+        count = 0
+        for _ in range(per_thread):
+            count += throttle_class().allow_request(request, view)
+        admitted.append(count)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(admitted), per_thread * threads / elapsed, elapsed / requests * 1e6
+
+
+def run(requests: int, threads: int, limit: int, redis_url: str) -> None:
+    from django_redis import get_redis_connection
+
+    from django.core.cache import cache
+    from django.test import override_settings
+
+    from rest_framework.settings import api_settings
+    from rest_framework.throttling import AnonRateThrottle
+
+    from base.throttling import TenantRateThrottle
+    from tenant.models import Tenant
+
+    rate = f"{limit}/hour"
+    tenant = Tenant(pk=1, plan=Tenant.PlanChoices.FREE)
+    caches = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": redis_url}
+    }
+    scenarios = [("drf cache", AnonRateThrottle), ("tenant gcra", TenantRateThrottle)]
+
+    rows = []
+    with override_settings(
+        CACHES=caches,
+        THROTTLE_PLAN_RATES={Tenant.PlanChoices.FREE: {"anon": rate}},
+        REST_FRAMEWORK={"DEFAULT_THROTTLE_RATES": {"anon": rate}},
+    ):
+        # Both are bound when DRF is imported
+        AnonRateThrottle.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        AnonRateThrottle.cache = cache
+        for label, throttle_class in scenarios:
+            get_redis_connection("default").flushdb()
+            rows.append(
+                [
+                    label,
+                    *hammer(throttle_class, make_request(tenant), requests, threads),
+                ]
+            )
+        get_redis_connection("default").flushdb()
+
+    print_table(["throttle", "admitted", "checks/s", "µs/check"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=1_000)
+    parser.add_argument("--redis", default="redis://localhost:6379/15")
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.requests, args.threads, args.limit, args.redis)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Refresh token rotation throughput with each `JWT_BLACKLIST_BACKEND`.
+
+Every refresh verifies the token against the blacklist, blacklists it and
+issues a new one (`ROTATE_REFRESH_TOKENS` + `BLACKLIST_AFTER_ROTATION`):
+
+- database: an EXISTS on `BlacklistedToken`, up to two `OutstandingToken`
+  lookups/inserts and a `BlacklistedToken` insert per refresh
+- redis: an EXISTS and a SET with the token's remaining lifetime as TTL
+
+The database backend is measured with `--tokens` rows already in the
+outstanding/blacklist tables, since they grow until they are purged.
+
+Usage:
+    python -m benchmarks.token_refresh [--tokens 100000] [--refreshes 2000]
+        [--redis redis://localhost:6379/15]
+"""
+
+import argparse
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    print_table,
+    setup_django,
+    summarize,
+)
+
+BACKENDS = {
+    "database": "auth.utils.blacklist.DatabaseBlacklist",
+    "redis": "auth.utils.blacklist.RedisBlacklist",
+}
+
+
+def create_user():
+    from tenant.models import Tenant
+    from user.models import User
+
+    tenant = Tenant.objects.create(name="Acme", subdomain="acme")
+    return User.objects.create_user(
+        "user", email="user@example.com", password="x", tenant=tenant
+    )
+
+
+def fill_blacklist(user, count: int) -> None:
+    from rest_framework_simplejwt.token_blacklist.models import (
+        BlacklistedToken,
+        OutstandingToken,
+    )
+
+    from django.utils import timezone
+
+    expires_at = timezone.now() + timedelta(days=7)
+    for start in range(0, count, 5_000):
+        tokens = OutstandingToken.objects.bulk_create(
+            OutstandingToken(
+                user=user, jti=uuid.uuid4().hex, token="x", expires_at=expires_at
+            )
+            for _ in range(start, min(start + 5_000, count))
+        )
+        BlacklistedToken.objects.bulk_create(
+            BlacklistedToken(token=token) for token in tokens
+        )
+
+
+def run(tokens: int, refreshes: int, redis_url: str) -> None:
+    from django.test import override_settings
+
+    from auth.api.v1.serializers import CustomCookieTokenRefreshSerializer
+    from auth.utils.tokens import RefreshToken
+
+    user = create_user()
+    fill_blacklist(user, tokens)
+
+    rows = []
+    caches = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": redis_url}
+    }
+    for label, backend in BACKENDS.items():
+        with override_settings(JWT_BLACKLIST_BACKEND=backend, CACHES=caches):
+            current = {"refresh": str(RefreshToken.for_user(user))}
+            # The serializer reads the token from the request body
+            request = SimpleNamespace(data=current, COOKIES={})
+
+            def refresh():
+                serializer = CustomCookieTokenRefreshSerializer(
+                    data=current, context={"request": request}
+                )
+                serializer.is_valid(raise_exception=True)
+                current["refresh"] = serializer.validated_data["refresh"]
+
+            stats = summarize(measure(refresh, refreshes))
+            per_second = 1e6 / stats["mean_us"]
+            rows.append([label, per_second, *stats.values()])
+
+    print_table(["backend", "refreshes/s", "mean µs", "p50 µs", "p99 µs"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--refreshes", type=int, default=2_000)
+    parser.add_argument("--redis", default="redis://localhost:6379/15")
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.tokens, args.refreshes, args.redis)
+
+
+if __name__ == "__main__":
+    main()
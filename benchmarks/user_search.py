@@ -0,0 +1,140 @@
+"""
+User search cost at 1M users.
+
+`--users` users spread over `--tenants` tenants are searched for a whole
+name (a few hundred matches) and for a three letter prefix (thousands):
+
+- admin ilike: the previous `UserAdmin.search_fields`, an `ILIKE '%term%'`
+  per column across every tenant
+- admin vector: `SearchVectorAdminMixin`, the GIN indexed `search_vector`
+- api ilike: the same `ILIKE`s for one tenant, first page by `created_at`
+- api vector: `SearchUsersView`'s query for one tenant, first page ranked
+  by `ts_rank`
+
+Usage:
+    python -m benchmarks.user_search [--users 1000000] [--tenants 100]
+        [--iterations 20]
+"""
+
+import argparse
+import itertools
+import random
+
+from benchmarks.utils import (
+    benchmark_database,
+    measure,
+    print_table,
+    setup_django,
+    summarize,
+)
+
+SYLLABLES = [
+    "al", "an", "ar", "be", "da", "el", "fa", "gi", "ha", "is",
+    "ka", "la", "ma", "ne", "or", "pe", "ri", "sa", "to", "vi",
+]  # fmt: skip
+PAGE_SIZE = 10
+
+
+def name(rng: random.Random) -> str:
+    return "".join(rng.choices(SYLLABLES, k=3)).capitalize()
+
+
+def create_users(tenants: list, count: int) -> None:
+    from user.models import User
+
+    rng = random.Random(0)
+    batch = []
+    for index, tenant in zip(range(count), itertools.cycle(tenants)):
+        first_name, last_name = name(rng), name(rng)
+        batch.append(
+            User(
+                email=f"{first_name}.{last_name}.{index}@example.com".lower(),
+                username=f"user-{index}",
+                first_name=first_name,
+                last_name=last_name,
+                password="!",
+                tenant=tenant,
+            )
+        )
+        if len(batch) == 10_000:
+            User.objects.bulk_create(batch)
+            batch = []
+    User.objects.bulk_create(batch)
+
+
+def run(users: int, tenants: int, iterations: int) -> None:
+    from django.db import connection
+    from django.db.models import Q
+
+    from base.search import search, search_query
+    from tenant.models import Tenant
+    from user.models import User
+
+    all_tenants = Tenant.objects.bulk_create(
+        Tenant(name=f"Tenant {index}", subdomain=f"tenant-{index}")
+        for index in range(tenants)
+    )
+    create_users(all_tenants, users)
+    # Like autovacuum would: GIN indexes queue new rows in a pending list,
+    # scanned by every search until it's merged into the index
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM ANALYZE user_user")
+
+    tenant = all_tenants[0]
+    terms = {"name": name(random.Random(0)), "prefix": "kal"}
+
+    def ilike(term):
+        fields = ["username", "first_name", "last_name"]
+        return User.objects.filter(
+            Q(
+                *[Q(**{f"{field}__icontains": term}) for field in fields],
+                _connector="OR",
+            )
+        )
+
+    scenarios = [
+        ("admin ilike", lambda term: ilike(term).order_by("-created_at")),
+        (
+            "admin vector",
+            lambda term: User.objects.filter(search_vector=search_query(term)).order_by(
+                "-created_at"
+            ),
+        ),
+        (
+            "api ilike",
+            lambda term: ilike(term).filter(tenant=tenant).order_by("-created_at"),
+        ),
+        ("api vector", lambda term: search(User.objects.filter(tenant=tenant), term)),
+    ]
+
+    rows = []
+    for label, build in scenarios:
+        for kind, term in terms.items():
+            queryset = build(term)
+            matches = queryset.count()
+
+            def first_page(queryset=queryset):
+                list(queryset[:PAGE_SIZE])
+
+            stats = summarize(measure(first_page, iterations))
+            rows.append(
+                [label, f"{kind} {term!r}", matches, stats["p50_us"], stats["p99_us"]]
+            )
+
+    print_table(["search", "term", "matches", "p50 µs", "p99 µs"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--tenants", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with benchmark_database():
+        run(args.users, args.tenants, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Shared helpers for the scripts in `benchmarks/`.
+
+Every benchmark runs against a throwaway test database created from the
+configured `DATABASES["default"]`, so it never touches real data:
+
+    python -m benchmarks.tenant_resolution
+"""
+
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import django
+
+
+def setup_django() -> None:
+    """Configure Django the same way `manage.py` does."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.development")
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create an empty, migrated test database and drop it afterwards."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func: Callable[[], object], iterations: int) -> List[float]:
+    """Call `func` `iterations` times and return each duration in seconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings: Sequence[float], pct: float) -> float:
+    ordered = sorted(timings)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(timings: Sequence[float]) -> Dict[str, float]:
+    """Return mean/p50/p99 in microseconds."""
+    return {
+        "mean_us": statistics.fmean(timings) * 1e6,
+        "p50_us": percentile(timings, 50) * 1e6,
+        "p99_us": percentile(timings, 99) * 1e6,
+    }
+
+
+def print_table(headers: Sequence[str], rows: Iterable[Sequence[object]]) -> None:
+    """Print rows as a plain, aligned text table."""
+    rows = [
+        [f"{value:,.1f}" if isinstance(value, float) else str(value) for value in row]
+        for row in rows
+    ]
+    widths = [
+        max(len(str(header)), *(len(row[index]) for row in rows))
+        for index, header in enumerate(headers)
+    ]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(value.ljust(w) for value, w in zip(row, widths)))
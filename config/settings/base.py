@@ -63,11 +63,15 @@ LOCAL_APPS: list[str] = [
 
 INSTALLED_APPS += THIRD_PARTY_APPS + LOCAL_APPS
 
+# TenantMiddleware runs after the security/common redirects so requests that
+# are answered by those never pay for a tenant lookup.
 MIDDLEWARE = [
-    "tenant.middleware.TenantMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "base.middleware.ReplicaPinningMiddleware",
+    "base.middleware.RateLimitHeadersMiddleware",
+    "tenant.middleware.TenantMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
@@ -127,8 +131,52 @@ DATABASES = {
         "PASSWORD": env("DATABASE_PASSWORD", default="default_django_password"),
         "HOST": env("DATABASE_HOST", default="localhost"),
         "PORT": env.int("DATABASE_PORT", default=5432),
+        # Persistent connections; recommended with TENANT_ISOLATION="schema"
+        # so switching schemas doesn't pay for a new connection per request.
+        "CONN_MAX_AGE": env.int("DATABASE_CONN_MAX_AGE", default=0),
+        "CONN_HEALTH_CHECKS": env.bool("DATABASE_CONN_HEALTH_CHECKS", default=True),
+    }
+}
+
+# Read replicas: one alias per host in DATABASE_REPLICA_HOSTS, with the
+# same credentials as the primary. Reads go to a replica unless the client
+# wrote within the last DATABASE_REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS: list[str] = []
+for index, host in enumerate(env.list("DATABASE_REPLICA_HOSTS", default=[]), 1):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
     }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+DATABASE_REPLICA_PIN_SECONDS = env.int("DATABASE_REPLICA_PIN_SECONDS", default=15)
+
+# Tenant sharding: the default database plus one shard_<n> alias per host
+# in DATABASE_SHARD_HOSTS. Tenant and TenantDomain stay in default as the
+# global directory; rows with a tenant live on the tenant's shard.
+DATABASE_SHARDS: list[str] = []
+for index, host in enumerate(env.list("DATABASE_SHARD_HOSTS", default=[]), 1):
+    DATABASES[f"shard_{index}"] = {**DATABASES["default"], "HOST": host}
+    DATABASE_SHARDS.append(f"shard_{index}")
+if DATABASE_SHARDS:
+    DATABASE_SHARDS.insert(0, "default")
+
+# Models stored with their tenant's rows although they have no `tenant`
+# field, mapped to the lookup that reaches the tenant.
+TENANT_SHARDED_MODELS = {
+    "token_blacklist.OutstandingToken": "user__tenant",
+    "token_blacklist.BlacklistedToken": "token__user__tenant",
 }
+TENANT_GLOBAL_MODELS = ["tenant.TenantDomain"]
+# Each shard allocates ids from its own range so rows keep their primary
+# key when a tenant moves.
+TENANT_SHARD_ID_SPACING = 10**12
+
+DATABASE_ROUTERS = [
+    "tenant.routers.ShardRouter",
+    "base.routers.ReplicaRouter",
+    "tenant.routers.TenantSchemaRouter",
+]
 
 # Redis Cache
 CACHES = {
@@ -161,9 +209,63 @@ CELERYD_MAX_TASKS_PER_CHILD = os.getenv("CELERYD_MAX_TASKS_PER_CHILD", 100)
 CELERYD_PREFETCH_MULTIPLIER = os.getenv("CELERYD_PREFETCH_MULTIPLIER", 1)
 CELERY_TASK_RESULT_EXPIRES = os.getenv("CELERY_TASK_RESULT_EXPIRES", 600)
 
+# Logins buffer last_login in Redis; the beat task below writes them in bulk.
+# A login writes it directly when no flush happened for LAST_LOGIN_MAX_STALENESS
+# seconds, which bounds how stale last_login can get.
+LAST_LOGIN_FLUSH_INTERVAL = env.int("LAST_LOGIN_FLUSH_INTERVAL", default=30)
+LAST_LOGIN_MAX_STALENESS = env.int("LAST_LOGIN_MAX_STALENESS", default=120)
+LAST_LOGIN_FLUSH_BATCH_SIZE = env.int("LAST_LOGIN_FLUSH_BATCH_SIZE", default=1000)
+
+# Expired outstanding/blacklisted JWTs are deleted in batches of
+# TOKEN_PURGE_BATCH_SIZE rows, pausing TOKEN_PURGE_PAUSE seconds in between.
+TOKEN_PURGE_INTERVAL = env.int("TOKEN_PURGE_INTERVAL", default=3600)
+TOKEN_PURGE_BATCH_SIZE = env.int("TOKEN_PURGE_BATCH_SIZE", default=5000)
+TOKEN_PURGE_PAUSE = env.float("TOKEN_PURGE_PAUSE", default=0.5)
+
+# The Bloom filter of tenant subdomains is rebuilt every
+# TENANT_BLOOM_REBUILD_INTERVAL seconds to drop deleted tenants; new ones are
+# added as they're created.
+TENANT_BLOOM_REBUILD_INTERVAL = env.int("TENANT_BLOOM_REBUILD_INTERVAL", default=3600)
+
+CELERY_BEAT_SCHEDULE = {
+    "flush-last-logins": {
+        "task": "user.tasks.flush_last_logins",
+        "schedule": LAST_LOGIN_FLUSH_INTERVAL,
+    },
+    "purge-expired-tokens": {
+        "task": "user.tasks.purge_expired_tokens",
+        "schedule": TOKEN_PURGE_INTERVAL,
+    },
+    "rebuild-subdomain-filter": {
+        "task": "tenant.tasks.rebuild_subdomain_filter",
+        "schedule": TENANT_BLOOM_REBUILD_INTERVAL,
+    },
+}
+
 # Optional: Configure the cache timeout (default is 300 seconds)
 CACHE_TTL = os.getenv("CACHE_TTL", 300)
 
+# Tenant resolution cache: a per-process LRU in front of CACHES["default"]
+TENANT_CACHE_TIMEOUT = env.int("TENANT_CACHE_TIMEOUT", default=300)
+TENANT_LOCAL_CACHE_SIZE = env.int("TENANT_LOCAL_CACHE_SIZE", default=1024)
+TENANT_LOCAL_CACHE_TTL = env.int("TENANT_LOCAL_CACHE_TTL", default=30)
+
+# Unknown subdomains: short-lived negative entries and a shared Bloom filter
+TENANT_NEGATIVE_CACHE_TTL = env.int("TENANT_NEGATIVE_CACHE_TTL", default=60)
+TENANT_BLOOM_ERROR_RATE = env.float("TENANT_BLOOM_ERROR_RATE", default=0.01)
+TENANT_BLOOM_CHECK_INTERVAL = env.int("TENANT_BLOOM_CHECK_INTERVAL", default=5)
+
+# How often each worker checks whether another one changed a TenantDomain
+TENANT_DOMAIN_INDEX_CHECK_INTERVAL = env.int(
+    "TENANT_DOMAIN_INDEX_CHECK_INTERVAL", default=5
+)
+
+# Tenant isolation: "shared" keeps every tenant in the same tables, "schema"
+# moves the apps listed in TENANT_SCHEMA_APPS into one Postgres schema per
+# tenant. Everything else (tenants, payments, users, tokens) stays in public.
+TENANT_ISOLATION = env.str("TENANT_ISOLATION", default="shared")
+TENANT_SCHEMA_APPS = env.list("TENANT_SCHEMA_APPS", default=[])
+
 # Logging
 # https://docs.djangoproject.com/en/3.1/topics/logging/
 
@@ -236,6 +338,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# New hashes use the first hasher; logins upgrade hashes made by the others.
+# Argon2 is opt-in since existing PBKDF2 hashes are rehashed on login.
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if env.bool("PASSWORD_HASHER_ARGON2", default=False):
+    # Move Argon2 first, keeping the others' order
+    PASSWORD_HASHERS.sort(
+        key=lambda hasher: not hasher.endswith(".Argon2PasswordHasher")
+    )
+
+# Async login/registration hash passwords in a pool of this many threads and
+# answer 503 once PASSWORD_HASHING_MAX_PENDING hashes are queued or running.
+PASSWORD_HASHING_WORKERS = env.int("PASSWORD_HASHING_WORKERS", default=2)
+PASSWORD_HASHING_MAX_PENDING = env.int("PASSWORD_HASHING_MAX_PENDING", default=32)
+
+# Bulk user imports insert USER_IMPORT_BATCH_SIZE rows at a time and hash their
+# passwords in a pool of USER_IMPORT_WORKERS processes (0 hashes inline).
+USER_IMPORT_BATCH_SIZE = env.int("USER_IMPORT_BATCH_SIZE", default=500)
+USER_IMPORT_WORKERS = env.int("USER_IMPORT_WORKERS", default=os.cpu_count() or 1)
+
 # DOMAIN SETTINGS
 MAIN_DOMAIN = env.str("MAIN_DOMAIN")
 
@@ -245,15 +372,43 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "dj_rest_auth.jwt_auth.JWTCookieAuthentication",
+        "auth.authentication.ClaimsJWTAuthentication",
         "oauth2_provider.contrib.rest_framework.OAuth2Authentication",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
-    "DEFAULT_THROTTLE_RATES": {"anon": "50/hour", "user": "100/hour"},
+    "DEFAULT_PAGINATION_CLASS": "base.pagination.EstimatedCountPagination",
+    "DEFAULT_THROTTLE_CLASSES": ["base.throttling.TenantRateThrottle"],
+    # Rates of requests without a tenant, see THROTTLE_PLAN_RATES
+    "DEFAULT_THROTTLE_RATES": {"anon": "50/hour", "user": "100/hour", "auth": "10/min"},
     "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
     "PAGE_SIZE": 10,
+    # Reverse proxies in front of the app (1 behind config/nginx). Throttles
+    # identify anonymous clients by the X-Forwarded-For address the nearest
+    # proxy appended; with 0, by REMOTE_ADDR, as clients can forge the header.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+}
+# Querysets of more rows than this are counted by the planner's estimate
+# rather than COUNT(*), see base.pagination.estimate_count
+ESTIMATED_COUNT_THRESHOLD = env.int("ESTIMATED_COUNT_THRESHOLD", default=10_000)
+
+# Rates of TenantRateThrottle by tenant plan and scope: `user` and `anon` by
+# default, or the view's `throttle_scope` (`auth` for login/registration, per
+# IP). A scope without a rate isn't limited.
+THROTTLE_PLAN_RATES = {
+    "free": {"anon": "50/hour", "user": "100/hour", "auth": "10/min"},
+    "basic": {"anon": "100/hour", "user": "1000/hour", "auth": "20/min"},
+    "pro": {"anon": "500/hour", "user": "5000/hour", "auth": "60/min"},
+    "enterprise": {"anon": "1000/hour", "user": "20000/hour", "auth": "120/min"},
 }
+# Cache alias of the Redis counting requests
+THROTTLE_CACHE = env.str("THROTTLE_CACHE", default="default")
+
+# Tenant logins are handled by TenantModelBackend; the admin and any call
+# without a tenant fall through to the default ModelBackend.
+AUTHENTICATION_BACKENDS = [
+    "auth.backends.TenantModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
@@ -263,8 +418,40 @@ SIMPLE_JWT = {
     "UPDATE_LAST_LOGIN": True,
     "TOKEN_OBTAIN_SERIALIZER": "auth.api.v1.serializers.CustomTokenObtainPairSerializer",
     "TOKEN_REFRESH_SERIALIZER": "auth.api.v1.serializers.CustomCookieTokenRefreshSerializer",
+    "AUTH_TOKEN_CLASSES": ("auth.utils.tokens.AccessToken",),
 }
 
+# A refresh token rotated less than REFRESH_GRACE_SECONDS ago (0 disables)
+# refreshes to the same new pair, so concurrent refreshes (e.g. two tabs)
+# don't fail; the second waits up to REFRESH_GRACE_WAIT seconds for the first.
+# The wait polls the cache in a sleeping thread, so each waiting refresh
+# holds a sync worker (or a sync_to_async thread under ASGI) for that long:
+# keep it close to the time a refresh takes, not to the grace period.
+REFRESH_GRACE_SECONDS = env.int("REFRESH_GRACE_SECONDS", default=10)
+REFRESH_GRACE_WAIT = env.float("REFRESH_GRACE_WAIT", default=1.0)
+REFRESH_GRACE_CACHE = env.str("REFRESH_GRACE_CACHE", default="default")
+
+# PEM keys (RSA, Ed25519 or EC P-256) signing JWTs instead of SECRET_KEY.
+# The first, private key signs; all of them verify and are published at
+# /.well-known/jwks.json, cached by clients for JWKS_MAX_AGE seconds. To
+# rotate, append the new key, wait JWKS_MAX_AGE, then move it first; drop the
+# old key once ACCESS/REFRESH_TOKEN_LIFETIME has passed. JWT_ACCEPT_HMAC keeps
+# accepting HS256 tokens (no `kid`) signed before the switch.
+JWT_SIGNING_KEY_FILES = env.list("JWT_SIGNING_KEY_FILES", default=[])
+JWT_ACCEPT_HMAC = env.bool("JWT_ACCEPT_HMAC", default=True)
+JWKS_MAX_AGE = env.int("JWKS_MAX_AGE", default=86400)
+
+# How long each user's token_version is cached for JWT authentication
+TOKEN_VERSION_CACHE_TIMEOUT = env.int("TOKEN_VERSION_CACHE_TIMEOUT", default=300)
+
+# Where revoked refresh tokens are kept: the token_blacklist tables
+# ("auth.utils.blacklist.DatabaseBlacklist") or Redis keys expiring with each
+# token ("auth.utils.blacklist.RedisBlacklist"). Run `migrate_token_blacklist`
+# when switching to Redis so tokens revoked before the switch stay revoked.
+JWT_BLACKLIST_BACKEND = env.str(
+    "JWT_BLACKLIST_BACKEND", default="auth.utils.blacklist.DatabaseBlacklist"
+)
+
 REST_AUTH = {
     "USE_JWT": True,
     "JWT_AUTH_SECURE": True,
@@ -307,6 +494,9 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Custom User
 AUTH_USER_MODEL = "user.User"
+# User.email is unique per tenant (ignoring case), not on its own; see
+# UserManager.get_by_natural_key for the lookups that don't know the tenant.
+SILENCED_SYSTEM_CHECKS = ["auth.W004"]
 
 # AWS Settings
 AWS_DEFAULT_ACL = env.str("AWS_DEFAULT_ACL", default="private")
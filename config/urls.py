@@ -1,10 +1,13 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from auth.views import JWKSView
 
 API_PREFIX = "api/v1/"
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path(".well-known/jwks.json", JWKSView.as_view(), name="jwks"),
     path(API_PREFIX, include("auth.api.v1.routers")),
+    path(API_PREFIX, include("user.api.v1.routers")),
 ]
@@ -8,3 +8,8 @@ os.environ.setdefault(
 )
 
 application = get_wsgi_application()
+
+# Build the custom domain index before the worker serves its first request
+from tenant.utils.hosts import host_index  # noqa: E402
+
+host_index.warm()
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from django.conf import settings
+from django.core.cache import caches
+
+from tenant.utils.hosts import host_index
+from tenant.utils.resolver import tenant_resolver
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Add `replica` and `shard` aliases for the database router tests. Each is
+    a separate test database; the replica never receives the primary's
+    writes, i.e. it's a replica that hasn't caught up yet.
+    """
+    default = settings.DATABASES["default"]
+    for alias in ("replica", "shard"):
+        settings.DATABASES[alias] = {
+            **default,
+            "TEST": {**default["TEST"], "NAME": f"test_{default['NAME']}_{alias}"},
+        }
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(settings):
+    """
+    Give every test an empty in-memory cache.
+
+    Cached tenants and domains would otherwise outlive the rolled back test transaction
+    and leak between tests.
+    """
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "tests",
+        }
+    }
+    tenant_resolver.clear()
+    host_index.clear()
+    yield
+    caches["default"].clear()
+    tenant_resolver.clear()
+    host_index.clear()
+
+
+@pytest.fixture
+def redis_cache(settings):
+    """
+    Point `CACHES["default"]` at the Redis of `REDIS_TEST_URL` and return
+    its client, emptied before and after the test. Skips the test when no
+    Redis is reachable.
+    """
+    url = os.environ.get("REDIS_TEST_URL", "redis://localhost:6379/15")
+    settings.CACHES = {
+        "default": {"BACKEND": "django_redis.cache.RedisCache", "LOCATION": url}
+    }
+    try:
+        client = get_redis_connection("default")
+        client.ping()
+    except RedisError:
+        pytest.skip(f"Redis is not available at {url}")
+
+    client.flushdb()
+    yield client
+    client.flushdb()
@@ -1,29 +1,28 @@
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
 
-from tenant.models import Tenant, TenantPayment
+from base.pagination import EstimatedCountPaginator
+from base.search import SearchVectorAdminMixin
+from tenant.models import Tenant, TenantDomain, TenantPayment
+from tenant.utils.shards import get_shard
 from user.models import User
+from user.utils.token_version import revoke_tenant_tokens
 
+# Newest users shown on the tenant page; the rest are on the user changelist
+USERS_PANEL_SIZE = 10
 
-class InlineUserAdmin(admin.TabularInline):
-    """Inline admin interface for User model within Tenant admin."""
 
-    model = User
+class InlineTenantDomainAdmin(admin.TabularInline):
+    """Inline admin interface for TenantDomain model within Tenant admin."""
+
+    model = TenantDomain
     extra = 0
-    fields = ("username", "email", "first_name", "last_name", "is_active", "is_staff")
-    readonly_fields = (
-        "username",
-        "email",
-        "first_name",
-        "last_name",
-        "is_active",
-        "is_staff",
-    )
-    can_delete = True
-    show_change_link = True
+    fields = ("domain", "is_primary", "is_active")
 
 
 @admin.register(Tenant)
-class TenantAdmin(admin.ModelAdmin):
+class TenantAdmin(SearchVectorAdminMixin, admin.ModelAdmin):
     """Admin interface for Tenant model."""
 
     list_display = (
@@ -34,12 +33,56 @@ class TenantAdmin(admin.ModelAdmin):
         "updated_at",
         "is_active",
     )
+    # Searched through Tenant.search_vector, see SearchVectorAdminMixin
     search_fields = ("name", "subdomain")
     ordering = ("-created_at",)
     list_filter = ("created_at", "updated_at")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("created_at", "updated_at", "users_panel")
+    autocomplete_fields = ("created_by", "updated_by", "deleted_by")
+
+    inlines = [InlineTenantDomainAdmin]
+    actions = ["revoke_tokens"]
+    # COUNT(*) is estimated on large tables, and not run again unfiltered
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description="Users")
+    def users_panel(self, tenant):
+        """
+        Link the tenant's newest users and the user changelist filtered on
+        the tenant, which pages through the others, instead of rendering
+        every user in an inline.
+        """
+        if tenant.pk is None:
+            return "-"
+        users = (
+            User._base_manager.using(get_shard(tenant))
+            .filter(tenant_id=tenant.pk)
+            .only("pk", "email")
+            .order_by("-created_at")[:USERS_PANEL_SIZE]
+        )
+        changelist = reverse("admin:user_user_changelist")
+        return format_html(
+            '<ul>{}</ul><a href="{}?tenant__id__exact={}">View all users</a>',
+            format_html_join(
+                "",
+                '<li><a href="{}">{}</a></li>',
+                (
+                    (reverse("admin:user_user_change", args=[user.pk]), user.email)
+                    for user in users
+                ),
+            ),
+            changelist,
+            tenant.pk,
+        )
 
-    inlines = [InlineUserAdmin]
+    @admin.action(description="Log all users of selected tenants out")
+    def revoke_tokens(self, request, queryset):
+        for tenant in queryset:
+            revoke_tenant_tokens(tenant)
+        self.message_user(
+            request, f"Logged out the users of {len(queryset)} tenant(s)."
+        )
 
 
 @admin.register(TenantPayment)
@@ -60,3 +103,9 @@ class TenantPaymentAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     list_filter = ("status", "provider", "created_at")
     readonly_fields = ("created_at", "updated_at")
+    # TenantPayment.__str__ and the tenant column read the tenant's name
+    list_select_related = ("tenant",)
+    autocomplete_fields = ("tenant", "created_by", "updated_by", "deleted_by")
+    # COUNT(*) is estimated on large tables, and not run again unfiltered
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from tenant.utils.schema import SHARED_APPS
+
+
+@register()
+def check_tenant_isolation(app_configs, **kwargs):
+    errors = []
+    if settings.TENANT_ISOLATION not in ("shared", "schema"):
+        errors.append(
+            Error(
+                "TENANT_ISOLATION must be either 'shared' or 'schema'.",
+                id="tenant.E001",
+            )
+        )
+
+    if settings.TENANT_ISOLATION == "schema":
+        if "postgresql" not in settings.DATABASES["default"]["ENGINE"]:
+            errors.append(
+                Error(
+                    "Schema isolation requires PostgreSQL.",
+                    id="tenant.E002",
+                )
+            )
+
+        shared = sorted(set(settings.TENANT_SCHEMA_APPS) & set(SHARED_APPS))
+        if shared:
+            errors.append(
+                Error(
+                    f"{', '.join(shared)} must stay in the public schema.",
+                    hint="Remove them from TENANT_SCHEMA_APPS.",
+                    id="tenant.E003",
+                )
+            )
+
+    return errors
@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+# The tenant of the request being handled. A ContextVar follows the request
+# through threads (WSGI) as well as tasks and sync_to_async calls (ASGI).
+_current_tenant: ContextVar = ContextVar("current_tenant", default=None)
+
+
+def get_current_tenant():
+    """Return the tenant of the current request, or None outside of one."""
+    return _current_tenant.get()
+
+
+def set_current_tenant(tenant) -> Token:
+    """Make `tenant` current and return a token to restore the previous one."""
+    return _current_tenant.set(tenant)
+
+
+def reset_current_tenant(token: Token) -> None:
+    _current_tenant.reset(token)
+
+
+@contextmanager
+def tenant_context(tenant):
+    """
+    Run a block of code as `tenant`, e.g. in Celery tasks or the shell.
+
+    Example:
+        with tenant_context(tenant):
+            TenantPayment.objects.all()  # only `tenant`'s payments
+    """
+    token = set_current_tenant(tenant)
+    try:
+        yield tenant
+    finally:
+        reset_current_tenant(token)
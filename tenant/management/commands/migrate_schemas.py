@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from tenant.models import Tenant
+from tenant.utils.schema import migrate_schema, schema_isolation_enabled
+
+
+class Command(BaseCommand):
+    help = (
+        "Migrate the public schema, then every tenant schema in parallel "
+        "(requires TENANT_ISOLATION=schema)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of schemas migrated at the same time (default: 4).",
+        )
+        parser.add_argument(
+            "--tenant",
+            type=int,
+            action="append",
+            dest="tenant_ids",
+            help="Only migrate the schema of this tenant id; may be repeated.",
+        )
+        parser.add_argument(
+            "--skip-public",
+            action="store_true",
+            help="Don't migrate the public schema first.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not schema_isolation_enabled():
+            raise CommandError("Set TENANT_ISOLATION=schema to use tenant schemas.")
+
+        database = options["database"]
+        if not options["skip_public"]:
+            self.stdout.write("Migrating the public schema...")
+            call_command(
+                "migrate",
+                database=database,
+                interactive=False,
+                verbosity=options["verbosity"],
+                stdout=self.stdout,
+            )
+
+        tenants = Tenant.objects.using(database).alive()
+        if options["tenant_ids"]:
+            tenants = tenants.filter(pk__in=options["tenant_ids"])
+        schemas = [tenant.schema_name for tenant in tenants.only("pk")]
+
+        # Each worker thread opens its own connection
+        connections[database].close()
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            futures = {
+                pool.submit(self._migrate, schema, database): schema
+                for schema in schemas
+            }
+            for future in as_completed(futures):
+                schema = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    failed.append(schema)
+                    self.stderr.write(f"{schema}: {exc}")
+                else:
+                    self.stdout.write(f"{schema}: OK")
+
+        # Once for every schema, see migrate_schema()
+        if schemas:
+            emit_post_migrate_signal(options["verbosity"], False, database)
+
+        if failed:
+            raise CommandError(f"Migrating {len(failed)} schema(s) failed.")
+
+        self.stdout.write(self.style.SUCCESS(f"Migrated {len(schemas)} schema(s)."))
+
+    @staticmethod
+    def _migrate(schema: str, database: str) -> None:
+        try:
+            migrate_schema(schema, using=database, emit_post_migrate=False)
+        finally:
+            connections.close_all()
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tenant.models import Tenant
+from tenant.utils.shards import get_shard, mirror_tenant, reserve_id_range
+
+
+class Command(BaseCommand):
+    help = (
+        "Migrate every database shard in parallel, reserve each shard's id "
+        "range and mirror the tenant directory to the shards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of shards migrated at the same time (default: 4).",
+        )
+
+    def handle(self, *args, **options):
+        shards = settings.DATABASE_SHARDS
+        if not shards:
+            raise CommandError("Set DATABASE_SHARD_HOSTS to use database shards.")
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as pool:
+            futures = {pool.submit(self._migrate, shard): shard for shard in shards}
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    failed.append(shard)
+                    self.stderr.write(f"{shard}: {exc}")
+                else:
+                    self.stdout.write(f"{shard}: OK")
+
+        if failed:
+            raise CommandError(f"Migrating {len(failed)} shard(s) failed.")
+
+        for tenant in Tenant.objects.exclude(shard=""):
+            mirror_tenant(tenant, get_shard(tenant))
+
+        self.stdout.write(self.style.SUCCESS(f"Migrated {len(shards)} shard(s)."))
+
+    @staticmethod
+    def _migrate(shard: str) -> None:
+        try:
+            call_command(
+                "migrate", database=shard, interactive=False, stdout=StringIO()
+            )
+            reserve_id_range(shard)
+        finally:
+            connections.close_all()
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tenant.models import Tenant
+from tenant.tasks import move_tenant_to_shard
+from tenant.utils.shards import get_shard, move_tenant
+
+
+class Command(BaseCommand):
+    help = "Move all rows of a tenant to another database shard, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("tenant_id", type=int)
+        parser.add_argument("shard", choices=settings.DATABASE_SHARDS or None)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows copied or deleted per query (default: 1000).",
+        )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            help="Queue the move as a Celery task instead of running it here.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tenant = Tenant.objects.get(pk=options["tenant_id"])
+        except Tenant.DoesNotExist as exc:
+            raise CommandError(
+                f"Tenant {options['tenant_id']} does not exist."
+            ) from exc
+
+        target = options["shard"]
+        if get_shard(tenant) == target:
+            self.stdout.write(f"{tenant} is already on {target}.")
+            return
+
+        if options["background"]:
+            move_tenant_to_shard.delay(tenant.pk, target, options["batch_size"])
+            self.stdout.write(f"Queued the move of {tenant} to {target}.")
+            return
+
+        move_tenant(
+            tenant, target, batch_size=options["batch_size"], log=self.stdout.write
+        )
+        self.stdout.write(self.style.SUCCESS(f"Moved {tenant} to {target}."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from tenant.utils.resolver import tenant_resolver
+
+
+class Command(BaseCommand):
+    help = "Show how many requests tenant resolution rejected, per reason."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset", action="store_true", help="Reset the counters afterwards."
+        )
+
+    def handle(self, *args, **options):
+        for reason, count in tenant_resolver.counters.totals().items():
+            self.stdout.write(f"{reason}: {count}")
+
+        if options["reset"]:
+            tenant_resolver.counters.reset()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
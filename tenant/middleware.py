@@ -1,19 +1,42 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 from django.conf import settings
 from django.http import HttpResponseNotFound
 
-from tenant.models import Tenant
+from tenant.context import reset_current_tenant, set_current_tenant
+from tenant.utils.hosts import get_subdomain, host_index
+from tenant.utils.resolver import tenant_resolver
+from tenant.utils.schema import activate_schema, schema_isolation_enabled
 
 
 class TenantMiddleware:
     """
     Middleware to identify and attach the current tenant to each request
-    based on the subdomain (e.g., acme.example.com → acme tenant).
+    based on the host: either a custom `TenantDomain` (e.g., app.acme.com)
+    or a subdomain of `MAIN_DOMAIN` (e.g., acme.example.com → acme tenant).
+
+    The middleware is both sync and async capable: under ASGI it resolves
+    the tenant on the event loop instead of being wrapped in
+    `sync_to_async`, and under WSGI it behaves as before.
+
+    The tenant is also made current in `tenant.context` for the duration of
+    the request, which scopes `TenantScopedManager` querysets to it. With
+    `TENANT_ISOLATION = "schema"` the connection's `search_path` is switched
+    to the tenant's schema as well.
     """
 
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         tenant = self._get_tenant_from_request(request)
 
         # If _get_tenant_from_request() returned an HttpResponse, return it directly
@@ -21,29 +44,87 @@ class TenantMiddleware:
             return tenant
 
         request.tenant = tenant
-        return self.get_response(request)
+        if schema_isolation_enabled():
+            activate_schema(self._get_schema(tenant))
+
+        token = set_current_tenant(tenant)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_tenant(token)
+
+    async def __acall__(self, request):
+        tenant = await self._aget_tenant_from_request(request)
+
+        if isinstance(tenant, HttpResponseNotFound):
+            return tenant
+
+        request.tenant = tenant
+        if schema_isolation_enabled():
+            # Runs on the thread the request's ORM calls will use
+            await sync_to_async(activate_schema)(self._get_schema(tenant))
+
+        token = set_current_tenant(tenant)
+        try:
+            return await self.get_response(request)
+        finally:
+            reset_current_tenant(token)
 
     def _get_tenant_from_request(self, request):
-        """Extracts and returns the tenant based on the subdomain."""
-        host = request.get_host().split(":")[0]  # Strip port if exists
-        main_domain = getattr(settings, "MAIN_DOMAIN", None)
+        """Extracts and returns the tenant based on the host."""
+        host = request.get_host()
+        main_domain = self._get_main_domain()
 
-        if not main_domain:
-            raise RuntimeError("MAIN_DOMAIN must be set in settings or .env")
+        # Custom domains are resolved from the in-memory index
+        host_index.refresh_if_stale()
+        tenant_id = host_index.get_tenant_id(host)
+        if tenant_id is not None:
+            snapshot = tenant_resolver.resolve_id(tenant_id)
+        else:
+            subdomain = get_subdomain(host, main_domain)
 
-        subdomain = None
+            # No subdomain → main site
+            if not subdomain:
+                return None
 
-        # Extract subdomain if it exists (e.g., acme from acme.example.com)
-        if host.endswith(main_domain) and host != main_domain:
-            subdomain_part = host.replace(f".{main_domain}", "")
-            subdomain = subdomain_part.lower() if subdomain_part else None
+            # Resolve through the cached snapshot instead of querying every request
+            snapshot = tenant_resolver.resolve(subdomain)
 
-        # No subdomain → main site
-        if not subdomain:
-            return None
+        if snapshot is None:
+            return HttpResponseNotFound("Tenant not found.")
 
-        # Try to fetch tenant
-        try:
-            return Tenant.objects.get(subdomain=subdomain)
-        except Tenant.DoesNotExist:
+        return snapshot.to_model()
+
+    async def _aget_tenant_from_request(self, request):
+        """Async variant of `_get_tenant_from_request`."""
+        host = request.get_host()
+        main_domain = self._get_main_domain()
+
+        await host_index.arefresh_if_stale()
+        tenant_id = host_index.get_tenant_id(host)
+        if tenant_id is not None:
+            snapshot = await tenant_resolver.aresolve_id(tenant_id)
+        else:
+            subdomain = get_subdomain(host, main_domain)
+            if not subdomain:
+                return None
+
+            snapshot = await tenant_resolver.aresolve(subdomain)
+
+        if snapshot is None:
             return HttpResponseNotFound("Tenant not found.")
+
+        return snapshot.to_model()
+
+    @staticmethod
+    def _get_schema(tenant):
+        return tenant.schema_name if tenant else None
+
+    @staticmethod
+    def _get_main_domain():
+        main_domain = getattr(settings, "MAIN_DOMAIN", None)
+
+        if not main_domain:
+            raise RuntimeError("MAIN_DOMAIN must be set in settings or .env")
+
+        return main_domain
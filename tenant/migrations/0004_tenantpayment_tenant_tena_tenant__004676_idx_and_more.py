@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenant", "0003_tenantdomain"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="tenantpayment",
+            index=models.Index(
+                fields=["tenant", "created_at"], name="tenant_tena_tenant__004676_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tenantpayment",
+            index=models.Index(
+                fields=["tenant", "is_active"], name="tenant_tena_tenant__0df548_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenant", "0004_tenantpayment_tenant_tena_tenant__004676_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="tenantpayment",
+            name="tenant_tena_tenant__f9ca43_idx",
+        ),
+        migrations.AddIndex(
+            model_name="tenant",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["subdomain"],
+                name="tenant_subdomain_alive_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tenantpayment",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["tenant"],
+                name="tenantpayment_tenant_alive_idx",
+            ),
+        ),
+    ]
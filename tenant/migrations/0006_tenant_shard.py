@@ -0,0 +1,23 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenant", "0005_remove_tenantpayment_tenant_tena_tenant__f9ca43_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="shard",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Database alias holding the tenant's rows; blank means 'default'.",
+                max_length=63,
+            ),
+        ),
+    ]
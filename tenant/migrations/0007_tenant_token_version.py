@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-17 20:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tenant", "0006_tenant_shard"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="token_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,57 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+CREATE_TRIGGER = """
+CREATE FUNCTION tenant_tenant_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', NEW.name), 'A')
+        || setweight(to_tsvector(
+            'simple', translate(coalesce(NEW.subdomain, ''), '.-', '  ')
+        ), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tenant_tenant_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, subdomain ON tenant_tenant
+FOR EACH ROW EXECUTE FUNCTION tenant_tenant_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS tenant_tenant_search_vector_trigger ON tenant_tenant;
+DROP FUNCTION IF EXISTS tenant_tenant_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("tenant", "0007_tenant_token_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(sql=CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+        # Fire the trigger on existing tenants
+        migrations.RunSQL(
+            sql="UPDATE tenant_tenant SET name = name",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name="tenant",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="tenant_search_vector_idx"
+            ),
+        ),
+    ]
@@ -1,10 +1,14 @@
 from datetime import timedelta
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.text import slugify
 
 from base.models import OPTIONAL, BaseModel
+from tenant.utils.shards import choose_shard, sharding_enabled
 
 
 class Tenant(BaseModel):
@@ -52,10 +56,38 @@ class Tenant(BaseModel):
         choices=PlanChoices.choices,
         default=PlanChoices.FREE,
     )
+    shard = models.CharField(
+        max_length=63,
+        blank=True,
+        default="",
+        help_text="Database alias holding the tenant's rows; blank means 'default'.",
+    )
+    # Embedded in its users' JWTs; bumping it revokes all of them at once,
+    # see user.utils.token_version
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+    explicit_update_fields = ("token_version",)
+    # Name and subdomain words, set by a trigger on insert/update (migration
+    # 0008), searched by base.search.search()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["subdomain"],
+                name="tenant_subdomain_alive_idx",
+                condition=Q(deleted_at__isnull=True),
+            ),
+            GinIndex(fields=["search_vector"], name="tenant_search_vector_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.subdomain or 'no-subdomain'})"
 
+    @property
+    def schema_name(self) -> str:
+        """Postgres schema holding this tenant's tables in schema isolation mode."""
+        return f"tenant_{self.pk}"
+
     def save(self, *args, **kwargs):
         """
         Override save method to ensure subdomain is lowercase and slug is set from name.
@@ -64,6 +96,50 @@ class Tenant(BaseModel):
             self.subdomain = self.subdomain.lower()
         if not self.slug:
             self.slug = slugify(self.name)
+        if self._state.adding and not self.shard and sharding_enabled():
+            self.shard = choose_shard()
+        super().save(*args, **kwargs)
+
+
+class TenantDomain(BaseModel):
+    """
+    Represents a custom (vanity) domain that routes to a tenant,
+    e.g., app.acme.com → acme tenant.
+    """
+
+    tenant = models.ForeignKey(
+        Tenant,
+        on_delete=models.CASCADE,
+        related_name="domains",
+    )
+    domain = models.CharField(
+        max_length=253,
+        unique=True,
+        help_text="Fully qualified host name, e.g., 'app.acme.com'.",
+    )
+    is_primary = models.BooleanField(
+        default=False,
+        help_text="Canonical domain used when linking to the tenant.",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant"],
+                condition=models.Q(is_primary=True),
+                name="tenant_domain_single_primary",
+            ),
+        ]
+
+    def __str__(self):
+        return self.domain
+
+    def save(self, *args, **kwargs):
+        """
+        Override save method to store the domain the way hosts are matched:
+        lowercase, without port or trailing dot.
+        """
+        self.domain = self.domain.split(":")[0].rstrip(".").lower()
         super().save(*args, **kwargs)
 
 
@@ -107,8 +183,16 @@ class TenantPayment(BaseModel):
 
     class Meta:
         indexes = [
-            models.Index(fields=["tenant"]),
+            # The foreign key already indexes every row; lookups of live
+            # payments use this smaller partial index instead.
+            models.Index(
+                fields=["tenant"],
+                name="tenantpayment_tenant_alive_idx",
+                condition=Q(deleted_at__isnull=True),
+            ),
             models.Index(fields=["provider_subscription_id"]),
+            models.Index(fields=["tenant", "created_at"]),
+            models.Index(fields=["tenant", "is_active"]),
         ]
 
     def __str__(self):
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from tenant.context import get_current_tenant
+from tenant.utils.schema import schema_isolation_enabled
+from tenant.utils.shards import get_shard, is_sharded, sharding_enabled
+
+
+class ShardRouter:
+    """
+    Place every row of a tenant on the tenant's shard (`Tenant.shard`).
+
+    The shard comes from the instance being saved or, for queries, from the
+    current tenant (`tenant.context`), which `TenantMiddleware` sets from
+    `request.tenant`. `Tenant` and `TenantDomain` form the global directory
+    and stay in `default`, so resolving a tenant never needs a shard.
+    Without a current tenant (main domain, shell) sharded models use
+    `default`; wrap such code in `tenant_context(tenant)`.
+    """
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model, hints.get("instance"))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model, hints.get("instance"))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Tenants are mirrored to every shard holding their rows
+        if sharding_enabled() and {obj1._state.db, obj2._state.db} <= {
+            DEFAULT_DB_ALIAS,
+            *settings.DATABASE_SHARDS,
+        }:
+            return True
+        return None
+
+    def _db_for_model(self, model, instance):
+        if not sharding_enabled() or not is_sharded(model):
+            return None
+
+        # Related managers pass the parent, e.g. `tenant.users.all()`
+        if instance is not None:
+            if instance._meta.label == "tenant.Tenant":
+                return get_shard(instance)
+            if is_sharded(type(instance)) and instance._state.db:
+                return instance._state.db
+
+        tenant = get_current_tenant()
+        if tenant is None:
+            return None
+        return get_shard(tenant)
+
+
+class TenantSchemaRouter:
+    """
+    Split migrations between the public schema and the tenant schemas when
+    `TENANT_ISOLATION = "schema"`.
+
+    Apps in `TENANT_SCHEMA_APPS` are only migrated into tenant schemas (see
+    the `migrate_schemas` command); every other app only into public.
+    Queries need no routing: `TenantMiddleware` sets the `search_path`.
+    """
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not schema_isolation_enabled():
+            return None
+
+        in_tenant_schema = getattr(connections[db], "tenant_schema", None) is not None
+        return (app_label in settings.TENANT_SCHEMA_APPS) == in_tenant_schema
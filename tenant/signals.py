@@ -0,0 +1,171 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from tenant.models import Tenant, TenantDomain
+from tenant.utils.hosts import host_index
+from tenant.utils.resolver import tenant_resolver
+from tenant.utils.schema import (
+    migrate_schema,
+    reset_search_path_cache,
+    schema_isolation_enabled,
+)
+from tenant.utils.shards import get_shard, mirror_tenant, sharding_enabled
+from user.utils.token_version import revoke_tenant_tokens
+
+
+def _invalidate_tenant_cache(tenant: Tenant, *subdomains) -> None:
+    """
+    Invalidate now and again once the transaction commits, so a request
+    that repopulated the cache with the old row in between is corrected.
+    """
+    tenant_id = tenant.pk
+
+    def invalidate():
+        tenant_resolver.invalidate(subdomains=subdomains, ids=[tenant_id])
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(pre_save, sender=Tenant)
+def remember_previous_subdomain(sender, instance: Tenant, **kwargs) -> None:
+    """
+    Keep the stored subdomain around so a rename invalidates the old key,
+    and note whether the saved subdomain is new to the Bloom filter: the
+    tenant is created, renamed or restored.
+    """
+    instance._previous_subdomain = None
+    instance._subdomain_went_live = False
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not {"subdomain", "deleted_at"} & set(
+        update_fields
+    ):
+        return
+
+    live = bool(instance.subdomain) and instance.deleted_at is None
+    if instance.pk and not instance._state.adding:
+        previous = (
+            sender._base_manager.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list("subdomain", "deleted_at")
+            .first()
+        )
+        if previous is not None:
+            instance._previous_subdomain, deleted_at = previous
+            renamed = instance.subdomain != instance._previous_subdomain
+            live = live and (renamed or deleted_at is not None)
+    instance._subdomain_went_live = live
+
+
+@receiver(post_save, sender=Tenant)
+def invalidate_saved_tenant(
+    sender, instance: Tenant, created: bool, using: str, **kwargs
+) -> None:
+    previous_subdomain = getattr(instance, "_previous_subdomain", None)
+    _invalidate_tenant_cache(instance, instance.subdomain, previous_subdomain)
+
+    # Only committed subdomains are added, bit by bit, so the filter never
+    # loses a concurrent add. Deletes are dropped by the periodic rebuild;
+    # until then a stale bit only costs a cache lookup.
+    if getattr(instance, "_subdomain_went_live", False):
+        subdomain = instance.subdomain
+        transaction.on_commit(lambda: tenant_resolver.bloom.add(subdomain), using=using)
+
+    if created and schema_isolation_enabled():
+        schema = instance.schema_name
+        transaction.on_commit(lambda: migrate_schema(schema))
+
+
+@receiver(pre_save, sender=Tenant)
+def remember_previous_payment_status(sender, instance: Tenant, **kwargs) -> None:
+    instance._previous_payment_status = None
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "payment_status" not in update_fields:
+        return
+
+    if instance.pk and not instance._state.adding:
+        instance._previous_payment_status = (
+            sender._base_manager.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list("payment_status", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Tenant)
+def revoke_tokens_of_canceled_tenant(
+    sender, instance: Tenant, using: str, **kwargs
+) -> None:
+    """Log every user of a tenant out once its subscription is canceled."""
+    canceled = Tenant.PaymentStatusChoices.CANCELED
+    previous = getattr(instance, "_previous_payment_status", None)
+    if using != DEFAULT_DB_ALIAS or previous in (None, canceled):
+        return
+
+    if instance.payment_status == canceled:
+        revoke_tenant_tokens(instance)
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=Tenant)
+def mirror_saved_tenant(sender, instance: Tenant, using: str, **kwargs) -> None:
+    """Keep the tenant's copy on its shard in sync with the directory."""
+    if sharding_enabled() and using == DEFAULT_DB_ALIAS:
+        mirror_tenant(instance, get_shard(instance))
+
+
+@receiver(post_delete, sender=Tenant)
+def invalidate_deleted_tenant(sender, instance: Tenant, **kwargs) -> None:
+    _invalidate_tenant_cache(instance, instance.subdomain)
+
+
+@receiver(pre_save, sender=TenantDomain)
+def remember_previous_domain(sender, instance: TenantDomain, **kwargs) -> None:
+    """Keep the stored domain around so a rename drops the old host."""
+    instance._previous_domain = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_domain = (
+            sender._base_manager.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list("domain", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=TenantDomain)
+def index_saved_domain(sender, instance: TenantDomain, using: str, **kwargs) -> None:
+    """
+    Update the index once the transaction commits: other workers reload
+    from the database when the version changes, so bumping it earlier
+    would have them load (and keep) the rows without this change, and a
+    rollback would leave this worker with a domain that doesn't exist.
+    """
+    previous = getattr(instance, "_previous_domain", None)
+    domain, tenant_id = instance.domain, instance.tenant_id
+    active = instance.is_active and instance.deleted_at is None
+
+    def index():
+        if previous and previous != domain:
+            host_index.remove(previous)
+        if active:
+            host_index.add(domain, tenant_id)
+        else:
+            host_index.remove(domain)
+
+    transaction.on_commit(index, using=using)
+
+
+@receiver(post_delete, sender=TenantDomain)
+def unindex_deleted_domain(
+    sender, instance: TenantDomain, using: str, **kwargs
+) -> None:
+    domain = instance.domain
+    transaction.on_commit(lambda: host_index.remove(domain), using=using)
+
+
+@receiver(connection_created)
+def forget_search_path(sender, connection, **kwargs) -> None:
+    """A new connection starts with the default search_path."""
+    reset_search_path_cache(connection)
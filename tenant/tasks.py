@@ -0,0 +1,17 @@
+from celery import shared_task
+
+from tenant.models import Tenant
+from tenant.utils.resolver import tenant_resolver
+from tenant.utils.shards import move_tenant
+
+
+@shared_task
+def move_tenant_to_shard(tenant_id: int, target: str, batch_size: int = 1000) -> None:
+    """Move a tenant to another shard in the background."""
+    move_tenant(Tenant.objects.get(pk=tenant_id), target, batch_size=batch_size)
+
+
+@shared_task(ignore_result=True)
+def rebuild_subdomain_filter() -> None:
+    """Rebuild the Bloom filter of subdomains, dropping deleted tenants."""
+    tenant_resolver.bloom.rebuild()
@@ -0,0 +1,101 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tenant.admin import USERS_PANEL_SIZE
+from tenant.models import TenantPayment
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.hosts import host_index
+from user.tests.v1.factories import UserFactory
+
+# Queries of an admin page besides its rows: session, user, permissions,
+# the (estimated) count, list filters...
+BUDGET = 10
+
+
+@pytest.fixture
+def admin_client(client, settings):
+    # Don't let the custom domain index reload in the middle of a budget
+    settings.TENANT_DOMAIN_INDEX_CHECK_INTERVAL = 3600
+    host_index.load()
+    client.force_login(UserFactory.create_superuser())
+    # Loads what's cached afterwards, e.g. the site and content types
+    client.get(reverse("admin:index"))
+    return client
+
+
+def create_payments(count):
+    for tenant in TenantFactory.create_batch(count):
+        TenantPayment.objects.create(
+            tenant=tenant,
+            provider=TenantPayment.PaymentProviderChoices.STRIPE,
+            plan=tenant.plan,
+            amount=10,
+        )
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+class TestAdminQueryBudgets:
+
+    def test_payment_changelist(self, admin_client):
+        url = reverse("admin:tenant_tenantpayment_changelist")
+        create_payments(1)
+        _, one_row = get(admin_client, url)
+
+        create_payments(20)
+        _, many_rows = get(admin_client, url)
+
+        assert many_rows == one_row <= BUDGET
+
+    def test_user_changelist(self, admin_client):
+        url = reverse("admin:user_user_changelist")
+        UserFactory(tenant=TenantFactory())
+        _, one_row = get(admin_client, url)
+
+        for tenant in TenantFactory.create_batch(20):
+            UserFactory(tenant=tenant)
+        _, many_rows = get(admin_client, url)
+
+        assert many_rows == one_row <= BUDGET
+
+    def test_tenant_change_form_doesnt_load_every_user(self, admin_client):
+        tenant = TenantFactory()
+        users = UserFactory.create_batch(USERS_PANEL_SIZE + 5, tenant=tenant)
+        url = reverse("admin:tenant_tenant_change", args=[tenant.pk])
+
+        response, queries = get(admin_client, url)
+
+        assert queries <= BUDGET
+        content = response.content.decode()
+        assert users[-1].email in content
+        assert users[0].email not in content
+        assert f"?tenant__id__exact={tenant.pk}" in content
+
+    def test_user_changelist_filtered_on_tenant(self, admin_client):
+        tenant = TenantFactory()
+        UserFactory.create_batch(3, tenant=tenant)
+        UserFactory(tenant=TenantFactory())
+        url = reverse("admin:user_user_changelist")
+
+        response, _ = get(admin_client, url, tenant__id__exact=tenant.pk)
+
+        assert len(response.context["cl"].result_list) == 3
+
+    def test_foreign_keys_are_autocompleted(self, admin_client):
+        TenantFactory.create_batch(5)
+        url = reverse("admin:tenant_tenantpayment_add")
+
+        response, queries = get(admin_client, url)
+
+        # No <option> per tenant
+        assert "admin-autocomplete" in response.content.decode()
+        assert queries <= BUDGET
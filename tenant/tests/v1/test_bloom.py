@@ -0,0 +1,196 @@
+import time
+
+import pytest
+
+from tenant.models import Tenant
+from tenant.tasks import rebuild_subdomain_filter
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.bloom import BloomFilter
+from tenant.utils.resolver import TenantResolver, tenant_resolver
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter.for_capacity(1000, error_rate=0.01)
+    items = [f"tenant-{index}" for index in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+
+    false_positives = sum(f"unknown-{index}" in bloom for index in range(10_000))
+    assert false_positives < 300
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory(subdomain="acme")
+
+
+@pytest.mark.django_db
+class TestUnknownSubdomains:
+
+    def test_bloom_filter_misses_are_confirmed_once(
+        self, tenant, django_assert_num_queries
+    ):
+        tenant_resolver.resolve("acme")
+        before = tenant_resolver.counters.totals()["bloom"]
+
+        with django_assert_num_queries(1):
+            assert tenant_resolver.resolve("ghost") is None
+        with django_assert_num_queries(0):
+            assert tenant_resolver.resolve("ghost") is None
+
+        assert tenant_resolver.counters.totals()["bloom"] == before + 2
+
+    def test_tenant_missing_from_filter_resolves(self, tenant):
+        tenant_resolver.resolve("acme")
+        # bulk_create() sends no signals, so the filter never hears of it
+        (created,) = Tenant.objects.bulk_create(
+            [TenantFactory.build(subdomain="globex")]
+        )
+        assert not tenant_resolver.bloom.might_contain("globex")
+
+        assert tenant_resolver.resolve("globex").id == created.id
+        assert tenant_resolver.bloom.might_contain("globex")
+
+    def test_negative_cache_when_filter_unavailable(
+        self, tenant, django_assert_num_queries
+    ):
+        # No filter published and none being built: every name "might" exist
+        tenant_resolver.bloom.clear()
+        tenant_resolver.bloom._checked_at = time.monotonic()
+
+        with django_assert_num_queries(1):
+            assert tenant_resolver.resolve("ghost") is None
+        with django_assert_num_queries(0):
+            assert tenant_resolver.resolve("ghost") is None
+
+        totals = tenant_resolver.counters.totals()
+        assert totals["database"] == 1
+        assert totals["negative_cache"] == 1
+
+    def test_new_tenant_is_not_rejected(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        assert tenant_resolver.resolve("globex") is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created = TenantFactory(subdomain="globex")
+
+        assert tenant_resolver.resolve("globex").id == created.id
+
+    def test_renamed_tenant_is_not_rejected(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        assert tenant_resolver.resolve("globex") is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.subdomain = "globex"
+            tenant.save()
+
+        assert tenant_resolver.resolve("globex").id == tenant.id
+
+    def test_restored_tenant_is_not_rejected(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        tenant.delete()
+        rebuild_subdomain_filter()
+        assert not tenant_resolver.bloom.might_contain("acme")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.deleted_at = None
+            tenant.save(update_fields=["deleted_at"])
+
+        assert tenant_resolver.resolve("acme").id == tenant.id
+
+    def test_unrelated_saves_dont_add(
+        self, tenant, django_capture_on_commit_callbacks, monkeypatch
+    ):
+        added = []
+        monkeypatch.setattr(tenant_resolver.bloom, "add", added.append)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.name = "Acme Corporation"
+            tenant.save(update_fields=["name"])
+            tenant.save()
+
+        assert added == []
+
+
+@pytest.mark.django_db
+class TestSharedFilter:
+
+    @pytest.fixture
+    def tenant(self, redis_cache, tenant):
+        return tenant
+
+    def test_other_workers_adopt_the_published_filter(
+        self, tenant, django_assert_num_queries
+    ):
+        tenant_resolver.resolve("acme")
+        other_worker = TenantResolver()
+
+        with django_assert_num_queries(0):
+            assert other_worker.resolve("acme").id == tenant.id
+
+        assert other_worker.bloom.might_contain("acme")
+        assert not other_worker.bloom.might_contain("ghost")
+
+    def test_other_workers_see_new_tenants(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        tenant_resolver.resolve("acme")
+        other_worker = TenantResolver()
+        assert other_worker.resolve("globex") is None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            created = TenantFactory(subdomain="globex")
+        other_worker.bloom._checked_at = 0.0
+
+        assert other_worker.resolve("globex").id == created.id
+
+    def test_rebuild_keeps_concurrent_adds(self, tenant, monkeypatch):
+        bloom = tenant_resolver.bloom
+        load_items = bloom.load_items
+        loads = []
+
+        def load_then_add():
+            # Another worker commits "globex" after this snapshot is read
+            items = list(load_items())
+            if not loads:
+                TenantFactory(subdomain="globex")
+                bloom.add("globex")
+            loads.append(items)
+            return items
+
+        monkeypatch.setattr(bloom, "load_items", load_then_add)
+        bloom.rebuild()
+
+        assert len(loads) == 2
+        other_worker = TenantResolver()
+        other_worker.bloom.refresh_if_stale()
+        assert other_worker.bloom.might_contain("globex")
+
+    def test_rebuild_drops_deleted_tenants(self, tenant):
+        tenant_resolver.bloom.rebuild()
+        assert tenant_resolver.bloom.might_contain("acme")
+
+        tenant.delete()
+        rebuild_subdomain_filter()
+
+        other_worker = TenantResolver()
+        other_worker.bloom.refresh_if_stale()
+        assert not other_worker.bloom.might_contain("acme")
+
+    def test_redis_errors_answer_maybe(self, tenant, redis_cache, monkeypatch):
+        tenant_resolver.bloom.rebuild()
+        assert not tenant_resolver.bloom.might_contain("ghost")
+
+        def fail(*args, **kwargs):
+            raise ConnectionError
+
+        monkeypatch.setattr(redis_cache, "hget", fail)
+        tenant_resolver.bloom._checked_at = 0.0
+        tenant_resolver.bloom.refresh_if_stale()
+
+        assert tenant_resolver.bloom.might_contain("ghost")
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from base.api.v1.serializers import BaseSerializer
+from tenant.context import get_current_tenant, tenant_context
+from tenant.middleware import TenantMiddleware
+from tenant.models import TenantDomain, TenantPayment
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+
+def create_payment(tenant):
+    return TenantPayment.objects.create(
+        tenant=tenant,
+        provider=TenantPayment.PaymentProviderChoices.STRIPE,
+        plan=tenant.plan,
+        amount=10,
+    )
+
+
+@pytest.fixture
+def tenants():
+    acme = TenantFactory(subdomain="acme")
+    globex = TenantFactory(subdomain="globex")
+    create_payment(acme)
+    create_payment(globex)
+    return acme, globex
+
+
+def payment_tenants():
+    return set(TenantPayment.objects.values_list("tenant_id", flat=True))
+
+
+@pytest.mark.django_db
+class TestTenantScopedManager:
+
+    def test_unscoped_outside_of_a_tenant(self, tenants):
+        assert get_current_tenant() is None
+        assert payment_tenants() == {tenant.pk for tenant in tenants}
+
+    def test_scoped_to_current_tenant(self, tenants):
+        acme, globex = tenants
+
+        with tenant_context(acme):
+            assert payment_tenants() == {acme.pk}
+            assert TenantPayment.objects.unscoped().count() == 2
+
+        assert get_current_tenant() is None
+
+    def test_for_tenant(self, tenants):
+        acme, globex = tenants
+
+        assert set(
+            TenantPayment.objects.for_tenant(globex).values_list("tenant_id", flat=True)
+        ) == {globex.pk}
+
+    def test_models_without_tenant_field_are_not_scoped(self, tenants):
+        acme, globex = tenants
+
+        with tenant_context(acme):
+            assert acme.__class__.objects.count() == 2
+
+    def test_users_stay_unscoped_for_authentication(self, tenants):
+        acme, globex = tenants
+        UserFactory(tenant=acme)
+        UserFactory(tenant=globex)
+
+        with tenant_context(acme):
+            assert User.objects.count() == 2
+            assert set(User.tenant_objects.values_list("tenant_id", flat=True)) == {
+                acme.pk
+            }
+
+
+class TenantDomainSerializer(BaseSerializer):
+    class Meta:
+        model = TenantDomain
+        fields = ["domain", "tenant"]
+
+
+@pytest.mark.django_db
+class TestUniquenessAcrossTenants:
+
+    @pytest.fixture
+    def domain(self, tenants):
+        return TenantDomain.objects.create(tenant=tenants[1], domain="app.globex.com")
+
+    def test_model_validation(self, tenants, domain):
+        acme, globex = tenants
+
+        with tenant_context(acme):
+            with pytest.raises(ValidationError) as error:
+                TenantDomain(tenant=acme, domain="app.globex.com").full_clean()
+
+        assert "domain" in error.value.message_dict
+
+    def test_serializer_validation(self, tenants, domain):
+        acme, globex = tenants
+
+        with tenant_context(acme):
+            serializer = TenantDomainSerializer(
+                data={"domain": "app.globex.com", "tenant": acme.pk}
+            )
+            assert not serializer.is_valid()
+
+        assert "domain" in serializer.errors
+
+
+@pytest.mark.django_db(transaction=True)
+class TestContextPropagation:
+
+    def test_propagates_to_sync_to_async(self, tenants):
+        acme, globex = tenants
+
+        async def run():
+            with tenant_context(acme):
+                return await sync_to_async(payment_tenants)()
+
+        assert async_to_sync(run)() == {acme.pk}
+
+    def test_concurrent_tasks_are_isolated(self, tenants):
+        async def run(tenant):
+            with tenant_context(tenant):
+                await asyncio.sleep(0)
+                return await sync_to_async(payment_tenants, thread_sensitive=False)()
+
+        async def gather():
+            return await asyncio.gather(*(run(tenant) for tenant in tenants))
+
+        assert async_to_sync(gather)() == [{tenant.pk} for tenant in tenants]
+
+
+@pytest.mark.django_db
+class TestMiddlewareSetsContext:
+
+    def test_sync_request(self, tenants):
+        seen = []
+
+        def view(request):
+            seen.append(payment_tenants())
+            return HttpResponse("ok")
+
+        request = RequestFactory().get("/", HTTP_HOST="acme.localhost")
+        TenantMiddleware(view)(request)
+
+        assert seen == [{tenants[0].pk}]
+        assert get_current_tenant() is None
+
+    def test_async_request(self, tenants):
+        seen = []
+
+        async def view(request):
+            seen.append(get_current_tenant().pk)
+            return HttpResponse("ok")
+
+        request = RequestFactory().get("/", HTTP_HOST="globex.localhost")
+        async_to_sync(TenantMiddleware(view))(request)
+
+        assert seen == [tenants[1].pk]
+        assert get_current_tenant() is None
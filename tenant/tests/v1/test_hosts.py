@@ -0,0 +1,151 @@
+import pytest
+
+from django.db import IntegrityError
+from django.test import RequestFactory
+
+from tenant.middleware import TenantMiddleware
+from tenant.models import TenantDomain
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.hosts import VERSION_CACHE_KEY, get_subdomain, host_index
+from tenant.utils.resolver import tenant_resolver
+
+
+@pytest.mark.parametrize(
+    "host,main_domain,expected",
+    [
+        ("acme.example.com", "example.com", "acme"),
+        ("ACME.example.com:8000", "example.com", "acme"),
+        ("api.acme.example.com", "example.com", "acme"),
+        ("acme.localhost", "localhost:8000", "acme"),
+        ("example.com", "example.com", None),
+        ("notexample.com", "example.com", None),
+        ("app.acme.com", "example.com", None),
+    ],
+)
+def test_get_subdomain(host, main_domain, expected):
+    assert get_subdomain(host, main_domain) == expected
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory(subdomain="acme")
+
+
+@pytest.fixture
+def middleware():
+    return TenantMiddleware(lambda request: request)
+
+
+@pytest.mark.django_db
+class TestHostIndex:
+
+    def test_domain_is_normalized(self, tenant):
+        domain = TenantDomain.objects.create(tenant=tenant, domain="App.Acme.com.")
+
+        assert domain.domain == "app.acme.com"
+
+    def test_single_primary_domain_per_tenant(self, tenant):
+        TenantDomain.objects.create(tenant=tenant, domain="a.acme.com", is_primary=True)
+        TenantDomain.objects.create(tenant=tenant, domain="b.acme.com")
+
+        with pytest.raises(IntegrityError):
+            TenantDomain.objects.create(
+                tenant=tenant, domain="c.acme.com", is_primary=True
+            )
+
+    def test_custom_domain_resolves_without_queries(
+        self, tenant, middleware, django_assert_num_queries
+    ):
+        TenantDomain.objects.create(tenant=tenant, domain="app.acme.com")
+        host_index.load()
+        tenant_resolver.resolve_id(tenant.pk)
+        request = RequestFactory().get("/", HTTP_HOST="app.acme.com")
+
+        with django_assert_num_queries(0):
+            middleware(request)
+
+        assert request.tenant.pk == tenant.pk
+
+    def test_saved_domains_update_the_index(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        host_index.load()
+        with django_capture_on_commit_callbacks(execute=True):
+            domain = TenantDomain.objects.create(tenant=tenant, domain="app.acme.com")
+        assert host_index.get_tenant_id("app.acme.com") == tenant.pk
+
+        domain.domain = "portal.acme.com"
+        with django_capture_on_commit_callbacks(execute=True):
+            domain.save()
+        assert host_index.get_tenant_id("app.acme.com") is None
+        assert host_index.get_tenant_id("portal.acme.com") == tenant.pk
+
+        domain.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            domain.save()
+        assert host_index.get_tenant_id("portal.acme.com") is None
+
+    def test_index_changes_wait_for_the_commit(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        host_index.load()
+        version = host_index.cache.get(VERSION_CACHE_KEY)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            TenantDomain.objects.create(tenant=tenant, domain="app.acme.com")
+            # Other workers would reload without the uncommitted row
+            assert host_index.cache.get(VERSION_CACHE_KEY) == version
+            assert host_index.get_tenant_id("app.acme.com") is None
+
+        # The commit
+        assert len(callbacks) == 1
+        callbacks[0]()
+        assert host_index.get_tenant_id("app.acme.com") == tenant.pk
+        assert host_index.cache.get(VERSION_CACHE_KEY) != version
+
+    def test_deleted_domain_is_removed(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        TenantDomain.objects.create(tenant=tenant, domain="app.acme.com")
+        host_index.load()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            TenantDomain.objects.filter(domain="app.acme.com").delete()
+
+        assert host_index.get_tenant_id("app.acme.com") is None
+
+    def test_reloads_when_another_worker_changes_domains(self, tenant, settings):
+        settings.TENANT_DOMAIN_INDEX_CHECK_INTERVAL = 0
+        host_index.load()
+
+        # Simulate a change made by another process: no signal reaches us.
+        TenantDomain.objects.bulk_create(
+            [TenantDomain(tenant=tenant, domain="app.acme.com")]
+        )
+        host_index.refresh_if_stale()
+        assert host_index.get_tenant_id("app.acme.com") is None
+
+        host_index.cache.set(VERSION_CACHE_KEY, 12345)
+        host_index.refresh_if_stale()
+        assert host_index.get_tenant_id("app.acme.com") == tenant.pk
+
+    def test_concurrent_changes_are_reloaded(self, tenant, settings, monkeypatch):
+        settings.TENANT_DOMAIN_INDEX_CHECK_INTERVAL = 0
+        host_index.load()
+        cache = host_index.cache
+        incr = cache.incr
+
+        def incr_after_another_worker(key, *args, **kwargs):
+            # Another worker adds a domain and bumps the version first
+            TenantDomain.objects.bulk_create(
+                [TenantDomain(tenant=tenant, domain="app.acme.com")]
+            )
+            incr(key)
+            return incr(key, *args, **kwargs)
+
+        monkeypatch.setattr(cache, "incr", incr_after_another_worker)
+        host_index.add("portal.acme.com", tenant.pk)
+        monkeypatch.undo()
+
+        host_index.refresh_if_stale()
+        assert host_index.get_tenant_id("app.acme.com") == tenant.pk
@@ -0,0 +1,69 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from tenant.middleware import TenantMiddleware
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.hosts import host_index
+from tenant.utils.resolver import tenant_resolver
+
+
+def sync_view(request):
+    return HttpResponse("ok")
+
+
+async def async_view(request):
+    return HttpResponse("ok")
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory(subdomain="acme")
+
+
+@pytest.fixture
+def rf():
+    return RequestFactory()
+
+
+def test_middleware_matches_handler_mode():
+    assert not iscoroutinefunction(TenantMiddleware(sync_view))
+    assert iscoroutinefunction(TenantMiddleware(async_view))
+
+
+@pytest.mark.django_db
+class TestAsyncTenantMiddleware:
+
+    def test_attaches_tenant(self, rf, tenant):
+        request = rf.get("/", HTTP_HOST="acme.localhost")
+
+        response = async_to_sync(TenantMiddleware(async_view))(request)
+
+        assert response.status_code == 200
+        assert request.tenant.pk == tenant.pk
+
+    def test_unknown_subdomain_returns_not_found(self, rf):
+        request = rf.get("/", HTTP_HOST="missing.localhost")
+
+        response = async_to_sync(TenantMiddleware(async_view))(request)
+
+        assert response.status_code == 404
+
+    def test_main_domain_has_no_tenant(self, rf):
+        request = rf.get("/", HTTP_HOST="localhost")
+
+        async_to_sync(TenantMiddleware(async_view))(request)
+
+        assert request.tenant is None
+
+    def test_cached_tenant_skips_database(self, rf, tenant, django_assert_num_queries):
+        host_index.load()
+        tenant_resolver.resolve("acme")
+        request = rf.get("/", HTTP_HOST="acme.localhost")
+
+        with django_assert_num_queries(0):
+            async_to_sync(TenantMiddleware(async_view))(request)
+
+        assert request.tenant.pk == tenant.pk
@@ -0,0 +1,113 @@
+import pytest
+
+from django.test import RequestFactory
+
+from tenant.middleware import TenantMiddleware
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.resolver import LRUCache, TenantSnapshot, tenant_resolver
+
+
+@pytest.fixture
+def tenant():
+    tenant = TenantFactory(subdomain="acme")
+    tenant_resolver.bloom.rebuild()
+    return tenant
+
+
+@pytest.mark.django_db
+class TestTenantResolver:
+
+    def test_resolve_queries_database_once(self, tenant, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            snapshot = tenant_resolver.resolve("acme")
+
+        with django_assert_num_queries(0):
+            assert tenant_resolver.resolve("acme") == snapshot
+
+        assert snapshot.id == tenant.id
+        assert snapshot.subdomain == "acme"
+
+    def test_resolve_uses_shared_cache_on_cold_worker(
+        self, tenant, django_assert_num_queries
+    ):
+        tenant_resolver.resolve("acme")
+        # The Bloom filter is only shared through Redis, not the test cache
+        tenant_resolver.local.clear()
+
+        with django_assert_num_queries(0):
+            assert tenant_resolver.resolve("acme").id == tenant.id
+
+    def test_resolve_unknown_subdomain(self):
+        assert tenant_resolver.resolve("missing") is None
+
+    def test_snapshot_defers_policy(self, tenant, django_assert_num_queries):
+        instance = tenant_resolver.resolve("acme").to_model()
+
+        with django_assert_num_queries(0):
+            assert instance.pk == tenant.pk
+            assert instance.name == tenant.name
+        assert "policy" in instance.get_deferred_fields()
+
+        with django_assert_num_queries(1):
+            assert instance.policy == tenant.policy
+
+    def test_save_invalidates_cached_tenant(self, tenant):
+        tenant_resolver.resolve("acme")
+
+        tenant.plan = tenant.PlanChoices.PRO
+        tenant.save()
+
+        assert tenant_resolver.resolve("acme").plan == tenant.PlanChoices.PRO
+
+    def test_rename_invalidates_previous_subdomain(
+        self, tenant, django_capture_on_commit_callbacks
+    ):
+        tenant_resolver.resolve("acme")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            tenant.subdomain = "Globex"
+            tenant.save()
+
+        assert tenant_resolver.resolve("acme") is None
+        assert tenant_resolver.resolve("globex").id == tenant.id
+
+    def test_delete_invalidates_cached_tenant(self, tenant):
+        tenant_resolver.resolve("acme")
+
+        tenant.__class__.objects.filter(pk=tenant.pk).delete()
+
+        assert tenant_resolver.resolve("acme") is None
+
+    def test_middleware_attaches_tenant(self, tenant):
+        request = RequestFactory().get("/", HTTP_HOST="acme.localhost")
+        middleware = TenantMiddleware(lambda request: request)
+
+        assert middleware(request).tenant.pk == tenant.pk
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_expired_entries_are_dropped(self):
+        cache = LRUCache(maxsize=2, ttl=-1)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+def test_snapshot_is_immutable():
+    snapshot = TenantSnapshot(1, "Acme", "acme", "acme", "free", "pending", True)
+
+    with pytest.raises(AttributeError):
+        snapshot.plan = "pro"
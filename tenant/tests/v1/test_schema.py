@@ -0,0 +1,148 @@
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from tenant.checks import check_tenant_isolation
+from tenant.middleware import TenantMiddleware
+from tenant.routers import TenantSchemaRouter
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.schema import (
+    activate_schema,
+    drop_schema,
+    schema_context,
+    schema_isolation_enabled,
+)
+
+
+@pytest.fixture
+def schema_settings(settings):
+    settings.TENANT_ISOLATION = "schema"
+    settings.TENANT_SCHEMA_APPS = ["django_celery_results"]
+
+
+@pytest.fixture
+def schema_mode(schema_settings):
+    yield
+    activate_schema(None)
+
+
+def search_path():
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW search_path")
+        return cursor.fetchone()[0]
+
+
+def set_path_queries(queries):
+    return [q for q in queries if q["sql"].startswith("SET search_path")]
+
+
+def test_shared_mode_by_default():
+    assert not schema_isolation_enabled()
+    assert TenantSchemaRouter().allow_migrate("default", "tenant") is None
+
+
+class TestTenantSchemaRouter:
+
+    def test_public_schema_gets_shared_apps(self, schema_settings):
+        router = TenantSchemaRouter()
+
+        assert router.allow_migrate("default", "tenant") is True
+        assert router.allow_migrate("default", "django_celery_results") is False
+
+    def test_tenant_schema_gets_tenant_apps(self, schema_settings):
+        router = TenantSchemaRouter()
+        connection.tenant_schema = "tenant_1"
+        try:
+            assert router.allow_migrate("default", "tenant") is False
+            assert router.allow_migrate("default", "django_celery_results") is True
+        finally:
+            connection.tenant_schema = None
+
+
+def test_checks_reject_shared_apps_in_tenant_schemas(settings):
+    settings.TENANT_ISOLATION = "schema"
+    settings.TENANT_SCHEMA_APPS = ["user", "django_celery_results"]
+
+    assert [error.id for error in check_tenant_isolation(None)] == ["tenant.E003"]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSearchPath:
+
+    def test_schema_context(self, schema_mode):
+        with schema_context("tenant_1"):
+            assert search_path() == "tenant_1, public"
+
+        assert search_path() == "public"
+
+    def test_unchanged_search_path_is_not_set_again(self, schema_mode):
+        activate_schema("tenant_1")
+
+        with CaptureQueriesContext(connection) as queries:
+            activate_schema("tenant_1")
+            activate_schema("tenant_2")
+
+        assert len(set_path_queries(queries)) == 1
+
+    def test_reconnecting_sets_search_path_again(self, schema_mode):
+        activate_schema("tenant_1")
+        connection.close()
+
+        activate_schema("tenant_1")
+
+        assert search_path() == "tenant_1, public"
+
+    def test_middleware_switches_schema(self, schema_mode):
+        tenant = TenantFactory(subdomain="acme")
+        seen = []
+
+        def view(request):
+            seen.append(search_path())
+            return HttpResponse("ok")
+
+        middleware = TenantMiddleware(view)
+        rf = RequestFactory()
+        middleware(rf.get("/", HTTP_HOST="acme.localhost"))
+        middleware(rf.get("/", HTTP_HOST="localhost"))
+
+        assert seen == [f"{tenant.schema_name}, public", "public"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migrate_schemas(schema_mode):
+    tenants = TenantFactory.create_batch(3)
+    post_migrate_apps = []
+
+    def receiver(sender, **kwargs):
+        post_migrate_apps.append(sender.label)
+
+    post_migrate.connect(receiver)
+    try:
+        call_command("migrate_schemas", workers=2, skip_public=True, verbosity=0)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT table_schema FROM information_schema.tables "
+                "WHERE table_name = 'django_celery_results_taskresult'"
+            )
+            schemas = {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                "SELECT count(*) FROM information_schema.tables "
+                "WHERE table_schema = %s AND table_name = 'user_user'",
+                [tenants[0].schema_name],
+            )
+            (user_tables,) = cursor.fetchone()
+    finally:
+        post_migrate.disconnect(receiver)
+        for tenant in tenants:
+            drop_schema(tenant.schema_name)
+
+    assert schemas >= {tenant.schema_name for tenant in tenants}
+    assert user_tables == 0
+    # Sent once for every app, not once per schema
+    assert post_migrate_apps.count("contenttypes") == 1
@@ -0,0 +1,146 @@
+import pytest
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from django.core.management import call_command
+from django.db import connections
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from tenant.context import tenant_context
+from tenant.models import Tenant, TenantDomain, TenantPayment
+from tenant.routers import ShardRouter
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.resolver import tenant_resolver
+from tenant.utils.shards import get_sharded_models, is_sharded, move_tenant
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+DATABASES = ["default", "shard"]
+
+
+@pytest.fixture
+def shards(settings):
+    settings.DATABASE_SHARDS = ["default", "shard"]
+
+
+def create_user(tenant):
+    # factory_boy saves through `using("default")`; let the router decide
+    user = UserFactory.build(tenant=tenant)
+    user.save()
+    return user
+
+
+def create_payment(tenant):
+    return TenantPayment.objects.create(
+        tenant=tenant,
+        provider=TenantPayment.PaymentProviderChoices.STRIPE,
+        plan=tenant.plan,
+        amount=10,
+    )
+
+
+def test_sharded_models():
+    assert is_sharded(User)
+    assert is_sharded(TenantPayment)
+    assert is_sharded(OutstandingToken)
+    assert not is_sharded(Tenant)
+    assert not is_sharded(TenantDomain)
+
+    models = [model for model, _ in get_sharded_models()]
+    assert models[0] is User
+    assert models.index(OutstandingToken) > models.index(User)
+
+
+def test_router_is_inactive_without_shards():
+    assert ShardRouter().db_for_read(User) is None
+
+
+@pytest.mark.django_db(databases=DATABASES)
+class TestShardPlacement:
+
+    def test_new_tenants_go_to_the_least_loaded_shard(self, shards):
+        first = TenantFactory()
+        second = TenantFactory()
+
+        assert {first.shard, second.shard} == {"default", "shard"}
+
+    def test_tenant_is_mirrored_to_its_shard(self, shards):
+        tenant = TenantFactory(shard="shard")
+        tenant.name = "Renamed"
+        tenant.save()
+
+        assert Tenant.objects.using("shard").get(pk=tenant.pk).name == "Renamed"
+
+    def test_rows_follow_the_tenant(self, shards):
+        tenant = TenantFactory(shard="shard")
+        user = create_user(tenant)
+        with tenant_context(tenant):
+            create_payment(tenant)
+            assert list(User.objects.all()) == [user]
+
+        assert user._state.db == "shard"
+        assert not User.objects.using("default").exists()
+        assert TenantPayment.objects.using("shard").count() == 1
+        assert list(tenant.users.all()) == [user]
+
+    def test_directory_stays_in_default(self, shards):
+        tenant = TenantFactory(subdomain="acme", shard="shard")
+
+        with tenant_context(tenant):
+            snapshot = tenant_resolver.resolve("acme")
+
+        assert snapshot.shard == "shard"
+        assert Tenant.objects.using("default").filter(pk=tenant.pk).exists()
+
+    def test_register_and_login_on_a_shard(self, shards):
+        TenantFactory(subdomain="acme", shard="shard")
+        client = APIClient()
+        credentials = {"email": "new@acme.com", "password": "Testing@123"}
+
+        for name in ("register-user", "login-user"):
+            response = client.post(
+                reverse(name), credentials, format="json", HTTP_HOST="acme.localhost"
+            )
+            assert response.status_code < 300
+
+        assert User.objects.using("shard").filter(email="new@acme.com").exists()
+        assert not User.objects.using("default").filter(email="new@acme.com").exists()
+
+
+@pytest.mark.django_db(databases=DATABASES)
+def test_move_tenant(shards):
+    tenant = TenantFactory(subdomain="acme", shard="default")
+    other = TenantFactory(shard="default")
+    users = UserFactory.create_batch(3, tenant=tenant)
+    UserFactory(tenant=other)
+    create_payment(tenant)
+    RefreshToken.for_user(users[0])
+    tenant_resolver.resolve("acme")
+
+    move_tenant(tenant, "shard", batch_size=2, log=lambda message: None)
+
+    tenant.refresh_from_db()
+    assert tenant.shard == "shard"
+    assert tenant_resolver.resolve("acme").shard == "shard"
+    assert User.objects.using("shard").filter(tenant=tenant).count() == 3
+    assert TenantPayment.objects.using("shard").count() == 1
+    assert OutstandingToken.objects.using("shard").count() == 1
+    assert not User.objects.using("default").filter(tenant=tenant).exists()
+    assert not OutstandingToken.objects.using("default").exists()
+    assert User.objects.using("default").filter(tenant=other).count() == 1
+
+
+@pytest.mark.django_db(databases=DATABASES, transaction=True)
+def test_migrate_shards(shards, settings):
+    tenant = TenantFactory(shard="shard")
+    Tenant.objects.using("shard").filter(pk=tenant.pk).delete()
+
+    call_command("migrate_shards", workers=2, verbosity=0)
+
+    assert Tenant.objects.using("shard").filter(pk=tenant.pk).exists()
+    with connections["shard"].cursor() as cursor:
+        cursor.execute("SELECT nextval(pg_get_serial_sequence('user_user', 'id'))")
+        (next_id,) = cursor.fetchone()
+    assert next_id > settings.TENANT_SHARD_ID_SPACING
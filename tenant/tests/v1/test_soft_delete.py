@@ -0,0 +1,137 @@
+import pytest
+from rest_framework_simplejwt.models import TokenUser
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tenant.context import tenant_context
+from tenant.models import Tenant, TenantPayment
+from tenant.tests.v1.factories import TenantFactory
+from tenant.utils.resolver import tenant_resolver
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+
+def create_payment(tenant):
+    return TenantPayment.objects.create(
+        tenant=tenant,
+        provider=TenantPayment.PaymentProviderChoices.STRIPE,
+        plan=tenant.plan,
+        amount=10,
+    )
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory(subdomain="acme")
+
+
+@pytest.mark.django_db
+class TestSoftDeleteManagers:
+
+    def test_managers(self, tenant):
+        live = create_payment(tenant)
+        gone = create_payment(tenant)
+        gone.delete()
+
+        assert list(TenantPayment.alive.all()) == [live]
+        assert list(TenantPayment.deleted.all()) == [gone]
+        assert TenantPayment.objects.count() == 2
+        assert TenantPayment.all_objects.count() == 2
+
+    def test_alive_is_tenant_scoped(self, tenant):
+        other = TenantFactory(subdomain="globex")
+        create_payment(tenant)
+        create_payment(other)
+
+        with tenant_context(tenant):
+            assert TenantPayment.alive.count() == 1
+            assert TenantPayment.all_objects.count() == 2
+
+    def test_queryset_soft_delete_is_a_single_update(self, tenant):
+        admin = UserFactory()
+        for _ in range(3):
+            create_payment(tenant)
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = TenantPayment.objects.filter(tenant=tenant).soft_delete(by=admin)
+
+        assert deleted == 3
+        assert len(queries) == 1
+        assert queries[0]["sql"].startswith("UPDATE")
+        assert set(TenantPayment.deleted.values_list("deleted_by", flat=True)) == {
+            admin.pk
+        }
+
+    def test_soft_delete_by_token_user(self, tenant):
+        admin = UserFactory(tenant=tenant)
+        create_payment(tenant)
+
+        TenantPayment.objects.soft_delete(by=TokenUser({"user_id": admin.pk}))
+        TenantPayment.objects.soft_delete(by=admin.pk)
+
+        assert TenantPayment.deleted.get().deleted_by == admin
+
+    def test_soft_delete_keeps_original_stamp(self, tenant):
+        payment = create_payment(tenant)
+        payment.delete()
+
+        assert TenantPayment.objects.soft_delete() == 0
+        payment.refresh_from_db()
+        assert payment.deleted_at is not None
+
+    def test_user_manager_has_soft_delete_helpers(self, tenant):
+        user = UserFactory(tenant=tenant)
+        UserFactory(tenant=tenant).delete()
+
+        assert list(User.objects.alive()) == [user]
+        assert User.objects.create_user("new", "new@example.com", "x")
+
+
+@pytest.mark.django_db
+class TestPartialIndexes:
+
+    @pytest.mark.parametrize(
+        "model, name",
+        [
+            (Tenant, "tenant_subdomain_alive_idx"),
+            (User, "user_email_alive_idx"),
+            (TenantPayment, "tenantpayment_tenant_alive_idx"),
+        ],
+    )
+    def test_index_is_partial(self, model, name):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+
+        assert constraints[name]["index"]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT indexdef FROM pg_indexes WHERE indexname = %s", [name]
+            )
+            (definition,) = cursor.fetchone()
+        assert "WHERE (deleted_at IS NULL)" in definition
+
+
+@pytest.mark.django_db
+def test_soft_deleted_tenant_does_not_resolve(tenant):
+    assert tenant_resolver.resolve("acme") is not None
+
+    tenant.delete()
+
+    assert tenant_resolver.resolve("acme") is None
+
+
+@pytest.mark.django_db
+def test_queryset_soft_deleted_tenant_does_not_resolve(
+    tenant, django_capture_on_commit_callbacks
+):
+    assert tenant_resolver.resolve("acme") is not None
+    assert tenant_resolver.resolve_id(tenant.pk) is not None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert Tenant.objects.filter(pk=tenant.pk).soft_delete() == 1
+
+    assert tenant_resolver.resolve("acme") is None
+    assert tenant_resolver.resolve_id(tenant.pk) is None
@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django_redis import get_redis_connection
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def positions(item: str, size: int, hash_count: int) -> Iterator[int]:
+    """
+    Yield the `hash_count` bit positions of `item` in a filter of `size`
+    bits. Bits are numbered like Redis' `SETBIT`: bit 0 is the most
+    significant bit of the first byte.
+    """
+    # Double hashing: derive every position from two 64-bit halves of
+    # a single digest (Kirsch & Mitzenmacher).
+    digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+    first = int.from_bytes(digest[:8], "little")
+    second = int.from_bytes(digest[8:], "little") | 1
+    for index in range(hash_count):
+        yield (first + index * second) % size
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set: `in` never gives a false negative, and gives
+    a false positive with roughly the probability it was sized for.
+    """
+
+    def __init__(self, size: int, hash_count: int, bits: Optional[bytes] = None):
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bytearray(bits) if bits is not None else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """Size a filter for `capacity` items at the given false positive rate."""
+        capacity = max(capacity, 1)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hash_count)
+
+    def add(self, item: str) -> None:
+        for position in positions(item, self.size, self.hash_count):
+            self.bits[position >> 3] |= 0x80 >> (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (0x80 >> (position & 7))
+            for position in positions(item, self.size, self.hash_count)
+        )
+
+
+class SharedBloomFilter:
+    """
+    Per-process copy of a `BloomFilter` whose bits are shared in Redis.
+
+    The filter is a Redis bitmap (`<name>:bits`) described by a hash
+    (`<name>:meta`) holding its size, hash count and a version that every
+    change bumps. Workers compare the version at most every
+    `TENANT_BLOOM_CHECK_INTERVAL` seconds and only fetch the bitmap when
+    it changed.
+
+    New items are added with `add()` once they are committed: a `SETBIT`
+    per position, which is idempotent and can't undo a concurrent add.
+    `rebuild()` replaces the whole bitmap to drop removed items and resize
+    it, and is run periodically (`rebuild_subdomain_filter`). A rebuild is
+    only published if nothing was added while it read `load_items`;
+    otherwise it reads them again, so it never loses a concurrent add.
+
+    While no filter is available (cold cache, Redis down, another worker
+    still building it) `might_contain` answers True, so callers fall back
+    to their regular lookup instead of rejecting valid items. With a cache
+    other than django_redis, e.g. in tests, each process keeps a filter of
+    its own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        load_items: Callable[[], Iterable[str]],
+        count_items: Callable[[], int],
+        cache_alias: str = "default",
+    ):
+        self.name = name
+        self.load_items = load_items
+        self.count_items = count_items
+        self.cache_alias = cache_alias
+        self._filter: Optional[BloomFilter] = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Raises NotImplementedError for caches other than django_redis
+        return get_redis_connection(self.cache_alias)
+
+    @property
+    def bits_key(self) -> str:
+        return f"{self.name}:bits"
+
+    @property
+    def meta_key(self) -> str:
+        return f"{self.name}:meta"
+
+    @property
+    def adds_key(self) -> str:
+        return f"{self.name}:adds"
+
+    @property
+    def lock_key(self) -> str:
+        return f"{self.name}:lock"
+
+    def might_contain(self, item: str) -> bool:
+        bloom = self._filter
+        return bloom is None or item in bloom
+
+    def add(self, item: str) -> None:
+        """Add `item` to the local copy and to the shared bitmap."""
+        bloom = self._filter
+        if bloom is not None:
+            bloom.add(item)
+
+        try:
+            client = self.client
+        except NotImplementedError:
+            return
+
+        def set_bits(pipe):
+            size, hash_count = pipe.hmget(self.meta_key, "size", "hash_count")
+            pipe.multi()
+            # Tells a rebuild in progress that its snapshot may miss `item`
+            pipe.incr(self.adds_key)
+            if size is None:
+                return
+            for position in positions(item, int(size), int(hash_count)):
+                pipe.setbit(self.bits_key, position, 1)
+            pipe.hincrby(self.meta_key, "version", 1)
+
+        try:
+            # Retried if a rebuild changes the size in the meantime
+            client.transaction(set_bits, self.meta_key)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Unable to add %r to the %s filter.", item, self.name, exc_info=True
+            )
+
+    def rebuild(self) -> None:
+        """Build the filter from the source of truth and publish it."""
+        try:
+            client = self.client
+        except NotImplementedError:
+            self._set(self._build(), version=None)
+            return
+
+        def publish(pipe):
+            # Runs again if an item is added before the bitmap is replaced
+            bloom = self._build()
+            version = time.time_ns()
+            pipe.multi()
+            pipe.set(self.bits_key, bytes(bloom.bits))
+            pipe.hset(
+                self.meta_key,
+                mapping={
+                    "size": bloom.size,
+                    "hash_count": bloom.hash_count,
+                    "version": version,
+                },
+            )
+            return bloom, version
+
+        try:
+            bloom, version = client.transaction(
+                publish, self.adds_key, value_from_callable=True
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to publish the %s filter.", self.name, exc_info=True)
+            return
+
+        self._set(bloom, version)
+
+    def refresh_if_stale(self) -> None:
+        """Adopt the published filter if it changed, building it if missing."""
+        if not self._is_fresh():
+            self._refresh()
+
+    async def arefresh_if_stale(self) -> None:
+        """Async variant of `refresh_if_stale`."""
+        if not self._is_fresh():
+            await sync_to_async(self._refresh)()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._filter = None
+            self._version = None
+            self._checked_at = 0.0
+
+    def _build(self) -> BloomFilter:
+        bloom = BloomFilter.for_capacity(
+            # Leave headroom so the error rate holds until the next rebuild
+            capacity=max(self.count_items() * 2, 1024),
+            error_rate=settings.TENANT_BLOOM_ERROR_RATE,
+        )
+        for item in self.load_items():
+            bloom.add(item)
+        return bloom
+
+    def _set(self, bloom: Optional[BloomFilter], version) -> None:
+        with self._lock:
+            self._filter = bloom
+            self._version = version
+
+    def _refresh(self) -> None:
+        try:
+            client = self.client
+        except NotImplementedError:
+            if self._filter is None:
+                self.rebuild()
+            return
+
+        try:
+            version = client.hget(self.meta_key, "version")
+            if version is None:
+                self._build_once(client)
+            elif int(version) != self._version:
+                self._adopt(client)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to refresh the %s filter.", self.name, exc_info=True)
+            # Adds can't reach this copy anymore; answer "maybe" instead
+            self._set(None, None)
+
+    def _build_once(self, client) -> None:
+        # Only one worker rebuilds a missing filter; the others keep
+        # answering "maybe" until it has been published.
+        if client.set(self.lock_key, 1, nx=True, ex=60):
+            try:
+                self.rebuild()
+            finally:
+                client.delete(self.lock_key)
+
+    def _adopt(self, client) -> None:
+        with client.pipeline() as pipe:
+            pipe.hmget(self.meta_key, "version", "size", "hash_count")
+            pipe.get(self.bits_key)
+            (version, size, hash_count), bits = pipe.execute()
+
+        if version is None:
+            return
+
+        size = int(size)
+        # `SETBIT` only grows the bitmap up to the highest bit set so far
+        bits = (bits or b"").ljust((size + 7) // 8, b"\0")
+        self._set(BloomFilter(size, int(hash_count), bits), int(version))
+
+    def _is_fresh(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < settings.TENANT_BLOOM_CHECK_INTERVAL:
+            return True
+
+        self._checked_at = now
+        return False
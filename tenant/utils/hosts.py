@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = "tenant:domains:version"
+
+
+def normalize_host(host: str) -> str:
+    """Lowercase `host` and strip the port and any trailing dot."""
+    return host.split(":")[0].rstrip(".").lower()
+
+
+def get_subdomain(host: str, main_domain: str) -> Optional[str]:
+    """
+    Return the tenant subdomain of `host` under `main_domain`.
+
+    The label directly left of the main domain identifies the tenant, so
+    nested hosts such as `api.acme.example.com` still resolve to `acme`.
+    Hosts outside of the main domain have no subdomain.
+    """
+    host = normalize_host(host)
+    main_domain = normalize_host(main_domain)
+
+    if host == main_domain or not host.endswith(f".{main_domain}"):
+        return None
+
+    prefix = host[: -len(main_domain) - 1]
+    return prefix.rsplit(".", 1)[-1] or None
+
+
+class HostIndex:
+    """
+    In-memory `domain → tenant id` index for custom tenant domains.
+
+    Lookups are a single dict access on the normalized host and never touch
+    the database. The index is built once per worker (see `config.asgi`),
+    patched in place by `tenant.signals` when a domain change made in
+    this process commits, and rebuilt when another process bumps the
+    shared version in `CACHES["default"]`. That version is checked at most once every
+    `TENANT_DOMAIN_INDEX_CHECK_INTERVAL` seconds.
+    """
+
+    def __init__(self, cache_alias: str = "default"):
+        self.cache_alias = cache_alias
+        self._domains: Dict[str, int] = {}
+        self._version = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_tenant_id(self, host: str) -> Optional[int]:
+        """Return the tenant id mapped to `host`, if it is a custom domain."""
+        return self._domains.get(normalize_host(host))
+
+    def load(self) -> None:
+        """(Re)build the whole index from the primary database."""
+        from tenant.models import TenantDomain
+
+        version = self._get_version()
+        domains = dict(
+            TenantDomain._base_manager.using(DEFAULT_DB_ALIAS)
+            .filter(is_active=True, deleted_at__isnull=True)
+            .values_list("domain", "tenant_id")
+        )
+        with self._lock:
+            self._domains = domains
+            self._version = version
+            self._loaded = True
+            self._checked_at = time.monotonic()
+
+    def warm(self) -> None:
+        """Load the index at worker start, tolerating a not yet migrated database."""
+        try:
+            self.load()
+        except DatabaseError:
+            logger.warning("Unable to load tenant domains, retrying on first request.")
+        finally:
+            # Don't hand the start-up connection over to request threads
+            connections.close_all()
+
+    def refresh_if_stale(self) -> None:
+        """Reload the index if it was never loaded or another worker changed it."""
+        if self._is_fresh():
+            return
+
+        if not self._loaded or self._get_version() != self._version:
+            self.load()
+
+    async def arefresh_if_stale(self) -> None:
+        """Async variant of `refresh_if_stale`."""
+        if self._is_fresh():
+            return
+
+        if not self._loaded or await self._aget_version() != self._version:
+            await sync_to_async(self.load)()
+
+    def add(self, domain: str, tenant_id: int) -> None:
+        """Map `domain` to `tenant_id` in this process and notify the others."""
+        with self._lock:
+            self._domains[normalize_host(domain)] = tenant_id
+        self._bump_version()
+
+    def remove(self, domain: str) -> None:
+        """Drop `domain` in this process and notify the others."""
+        with self._lock:
+            self._domains.pop(normalize_host(domain), None)
+        self._bump_version()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._domains = {}
+            self._version = None
+            self._loaded = False
+            self._checked_at = 0.0
+
+    def _is_fresh(self) -> bool:
+        interval = settings.TENANT_DOMAIN_INDEX_CHECK_INTERVAL
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < interval:
+            return True
+
+        self._checked_at = now
+        return False
+
+    def _get_version(self):
+        try:
+            return self.cache.get(VERSION_CACHE_KEY)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to read the tenant domain version.", exc_info=True)
+            return self._version
+
+    async def _aget_version(self):
+        try:
+            return await self.cache.aget(VERSION_CACHE_KEY)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to read the tenant domain version.", exc_info=True)
+            return self._version
+
+    def _bump_version(self) -> None:
+        # Adopt the new version ourselves so this worker doesn't reload the
+        # change it just applied, unless another worker changed the index
+        # since our last load. Incrementing is atomic, so of two workers
+        # bumping at once only the first can see its own previous version.
+        try:
+            self.cache.add(VERSION_CACHE_KEY, 0, timeout=None)
+            version = self.cache.incr(VERSION_CACHE_KEY)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Unable to publish the tenant domain version.", exc_info=True
+            )
+            return
+
+        with self._lock:
+            if version - 1 == (self._version or 0):
+                self._version = version
+
+
+host_index = HostIndex()
@@ -0,0 +1,423 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+
+from tenant.models import Tenant
+from tenant.utils.bloom import SharedBloomFilter
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "tenant:snapshot"
+
+# Stored in the shared tier for subdomains/ids known not to exist
+MISSING = "missing"
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """
+    Lean, immutable view of a tenant row used for request resolution.
+
+    Only the columns needed to route a request are kept, so unbounded
+    fields such as `policy` never leave the database on the hot path.
+    """
+
+    id: int
+    name: str
+    slug: Optional[str]
+    subdomain: Optional[str]
+    plan: str
+    payment_status: str
+    is_active: bool
+    shard: str = ""
+    token_version: int = 0
+
+    @classmethod
+    def field_names(cls) -> Tuple[str, ...]:
+        """Return the model fields stored in a snapshot, in order."""
+        return tuple(cls.__dataclass_fields__)
+
+    def to_model(self) -> Tenant:
+        """
+        Build a `Tenant` instance from the snapshot without a query.
+
+        Fields outside of the snapshot are deferred, so they are only loaded
+        from the database if something actually accesses them.
+        """
+        fields = Tenant._meta.concrete_fields
+        values = [getattr(self, field.attname, DEFERRED) for field in fields]
+        return Tenant.from_db(
+            DEFAULT_DB_ALIAS, [field.attname for field in fields], values
+        )
+
+
+class LRUCache:
+    """Small thread-safe LRU with a per-entry time to live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ResolutionCounters:
+    """
+    Counts requests rejected without a database lookup, per reason.
+
+    Increments are kept in process and pushed to `CACHES["default"]` at
+    most once per `flush_interval` seconds, so counting a rejected request
+    doesn't cost a round trip of its own.
+    """
+
+    REASONS = ("bloom", "negative_cache", "database")
+
+    def __init__(self, cache_alias: str = "default", flush_interval: float = 1.0):
+        self.cache_alias = cache_alias
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def cache_key(reason: str) -> str:
+        return f"tenant:rejected:{reason}"
+
+    def incr(self, reason: str) -> None:
+        with self._lock:
+            self._pending[reason] += 1
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+
+        try:
+            for reason, count in pending.items():
+                key = self.cache_key(reason)
+                self.cache.add(key, 0, timeout=None)
+                self.cache.incr(key, count)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Unable to publish tenant rejection counters.", exc_info=True
+            )
+
+    def totals(self) -> Dict[str, int]:
+        """Return the shared totals, including this process' unflushed counts."""
+        self.flush()
+        values = self.cache.get_many(
+            [self.cache_key(reason) for reason in self.REASONS]
+        )
+        return {
+            reason: values.get(self.cache_key(reason), 0) for reason in self.REASONS
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+        self.cache.delete_many([self.cache_key(reason) for reason in self.REASONS])
+
+
+# Tenant lookups read from the primary: they only run on cache misses, and
+# a lagging replica would get a brand new tenant cached as missing.
+
+
+def _load_subdomains() -> Iterable[str]:
+    return (
+        Tenant.objects.using(DEFAULT_DB_ALIAS)
+        .alive()
+        .exclude(subdomain=None)
+        .values_list("subdomain", flat=True)
+        .iterator(chunk_size=5000)
+    )
+
+
+def _count_subdomains() -> int:
+    return (
+        Tenant.objects.using(DEFAULT_DB_ALIAS).alive().exclude(subdomain=None).count()
+    )
+
+
+class TenantResolver:
+    """
+    Resolve a subdomain or tenant id to a `TenantSnapshot` through two
+    cache tiers.
+
+    1. A bounded in-process LRU, so repeated hosts cost a dict lookup.
+    2. The shared `CACHES["default"]` (Redis), so a cold worker doesn't
+       have to hit Postgres.
+
+    The database is only queried when both tiers miss. Entries are
+    invalidated through `tenant.signals`; the LRU additionally expires
+    entries after `TENANT_LOCAL_CACHE_TTL` seconds because invalidations
+    can only reach the local cache of the worker that saved the tenant.
+
+    Unknown subdomains are turned away by a negative entry kept in the
+    shared tier for `TENANT_NEGATIVE_CACHE_TTL` seconds, so each reaches
+    Postgres at most once per that period. A Bloom filter of every valid
+    subdomain tells which lookups are probably unknown, but only as a hint:
+    it lags tenants created by other workers (until their next refresh) or
+    without signals (`bulk_create()`, `update()`, until the next rebuild),
+    so a miss is still confirmed before answering. A tenant found despite
+    a miss is added to the filter. Negative results are never stored in
+    the LRU, so a scanner can't evict real tenants from it. Soft-deleted
+    tenants don't resolve.
+    """
+
+    def __init__(self, cache_alias: str = "default"):
+        self.cache_alias = cache_alias
+        self._local = None
+        self.bloom = SharedBloomFilter(
+            "tenant:subdomains",
+            load_items=_load_subdomains,
+            count_items=_count_subdomains,
+            cache_alias=cache_alias,
+        )
+        self.counters = ResolutionCounters(cache_alias)
+
+    @property
+    def local(self) -> LRUCache:
+        if self._local is None:
+            self._local = LRUCache(
+                maxsize=settings.TENANT_LOCAL_CACHE_SIZE,
+                ttl=settings.TENANT_LOCAL_CACHE_TTL,
+            )
+        return self._local
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @staticmethod
+    def cache_key(field: str, value: Any) -> str:
+        return f"{CACHE_KEY_PREFIX}:{field}:{value}"
+
+    def resolve(self, subdomain: str) -> Optional[TenantSnapshot]:
+        """Return the snapshot for `subdomain`, or None if no tenant matches."""
+        return self._resolve("subdomain", subdomain)
+
+    def resolve_id(self, tenant_id: int) -> Optional[TenantSnapshot]:
+        """Return the snapshot for the tenant with primary key `tenant_id`."""
+        return self._resolve("id", tenant_id)
+
+    async def aresolve(self, subdomain: str) -> Optional[TenantSnapshot]:
+        """Async variant of `resolve` for the ASGI request path."""
+        return await self._aresolve("subdomain", subdomain)
+
+    async def aresolve_id(self, tenant_id: int) -> Optional[TenantSnapshot]:
+        """Async variant of `resolve_id` for the ASGI request path."""
+        return await self._aresolve("id", tenant_id)
+
+    def invalidate(
+        self, subdomains: Iterable[Optional[str]] = (), ids: Iterable[int] = ()
+    ) -> None:
+        """
+        Drop the given subdomains and tenant ids from both cache tiers,
+        including any negative entries.
+        """
+        keys = [("subdomain", value) for value in subdomains if value] + [
+            ("id", value) for value in ids if value
+        ]
+        for key in keys:
+            self.local.pop(key)
+
+        if not keys:
+            return
+
+        try:
+            self.cache.delete_many([self.cache_key(*key) for key in keys])
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Unable to invalidate cached tenants %s", keys, exc_info=True
+            )
+
+    def clear(self) -> None:
+        """Empty the in-process state (the shared tier expires on its own)."""
+        self.local.clear()
+        self.bloom.clear()
+
+    def _resolve(self, field: str, value: Any) -> Optional[TenantSnapshot]:
+        snapshot = self.local.get((field, value))
+        if snapshot is not None:
+            return snapshot
+
+        unlikely = False
+        if field == "subdomain":
+            self.bloom.refresh_if_stale()
+            unlikely = not self.bloom.might_contain(value)
+
+        cached = self._get_shared(field, value)
+        if cached == MISSING:
+            self.counters.incr("bloom" if unlikely else "negative_cache")
+            return None
+
+        snapshot = cached
+        if snapshot is None:
+            snapshot = self._get_from_database(field, value)
+            self._set_shared(field, value, snapshot)
+            if snapshot is None:
+                self.counters.incr("bloom" if unlikely else "database")
+                return None
+
+        if unlikely:
+            self.bloom.add(value)
+        self.local.set((field, value), snapshot)
+        return snapshot
+
+    async def _aresolve(self, field: str, value: Any) -> Optional[TenantSnapshot]:
+        # A local hit never leaves the event loop; the shared cache and the
+        # database are only awaited on a miss.
+        snapshot = self.local.get((field, value))
+        if snapshot is not None:
+            return snapshot
+
+        unlikely = False
+        if field == "subdomain":
+            await self.bloom.arefresh_if_stale()
+            unlikely = not self.bloom.might_contain(value)
+
+        cached = await self._aget_shared(field, value)
+        if cached == MISSING:
+            self.counters.incr("bloom" if unlikely else "negative_cache")
+            return None
+
+        snapshot = cached
+        if snapshot is None:
+            snapshot = await self._aget_from_database(field, value)
+            await self._aset_shared(field, value, snapshot)
+            if snapshot is None:
+                self.counters.incr("bloom" if unlikely else "database")
+                return None
+
+        if unlikely:
+            await sync_to_async(self.bloom.add)(value)
+        self.local.set((field, value), snapshot)
+        return snapshot
+
+    @staticmethod
+    def _decode(values):
+        if values is None or values == MISSING:
+            return values
+        return TenantSnapshot(*values)
+
+    @staticmethod
+    def _encode(snapshot: Optional[TenantSnapshot]):
+        if snapshot is None:
+            return MISSING, settings.TENANT_NEGATIVE_CACHE_TTL
+        return astuple(snapshot), settings.TENANT_CACHE_TIMEOUT
+
+    def _get_shared(self, field: str, value: Any):
+        try:
+            values = self.cache.get(self.cache_key(field, value))
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Tenant cache unavailable, falling back to the database.", exc_info=True
+            )
+            return None
+
+        return self._decode(values)
+
+    async def _aget_shared(self, field: str, value: Any):
+        try:
+            values = await self.cache.aget(self.cache_key(field, value))
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Tenant cache unavailable, falling back to the database.", exc_info=True
+            )
+            return None
+
+        return self._decode(values)
+
+    def _set_shared(
+        self, field: str, value: Any, snapshot: Optional[TenantSnapshot]
+    ) -> None:
+        cached, timeout = self._encode(snapshot)
+        try:
+            self.cache.set(self.cache_key(field, value), cached, timeout=timeout)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to cache tenant %s=%s", field, value, exc_info=True)
+
+    async def _aset_shared(
+        self, field: str, value: Any, snapshot: Optional[TenantSnapshot]
+    ) -> None:
+        cached, timeout = self._encode(snapshot)
+        try:
+            await self.cache.aset(self.cache_key(field, value), cached, timeout=timeout)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to cache tenant %s=%s", field, value, exc_info=True)
+
+    @staticmethod
+    def _snapshot_rows(field: str, value: Any):
+        return (
+            Tenant.objects.using(DEFAULT_DB_ALIAS)
+            .alive()
+            .filter(**{field: value})
+            .values_list(*TenantSnapshot.field_names())[:1]
+        )
+
+    def _get_from_database(self, field: str, value: Any) -> Optional[TenantSnapshot]:
+        row = next(iter(self._snapshot_rows(field, value)), None)
+        return TenantSnapshot(*row) if row else None
+
+    async def _aget_from_database(
+        self, field: str, value: Any
+    ) -> Optional[TenantSnapshot]:
+        async for row in self._snapshot_rows(field, value):
+            return TenantSnapshot(*row)
+        return None
+
+
+tenant_resolver = TenantResolver()
@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.recorder import MigrationRecorder
+
+PUBLIC_SCHEMA = "public"
+
+# Apps that other tenants' data or authentication depends on; their tables
+# always stay in the public schema.
+SHARED_APPS = (
+    "admin",
+    "auth",
+    "authtoken",
+    "contenttypes",
+    "oauth2_provider",
+    "sessions",
+    "sites",
+    "tenant",
+    "token_blacklist",
+    "user",
+)
+
+
+def schema_isolation_enabled() -> bool:
+    return settings.TENANT_ISOLATION == "schema"
+
+
+def activate_schema(schema: Optional[str], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Point the connection's `search_path` at `schema`, falling back to public
+    for shared tables. `None` activates only the public schema.
+
+    Connections are persistent (`CONN_MAX_AGE`), so the SET is skipped when
+    the connection already uses that search path. This needs session
+    pooling; a transaction-level pooler would drop the setting between
+    statements.
+    """
+    connection = connections[using]
+    if schema:
+        _set_search_path(connection, schema, PUBLIC_SCHEMA)
+    else:
+        _set_search_path(connection, PUBLIC_SCHEMA)
+    connection.tenant_schema = schema
+
+
+@contextmanager
+def schema_context(schema: Optional[str], using: str = DEFAULT_DB_ALIAS):
+    """
+    Run a block of code inside a tenant schema, e.g. in Celery tasks or the
+    shell, and restore the previous schema afterwards.
+
+    Example:
+        with schema_context(tenant.schema_name):
+            Invoice.objects.count()
+    """
+    previous = getattr(connections[using], "tenant_schema", None)
+    activate_schema(schema, using)
+    try:
+        yield schema
+    finally:
+        activate_schema(previous, using)
+
+
+def create_schema(schema: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE SCHEMA IF NOT EXISTS {connection.ops.quote_name(schema)}"
+        )
+
+
+def drop_schema(schema: str, using: str = DEFAULT_DB_ALIAS) -> None:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DROP SCHEMA IF EXISTS {connection.ops.quote_name(schema)} CASCADE"
+        )
+
+
+def migrate_schema(
+    schema: str, using: str = DEFAULT_DB_ALIAS, emit_post_migrate: bool = True
+) -> None:
+    """
+    Create `schema` if needed and apply the migrations of
+    `TENANT_SCHEMA_APPS` to it.
+
+    `post_migrate` handlers write to shared tables in public (content
+    types, permissions), so schemas migrated in parallel should pass
+    `emit_post_migrate=False` and emit it once afterwards: concurrent
+    handlers race into IntegrityErrors.
+    """
+    connection = connections[using]
+    create_schema(schema, using)
+    with schema_context(schema, using):
+        # Each schema records its own migrations: create django_migrations
+        # while public is out of the search path, or the recorder would
+        # find and reuse the public one.
+        _set_search_path(connection, schema)
+        MigrationRecorder(connection).ensure_schema()
+        activate_schema(schema, using)
+
+        executor = MigrationExecutor(connection)
+        targets = executor.loader.graph.leaf_nodes()
+        plan = executor.migration_plan(targets)
+        if plan:
+            executor.migrate(targets, plan=plan)
+
+    if emit_post_migrate:
+        emit_post_migrate_signal(0, False, using)
+
+
+def reset_search_path_cache(connection) -> None:
+    """Forget the remembered search path, e.g. after (re)connecting."""
+    connection.tenant_schema = None
+    connection.tenant_search_path = None
+
+
+def _set_search_path(connection, *schemas: str) -> None:
+    search_path = ", ".join(connection.ops.quote_name(schema) for schema in schemas)
+    current = getattr(connection, "tenant_search_path", None)
+    if connection.connection is not None and current == search_path:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SET search_path TO {search_path}")
+
+    # Rolling back a transaction also reverts the SET, so it's only
+    # remembered when issued outside of one.
+    connection.tenant_search_path = None if connection.in_atomic_block else search_path
@@ -0,0 +1,217 @@
+import logging
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Count
+
+logger = logging.getLogger(__name__)
+
+# Audit columns pointing at users that may live on another shard
+AUDIT_FIELDS = ("created_by", "updated_by", "deleted_by")
+
+
+def sharding_enabled() -> bool:
+    return bool(settings.DATABASE_SHARDS)
+
+
+def get_shard(tenant) -> str:
+    """Return the database alias holding `tenant`'s rows."""
+    return getattr(tenant, "shard", "") or DEFAULT_DB_ALIAS
+
+
+def get_shard_for_id(tenant_id: Optional[int]) -> str:
+    """Like `get_shard`, for a tenant id (`None` for rows without a tenant)."""
+    from tenant.utils.resolver import tenant_resolver
+
+    if tenant_id is None:
+        return DEFAULT_DB_ALIAS
+    return get_shard(tenant_resolver.resolve_id(tenant_id))
+
+
+def choose_shard() -> str:
+    """Pick the shard with the fewest tenants for a new tenant."""
+    from tenant.models import Tenant
+
+    counts = dict.fromkeys(settings.DATABASE_SHARDS, 0)
+    rows = (
+        Tenant._base_manager.using(DEFAULT_DB_ALIAS)
+        .values_list("shard")
+        .annotate(total=Count("id"))
+    )
+    for shard, total in rows:
+        shard = shard or DEFAULT_DB_ALIAS
+        if shard in counts:
+            counts[shard] += total
+    return min(counts, key=counts.get)
+
+
+@lru_cache(maxsize=None)
+def _has_tenant_field(model: Type[models.Model]) -> bool:
+    try:
+        field = model._meta.get_field("tenant")
+    except FieldDoesNotExist:
+        return False
+    return field.is_relation and field.related_model._meta.label == "tenant.Tenant"
+
+
+def _has_tenant_rows(model: Type[models.Model]) -> bool:
+    if model._meta.label in settings.TENANT_GLOBAL_MODELS:
+        return False
+    return _has_tenant_field(model)
+
+
+def is_sharded(model: Type[models.Model]) -> bool:
+    """
+    Whether rows of `model` live on their tenant's shard: every model with a
+    `tenant` foreign key, unless listed in `TENANT_GLOBAL_MODELS`, plus the
+    models in `TENANT_SHARDED_MODELS`.
+    """
+    if model._meta.label in settings.TENANT_SHARDED_MODELS:
+        return True
+    return _has_tenant_rows(model)
+
+
+def get_sharded_models() -> List[Tuple[Type[models.Model], str]]:
+    """
+    Return `(model, lookup to the tenant)` for every sharded model, ordered
+    so rows are copied after the rows they reference.
+    """
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    direct = sorted(
+        filter(_has_tenant_rows, apps.get_models()),
+        key=lambda model: model is not user_model,
+    )
+    extra = [
+        (apps.get_model(label), lookup)
+        for label, lookup in settings.TENANT_SHARDED_MODELS.items()
+    ]
+    return [(model, "tenant") for model in direct] + extra
+
+
+def mirror_tenant(tenant, using: str) -> None:
+    """
+    Copy the directory row of `tenant` to shard `using`, so foreign keys to
+    the tenant hold there. The authoritative row stays in `default`.
+    """
+    if using == DEFAULT_DB_ALIAS:
+        return
+
+    model = type(tenant)
+    values = {
+        field.attname: getattr(tenant, field.attname)
+        for field in model._meta.concrete_fields
+        if field.name not in AUDIT_FIELDS and not field.primary_key
+    }
+    queryset = model._base_manager.using(using).filter(pk=tenant.pk)
+    # Plain UPDATE/INSERT: the copy must not trigger the tenant signals
+    if not queryset.update(**values):
+        model._base_manager.using(using).bulk_create([model(pk=tenant.pk, **values)])
+
+
+def reserve_id_range(using: str) -> None:
+    """
+    Move the id sequences of sharded tables on `using` into the shard's own
+    range, so rows keep their primary key when moved between shards.
+    """
+    index = settings.DATABASE_SHARDS.index(using)
+    start = index * settings.TENANT_SHARD_ID_SPACING + 1
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model, _ in get_sharded_models():
+            cursor.execute(
+                "SELECT pg_get_serial_sequence(%s, %s)",
+                [model._meta.db_table, model._meta.pk.column],
+            )
+            (sequence,) = cursor.fetchone()
+            if sequence is None:
+                continue
+
+            cursor.execute(f"SELECT last_value FROM {sequence}")
+            (last_value,) = cursor.fetchone()
+            if last_value < start:
+                cursor.execute("SELECT setval(%s, %s, false)", [sequence, start])
+
+
+def move_tenant(tenant, target: str, batch_size: int = 1000, log=logger.info):
+    """
+    Move every row of `tenant` to shard `target` in batches.
+
+    Rows are copied into a single transaction on the target (foreign keys
+    are only checked at commit), the directory is switched to the target
+    and the rows are then deleted from the source shard, batch by batch.
+    Rows written to the source while the copy runs are picked up by a
+    second pass right before the switch, but the tenant should be quiet
+    for the duration of the move.
+    """
+    from tenant.models import Tenant
+
+    source = get_shard(tenant)
+    if target == source:
+        return
+    if target not in settings.DATABASE_SHARDS:
+        raise ValueError(f"{target} is not a configured shard.")
+
+    sharded_models = get_sharded_models()
+    with transaction.atomic(using=target):
+        mirror_tenant(tenant, target)
+        for _ in range(2):
+            for model, lookup in sharded_models:
+                copied = _copy_rows(model, lookup, tenant, source, target, batch_size)
+                log(f"{model._meta.label}: copied {copied} row(s) to {target}")
+
+    tenant.shard = target
+    tenant.save(update_fields=["shard"])
+
+    for model, lookup in reversed(sharded_models):
+        deleted = _delete_rows(model, lookup, tenant, source, batch_size)
+        log(f"{model._meta.label}: deleted {deleted} row(s) from {source}")
+
+    if source != DEFAULT_DB_ALIAS:
+        Tenant._base_manager.using(source).filter(pk=tenant.pk).delete()
+
+
+def _tenant_rows(model, lookup: str, tenant, using: str):
+    return model._base_manager.using(using).filter(**{lookup: tenant.pk})
+
+
+def _copy_rows(model, lookup, tenant, source, target, batch_size) -> int:
+    fields = [
+        field.name for field in model._meta.concrete_fields if not field.primary_key
+    ]
+    copied = 0
+    last_pk: Optional[int] = None
+    while True:
+        batch = _tenant_rows(model, lookup, tenant, source).order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return copied
+
+        model._base_manager.using(target).bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=fields,
+        )
+        copied += len(rows)
+        last_pk = rows[-1].pk
+
+
+def _delete_rows(model, lookup, tenant, source, batch_size) -> int:
+    deleted = 0
+    while True:
+        pks = list(
+            _tenant_rows(model, lookup, tenant, source).values_list("pk", flat=True)[
+                :batch_size
+            ]
+        )
+        if not pks:
+            return deleted
+
+        model._base_manager.using(source).filter(pk__in=pks).delete()
+        deleted += len(pks)
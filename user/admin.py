@@ -1,10 +1,13 @@
 from django.contrib import admin
 
+from base.pagination import EstimatedCountPaginator
+from base.search import SearchVectorAdminMixin
 from user.models import User
+from user.utils.token_version import revoke_user_tokens
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(SearchVectorAdminMixin, admin.ModelAdmin):
     list_display = [
         "username",
         "tenant",
@@ -14,6 +17,20 @@ class UserAdmin(admin.ModelAdmin):
         "is_active",
         "is_staff",
     ]
-    search_fields = ["username", "first_name", "last_name"]
+    # Searched through User.search_vector, see SearchVectorAdminMixin
+    search_fields = ["username", "email", "first_name", "last_name"]
     list_filter = ["is_active"]
     ordering = ["-created_at"]
+    list_select_related = ["tenant"]
+    autocomplete_fields = ["tenant", "created_by", "updated_by", "deleted_by"]
+    actions = ["revoke_tokens"]
+    # COUNT(*) is estimated on large tables, and not run again unfiltered
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.action(description="Log selected users out of all sessions")
+    def revoke_tokens(self, request, queryset):
+        users = list(queryset.only("pk", "tenant_id"))
+        for user in users:
+            revoke_user_tokens(user)
+        self.message_user(request, f"Logged out {len(users)} user(s).")
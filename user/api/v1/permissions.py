@@ -0,0 +1,31 @@
+from rest_framework.permissions import BasePermission
+
+from user.models import User
+
+
+class IsTenantAdmin(BasePermission):
+    """Staff, or an admin of the tenant the request is made to."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_staff:
+            return True
+        tenant = getattr(request, "tenant", None)
+        if tenant is None or user.tenant_id != tenant.pk:
+            return False
+        return user.user_type == User.UserTypeChoices.TENANT_ADMIN
+
+
+class IsTenantMember(BasePermission):
+    """Staff, or a user of the tenant the request is made to."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_staff:
+            return True
+        tenant = getattr(request, "tenant", None)
+        return tenant is not None and user.tenant_id == tenant.pk
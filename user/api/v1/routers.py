@@ -0,0 +1,25 @@
+from django.urls import path
+
+from user.api.v1.viewsets import (
+    ImportUsersView,
+    RevokeTenantTokensView,
+    RevokeUserTokensView,
+    SearchUsersView,
+    UserImportView,
+)
+
+urlpatterns = [
+    path("users/import", ImportUsersView.as_view(), name="import-users"),
+    path("users/import/<int:pk>", UserImportView.as_view(), name="user-import"),
+    path("users/search", SearchUsersView.as_view(), name="search-users"),
+    path(
+        "users/revoke-tokens",
+        RevokeTenantTokensView.as_view(),
+        name="revoke-tenant-tokens",
+    ),
+    path(
+        "users/<int:pk>/revoke-tokens",
+        RevokeUserTokensView.as_view(),
+        name="revoke-user-tokens",
+    ),
+]
@@ -1,5 +1,7 @@
+from rest_framework import serializers
+
 from base.api.v1.serializers import BaseSerializer
-from user.models import User
+from user.models import User, UserImport
 
 
 class UserSerializer(BaseSerializer):
@@ -21,3 +23,16 @@ class UserSerializer(BaseSerializer):
         extra_kwargs = {
             "id": {"read_only": True},
         }
+
+
+class UserImportSerializer(BaseSerializer):
+    """
+    Serializer for UserImport model: its status, and the report once done.
+    """
+
+    url = serializers.HyperlinkedIdentityField(view_name="user-import")
+
+    class Meta:
+        model = UserImport
+        fields = ["id", "url", "status", "report", "created_at", "updated_at"]
+        read_only_fields = fields
@@ -1 +1,160 @@
-# Create your views here.
+from django.db import transaction
+from django.http import Http404
+
+from rest_framework import serializers, status
+from rest_framework.generics import GenericAPIView, ListAPIView, RetrieveAPIView
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from base.search import search
+from tenant.utils.shards import get_shard
+from user.api.v1.permissions import IsTenantAdmin, IsTenantMember
+from user.api.v1.serializers import UserImportSerializer, UserSerializer
+from user.models import User, UserImport
+from user.tasks import import_users
+from user.utils.token_version import revoke_tenant_tokens, revoke_user_tokens
+
+
+class ImportUsersSerializer(serializers.Serializer):
+    file = serializers.FileField()
+
+    def validate_file(self, file):
+        if not file.name.lower().endswith((".csv", ".xlsx")):
+            raise serializers.ValidationError("Upload a CSV or XLSX file.")
+        return file
+
+
+class ImportUsersView(GenericAPIView):
+    """
+    Bulk import endpoint.
+
+    Stores the uploaded CSV or XLSX file and queues the `import_users` task
+    to create the current tenant's users from it. Answers 202 with the
+    import, whose `url` has its status and, once done, its per-row report.
+    """
+
+    permission_classes = [IsTenantAdmin]
+    parser_classes = [MultiPartParser]
+    serializer_class = ImportUsersSerializer
+
+    def post(self, request, *args, **kwargs):
+        """Handle import request."""
+        tenant = getattr(request, "tenant", None)
+        if not tenant:
+            return Response(
+                {"detail": "Tenant information is missing."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        using = get_shard(tenant)
+        user_import = UserImport(
+            tenant=tenant,
+            file=serializer.validated_data["file"],
+            # Audit columns may only point at users on the same shard
+            created_by_id=(
+                request.user.pk if request.user.tenant_id == tenant.pk else None
+            ),
+        )
+        user_import.save(using=using)
+        transaction.on_commit(
+            lambda: import_users.delay(user_import.pk, using), using=using
+        )
+        data = UserImportSerializer(user_import, context={"request": request}).data
+        return Response(
+            data, status=status.HTTP_202_ACCEPTED, headers={"Location": data["url"]}
+        )
+
+
+class UserImportView(RetrieveAPIView):
+    """Status, and report once done, of a bulk import of the current tenant."""
+
+    permission_classes = [IsTenantAdmin]
+    serializer_class = UserImportSerializer
+
+    def get_queryset(self):
+        tenant = getattr(self.request, "tenant", None)
+        if not tenant:
+            return UserImport.objects.none()
+        return UserImport._base_manager.using(get_shard(tenant)).filter(
+            tenant_id=tenant.pk
+        )
+
+
+class RevokeUserTokensView(GenericAPIView):
+    """Log a user of the current tenant out of every session."""
+
+    permission_classes = [IsTenantAdmin]
+
+    def post(self, request, pk, *args, **kwargs):
+        """Handle revocation request."""
+        tenant = getattr(request, "tenant", None)
+        if not tenant:
+            return Response(
+                {"detail": "Tenant information is missing."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = (
+            User._base_manager.using(get_shard(tenant))
+            .filter(pk=pk, tenant_id=tenant.pk)
+            .only("pk", "tenant_id")
+            .first()
+        )
+        if user is None:
+            raise Http404
+        revoke_user_tokens(user)
+        return Response({"detail": "User logged out of all sessions."})
+
+
+class RevokeTenantTokensView(GenericAPIView):
+    """Log every user of the current tenant out of every session."""
+
+    permission_classes = [IsTenantAdmin]
+
+    def post(self, request, *args, **kwargs):
+        """Handle revocation request."""
+        tenant = getattr(request, "tenant", None)
+        if not tenant:
+            return Response(
+                {"detail": "Tenant information is missing."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        revoke_tenant_tokens(tenant)
+        return Response({"detail": "All users logged out of all sessions."})
+
+
+class SearchUsersView(ListAPIView):
+    """
+    User directory search.
+
+    Lists the current tenant's live users whose names or email have words
+    starting with each word of `?q=`, best matches first, see
+    `base.search.search()`.
+    """
+
+    permission_classes = [IsTenantMember]
+    serializer_class = UserSerializer
+
+    def list(self, request, *args, **kwargs):
+        """Handle search request."""
+        if not getattr(request, "tenant", None):
+            return Response(
+                {"detail": "Tenant information is missing."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not request.query_params.get("q", "").strip():
+            return Response(
+                {"q": ["This field is required."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        tenant = self.request.tenant
+        users = User._base_manager.using(get_shard(tenant)).filter(
+            tenant_id=tenant.pk, deleted_at__isnull=True
+        )
+        return search(users, self.request.query_params["q"])
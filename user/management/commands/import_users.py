@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tenant.models import Tenant
+from user.utils.importer import COLUMNS, UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the users of a tenant from a CSV or XLSX file with the columns "
+        f"{', '.join(COLUMNS)}. Existing emails are skipped; invalid rows are "
+        "reported with their row number."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("subdomain", help="Subdomain of the tenant.")
+        parser.add_argument("path", help="CSV or XLSX file to import.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of rows inserted at a time (default: USER_IMPORT_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes, 0 to hash inline "
+            "(default: USER_IMPORT_WORKERS).",
+        )
+        parser.add_argument(
+            "--report",
+            help="Write the full report as JSON to this file.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            tenant = Tenant.objects.get(subdomain=options["subdomain"])
+        except Tenant.DoesNotExist:
+            raise CommandError(f"Tenant {options['subdomain']!r} does not exist.")
+
+        importer = UserImporter(
+            tenant, batch_size=options["batch_size"], workers=options["workers"]
+        )
+        try:
+            with open(options["path"], "rb") as file:
+                report = importer.run(read_rows(file, options["path"]))
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for error in report.errors:
+            self.stderr.write(
+                f"Row {error.row} ({error.email}): {' '.join(error.errors)}"
+            )
+        if options["report"]:
+            with open(options["report"], "w") as file:
+                json.dump(report.as_dict(), file, indent=2)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {report.created} user(s), skipped {report.skipped} "
+                f"existing, {len(report.errors)} row(s) failed."
+            )
+        )
@@ -0,0 +1,49 @@
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from auth.utils.blacklist import RedisBlacklist
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the refresh tokens blacklisted in the database that haven't "
+        "expired yet to the Redis blacklist. Run it before and right after "
+        "switching JWT_BLACKLIST_BACKEND to RedisBlacklist; it is idempotent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of tokens written per Redis pipeline (default: 5000).",
+        )
+        parser.add_argument(
+            "--cache",
+            default="default",
+            help="Cache alias of the Redis blacklist (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        blacklist = RedisBlacklist(options["cache"])
+        batch_size = max(options["batch_size"], 1)
+        tokens = (
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .values_list("token__jti", "token__expires_at")
+            .order_by("pk")
+        )
+
+        copied = 0
+        batch = []
+        for jti, expires_at in tokens.iterator(chunk_size=batch_size):
+            batch.append((jti, int(expires_at.timestamp())))
+            if len(batch) >= batch_size:
+                copied += blacklist.add_many(batch)
+                batch = []
+        copied += blacklist.add_many(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Copied {copied} blacklisted token(s) to Redis.")
+        )
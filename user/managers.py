@@ -0,0 +1,41 @@
+from django.contrib.auth.models import UserManager as DjangoUserManager
+from django.db.models import F
+from django.db.models.functions import Lower
+
+from base.managers import BaseQuerySet
+
+
+class UserManager(DjangoUserManager.from_queryset(BaseQuerySet)):
+    """Django's `UserManager` with the soft-delete helpers of `BaseQuerySet`."""
+
+    def get_for_login(self, tenant, email: str):
+        """
+        Return the live user of `tenant` (None for platform users) with
+        `email`, ignoring case.
+
+        One lookup on the `(lower(email), tenant)` unique index. Raises
+        `DoesNotExist` like `get()`.
+        """
+        return (
+            self.alias(email_lower=Lower("email"))
+            .alive()
+            .get(tenant=tenant, email_lower=email.lower())
+        )
+
+    def get_by_natural_key(self, username):
+        """
+        Look the email up across tenants, for `ModelBackend` (the admin
+        login) and `createsuperuser`.
+
+        The same email may belong to users of several tenants; the platform
+        user wins, and when there is none the email is ambiguous, so no
+        user is returned rather than an arbitrary one.
+        """
+        users = list(
+            self.alias(email_lower=Lower("email"))
+            .filter(email_lower=username.lower())
+            .order_by(F("tenant").asc(nulls_first=True))[:2]
+        )
+        if len(users) == 1 or (users and users[0].tenant_id is None):
+            return users[0]
+        raise self.model.DoesNotExist
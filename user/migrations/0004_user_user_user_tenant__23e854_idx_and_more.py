@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0003_user_user_type"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["tenant", "created_at"], name="user_user_tenant__23e854_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["tenant", "is_active"], name="user_user_tenant__c7d337_idx"
+            ),
+        ),
+    ]
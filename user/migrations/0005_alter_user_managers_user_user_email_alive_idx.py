@@ -0,0 +1,28 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:02
+
+from django.db import migrations, models
+import user.managers
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0004_user_user_user_tenant__23e854_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", user.managers.UserManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["email"],
+                name="user_email_alive_idx",
+            ),
+        ),
+    ]
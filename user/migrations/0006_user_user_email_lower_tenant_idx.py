@@ -0,0 +1,22 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:19
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0005_alter_user_managers_user_user_email_alive_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                models.F("tenant"),
+                name="user_email_lower_tenant_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("user", "0006_user_user_email_lower_tenant_idx"),
+        ("token_blacklist", "0013_alter_blacklistedtoken_options_and_more"),
+    ]
+
+    operations = [
+        # Lets the token purge walk expired tokens in expires_at order
+        # without scanning the table.
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                "token_outstanding_expires_at_idx "
+                "ON token_blacklist_outstandingtoken (expires_at)"
+            ),
+            reverse_sql=(
+                "DROP INDEX CONCURRENTLY IF EXISTS token_outstanding_expires_at_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-17 19:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0007_token_outstanding_expires_at_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="token_version",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,77 @@
+import django.contrib.auth.validators
+import django.db.models.functions.text
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+def add_unique_index_concurrently(constraint, sql):
+    """
+    Add `constraint`, a unique index in PostgreSQL, with `sql` building it
+    concurrently: writes to the table go on while it's being built.
+    """
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[
+            migrations.RunSQL(
+                sql=sql,
+                reverse_sql=f'DROP INDEX CONCURRENTLY IF EXISTS "{constraint.name}"',
+            ),
+        ],
+        state_operations=[
+            migrations.AddConstraint(model_name="user", constraint=constraint),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction. If a
+    # build fails (e.g. on emails differing only in case), PostgreSQL leaves
+    # an INVALID index behind: drop it before migrating again.
+    atomic = False
+
+    dependencies = [
+        ("user", "0008_user_token_version"),
+    ]
+
+    operations = [
+        add_unique_index_concurrently(
+            models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                models.F("tenant"),
+                name="user_email_lower_tenant_uniq",
+            ),
+            'CREATE UNIQUE INDEX CONCURRENTLY "user_email_lower_tenant_uniq" '
+            'ON "user_user" ((LOWER("email")), "tenant_id")',
+        ),
+        add_unique_index_concurrently(
+            models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("tenant__isnull", True)),
+                name="user_email_lower_no_tenant_uniq",
+            ),
+            'CREATE UNIQUE INDEX CONCURRENTLY "user_email_lower_no_tenant_uniq" '
+            'ON "user_user" ((LOWER("email"))) WHERE "tenant_id" IS NULL',
+        ),
+        # Covered by user_email_lower_tenant_uniq
+        RemoveIndexConcurrently(
+            model_name="user",
+            name="user_email_lower_tenant_idx",
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="email",
+            field=models.EmailField(max_length=254),
+        ),
+        migrations.AlterField(
+            model_name="user",
+            name="username",
+            field=models.CharField(
+                help_text=(
+                    "Required. 150 characters or fewer. "
+                    "Letters, digits and @/./+/-/_ only."
+                ),
+                max_length=150,
+                validators=[django.contrib.auth.validators.UnicodeUsernameValidator()],
+                verbose_name="username",
+            ),
+        ),
+    ]
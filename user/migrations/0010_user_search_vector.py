@@ -0,0 +1,82 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+BATCH_SIZE = 10_000
+
+# Names weigh more than the words of the email/username, which are split on
+# the characters emails are usually split on ("john.doe@acme.com" has the
+# words john, doe, acme and com)
+CREATE_TRIGGER = """
+CREATE FUNCTION user_user_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector(
+            'simple', coalesce(NEW.first_name, '') || ' ' || coalesce(NEW.last_name, '')
+        ), 'A')
+        || setweight(to_tsvector(
+            'simple', translate(NEW.email || ' ' || NEW.username, '@.+_-', '     ')
+        ), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER user_user_search_vector_trigger
+BEFORE INSERT OR UPDATE OF email, username, first_name, last_name ON user_user
+FOR EACH ROW EXECUTE FUNCTION user_user_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS user_user_search_vector_trigger ON user_user;
+DROP FUNCTION IF EXISTS user_user_search_vector_update();
+"""
+
+
+def fill_search_vectors(apps, schema_editor):
+    """
+    Fire the trigger on existing users, one short transaction per batch.
+    Batches follow the ids of the rows (keyset) rather than stepping through
+    the id range, which shards leave mostly empty.
+    """
+    last = 0
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                "UPDATE user_user SET first_name = first_name WHERE id IN ("
+                "SELECT id FROM user_user WHERE id > %s AND search_vector IS NULL "
+                "ORDER BY id LIMIT %s) RETURNING id",
+                [last, BATCH_SIZE],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return
+            last = max(ids)
+
+
+class Migration(migrations.Migration):
+    # Batches and CREATE INDEX CONCURRENTLY run outside of a transaction, so
+    # the table stays writable on large databases
+    atomic = False
+
+    dependencies = [
+        ("user", "0009_user_email_lower_tenant_uniq"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(sql=CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="user_search_vector_idx"
+            ),
+        ),
+    ]
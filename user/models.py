@@ -1,7 +1,16 @@
+from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.translation import gettext_lazy as _
 
+from base.managers import TenantScopedManager
 from base.models import OPTIONAL, BaseModel
+from user.managers import UserManager
 
 
 class User(BaseModel, AbstractUser):
@@ -10,7 +19,17 @@ class User(BaseModel, AbstractUser):
         TENANT_ADMIN = "tenant admin", "Tenant Admin"
         TENANT = "tenant", "Tenant"
 
-    email = models.EmailField(unique=True)
+    # Unique per tenant, ignoring case, see Meta.constraints
+    email = models.EmailField()
+    # Derived from the email, so it's no more unique than the email is
+    username = models.CharField(
+        _("username"),
+        max_length=150,
+        help_text=_(
+            "Required. 150 characters or fewer. Letters, digits and @/./+/-/_ only."
+        ),
+        validators=[UnicodeUsernameValidator()],
+    )
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
     tenant = models.ForeignKey(
@@ -21,6 +40,43 @@ class User(BaseModel, AbstractUser):
         default=UserTypeChoices.TENANT,
         choices=UserTypeChoices.choices,
     )
+    # Embedded in JWTs and bumped whenever a claim or the credentials change,
+    # see user.utils.token_version
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+    explicit_update_fields = ("token_version",)
+    # Names and email words, set by a trigger on insert/update (migration
+    # 0010), searched by base.search.search()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Authentication looks users up across tenants, so the default manager
+    # stays unscoped; use `tenant_objects` for the current tenant's users
+    # and `User.objects.alive()` for live users across tenants.
+    objects = UserManager()
+    tenant_objects = TenantScopedManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["tenant", "created_at"]),
+            models.Index(fields=["tenant", "is_active"]),
+            models.Index(
+                fields=["email"],
+                name="user_email_alive_idx",
+                condition=Q(deleted_at__isnull=True),
+            ),
+            GinIndex(fields=["search_vector"], name="user_search_vector_idx"),
+        ]
+        constraints = [
+            # Also the index of tenant logins, see UserManager.get_for_login()
+            models.UniqueConstraint(
+                Lower("email"), "tenant", name="user_email_lower_tenant_uniq"
+            ),
+            # NULLs are distinct, so users without a tenant need their own
+            models.UniqueConstraint(
+                Lower("email"),
+                condition=Q(tenant__isnull=True),
+                name="user_email_lower_no_tenant_uniq",
+            ),
+        ]
 
     def __str__(self):
         return self.email
@@ -34,3 +90,47 @@ class User(BaseModel, AbstractUser):
             self.email = email
             self.username = email.split("@")[0] if not self.username else self.username
         super().save(*args, **kwargs)
+
+    def check_password(self, raw_password: str) -> bool:
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save_rehashed_password(self.password)
+
+        return check_password(raw_password, self.password, setter)
+
+    def save_rehashed_password(self, encoded: str) -> None:
+        """
+        Store the same password hashed by the preferred hasher. Unlike a
+        password change, it doesn't revoke the user's tokens.
+        """
+        self.password = encoded
+        self._password_rehashed = True
+        self.save(update_fields=["password"])
+
+
+class UserImport(BaseModel):
+    """
+    A bulk import of a tenant's users, run in the background by the
+    `import_users` task from the uploaded `file`.
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    tenant = models.ForeignKey(
+        "tenant.Tenant", on_delete=models.CASCADE, related_name="user_imports"
+    )
+    # Deleted once the import has run
+    file = models.FileField(upload_to="user_imports/", **OPTIONAL)
+    status = models.CharField(
+        max_length=20, choices=StatusChoices.choices, default=StatusChoices.PENDING
+    )
+    # ImportReport.as_dict() once done
+    report = models.JSONField(**OPTIONAL)
+
+    def __str__(self):
+        return f"{self.tenant_id}: {self.status}"
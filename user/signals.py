@@ -0,0 +1,41 @@
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from user.models import User
+from user.utils.token_version import TOKEN_FIELDS, invalidate_token_version
+
+
+@receiver(pre_save, sender=User)
+def remember_token_fields(sender, instance: User, **kwargs) -> None:
+    """Detect changes to the fields embedded in, or securing, issued tokens."""
+    instance._token_fields_changed = False
+    if getattr(instance, "_password_rehashed", False):
+        instance._password_rehashed = False
+        return
+
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not {*TOKEN_FIELDS, "tenant"} & set(update_fields):
+        return
+
+    if instance.pk and not instance._state.adding:
+        stored = (
+            sender._base_manager.using(kwargs["using"])
+            .filter(pk=instance.pk)
+            .values_list(*TOKEN_FIELDS)
+            .first()
+        )
+        current = tuple(getattr(instance, field) for field in TOKEN_FIELDS)
+        instance._token_fields_changed = stored is not None and stored != current
+
+
+@receiver(post_save, sender=User)
+def revoke_issued_tokens(sender, instance: User, using: str, **kwargs) -> None:
+    if not getattr(instance, "_token_fields_changed", False):
+        return
+
+    sender._base_manager.using(using).filter(pk=instance.pk).update(
+        token_version=F("token_version") + 1
+    )
+    instance.token_version += 1
+    invalidate_token_version(instance.pk)
@@ -0,0 +1,25 @@
+from typing import Dict
+
+from celery import shared_task
+
+from auth.utils.blacklist import DatabaseBlacklist
+from user.utils.importer import run_import
+from user.utils.last_login import last_login_recorder
+
+
+@shared_task(ignore_result=True)
+def flush_last_logins() -> int:
+    """Write the `last_login` timestamps buffered in Redis to the database."""
+    return last_login_recorder.flush()
+
+
+@shared_task
+def purge_expired_tokens() -> Dict[str, float]:
+    """Delete expired JWTs from the token_blacklist tables in batches."""
+    return DatabaseBlacklist.purge_expired()
+
+
+@shared_task(ignore_result=True)
+def import_users(import_id: int, using: str) -> None:
+    """Run the `UserImport` with primary key `import_id` on database `using`."""
+    run_import(import_id, using)
@@ -0,0 +1,211 @@
+import io
+import json
+
+import pytest
+from openpyxl import Workbook
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.utils.tokens import RefreshToken
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User, UserImport
+from user.tasks import import_users
+from user.tests.v1.factories import UserFactory
+from user.utils.importer import UserImporter, read_rows
+
+PASSWORD = "Password123!"
+ROWS = [
+    ["email", "password", "first_name", "last_name"],
+    ["Ada@Example.com", PASSWORD, "Ada", "Lovelace"],
+    ["grace@example.com", "", "Grace", "Hopper"],
+    ["not-an-email", PASSWORD, "", ""],
+    ["ada@example.com", PASSWORD, "", ""],
+    ["alan@example.com", "short", "Alan", "Turing"],
+]
+
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory()
+
+
+def csv_file(rows=ROWS):
+    return io.BytesIO("\n".join(",".join(row) for row in rows).encode())
+
+
+def xlsx_file(rows=ROWS):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    file = io.BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+class TestReadRows:
+
+    @pytest.mark.parametrize(
+        "name, file", [("users.csv", csv_file), ("users.xlsx", xlsx_file)]
+    )
+    def test_rows_are_keyed_by_header(self, name, file):
+        rows = list(read_rows(file([["Email", "First_Name"], ["a@b.co", "A"]]), name))
+
+        assert rows == [{"email": "a@b.co", "first_name": "A"}]
+
+
+@pytest.mark.django_db
+class TestUserImporter:
+
+    def test_import(self, tenant):
+        report = UserImporter(tenant, batch_size=2, workers=0).run(
+            read_rows(csv_file(), "users.csv")
+        )
+
+        assert (report.created, report.skipped) == (2, 0)
+        assert [error.row for error in report.errors] == [4, 5, 6]
+        assert report.errors[1].errors == ["Duplicate email in this file."]
+        ada = User.objects.get(email="ada@example.com")
+        assert (ada.tenant, ada.username, ada.first_name) == (tenant, "ada", "Ada")
+        assert ada.check_password(PASSWORD)
+        assert not User.objects.get(email="grace@example.com").has_usable_password()
+
+    def test_existing_emails_are_skipped(self, tenant):
+        existing = UserFactory(tenant=tenant, email="grace@example.com")
+
+        report = UserImporter(tenant, workers=0).run(read_rows(csv_file(), "users.csv"))
+
+        assert (report.created, report.skipped) == (1, 1)
+        assert User.objects.get(pk=existing.pk).first_name == existing.first_name
+
+    def test_users_created_meanwhile_are_skipped(self, tenant, monkeypatch):
+        importer = UserImporter(tenant, workers=0)
+        hash_passwords = importer._hash
+
+        def hash_while_ada_registers(passwords, executor):
+            UserFactory(tenant=tenant, email="ADA@example.com")
+            return hash_passwords(passwords, executor)
+
+        monkeypatch.setattr(importer, "_hash", hash_while_ada_registers)
+        report = importer.run(read_rows(csv_file(), "users.csv"))
+
+        assert (report.created, report.skipped) == (1, 1)
+
+    def test_process_pool(self, tenant, settings):
+        # Spawned workers load the configured settings, not this test's
+        settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+        report = UserImporter(tenant, workers=1).run(
+            read_rows(xlsx_file(), "users.xlsx")
+        )
+
+        assert report.created == 2
+        assert User.objects.get(email="ada@example.com").check_password(PASSWORD)
+
+    def test_command(self, tenant, tmp_path):
+        source = tmp_path / "users.csv"
+        source.write_bytes(csv_file().getvalue())
+        output = tmp_path / "report.json"
+
+        call_command(
+            "import_users",
+            tenant.subdomain,
+            str(source),
+            "--workers=0",
+            f"--report={output}",
+            stderr=io.StringIO(),
+            stdout=io.StringIO(),
+        )
+
+        report = json.loads(output.read_text())
+        assert (report["created"], report["failed"]) == (2, 3)
+
+
+@pytest.mark.django_db
+class TestImportUsersView:
+
+    @pytest.fixture(autouse=True)
+    def storage(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        }
+
+    @pytest.fixture
+    def queued(self, monkeypatch):
+        queued = []
+        monkeypatch.setattr(
+            import_users, "delay", lambda *args: queued.append(args), raising=False
+        )
+        return queued
+
+    @staticmethod
+    def client(tenant, user):
+        client = APIClient()
+        access = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        client.defaults["HTTP_HOST"] = f"{tenant.subdomain}.localhost"
+        return client
+
+    def post(self, tenant, user, file):
+        return self.client(tenant, user).post(
+            reverse("import-users"),
+            {"file": SimpleUploadedFile("users.csv", file.getvalue())},
+            format="multipart",
+        )
+
+    def test_tenant_admin_imports(
+        self, tenant, settings, queued, django_capture_on_commit_callbacks
+    ):
+        settings.USER_IMPORT_WORKERS = 0
+        admin = UserFactory(tenant=tenant, user_type=User.UserTypeChoices.TENANT_ADMIN)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.post(tenant, admin, csv_file())
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data["status"] == UserImport.StatusChoices.PENDING
+        assert response["Location"] == response.data["url"]
+        assert not User.objects.filter(email="ada@example.com").exists()
+
+        assert queued == [(response.data["id"], "default")]
+        import_users(*queued[0])
+
+        response = self.client(tenant, admin).get(response["Location"])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == UserImport.StatusChoices.DONE
+        report = response.data["report"]
+        assert (report["created"], report["failed"]) == (2, 3)
+        assert User.objects.get(email="ada@example.com").created_by == admin
+        assert not UserImport.objects.get().file
+
+    def test_other_tenants_admin_is_forbidden(self, tenant, queued):
+        admin = UserFactory(
+            tenant=TenantFactory(), user_type=User.UserTypeChoices.TENANT_ADMIN
+        )
+
+        response = self.post(tenant, admin, csv_file())
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert queued == []
+
+    def test_imports_of_other_tenants_are_not_found(self, tenant):
+        other = TenantFactory()
+        user_import = UserImport.objects.create(tenant=other)
+        admin = UserFactory(tenant=tenant, user_type=User.UserTypeChoices.TENANT_ADMIN)
+
+        response = self.client(tenant, admin).get(
+            reverse("user-import", args=[user_import.pk])
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,107 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+from django.utils import timezone
+
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+from user.utils.last_login import FLUSHED_AT_KEY, LastLoginRecorder, last_login_recorder
+
+
+@pytest.fixture
+def redis_cache(redis_cache):
+    # A buffer that was just flushed
+    redis_cache.set(FLUSHED_AT_KEY, time.time())
+    return redis_cache
+
+
+@pytest.fixture
+def user():
+    return UserFactory(tenant=TenantFactory())
+
+
+def stored_last_login(user):
+    return User.objects.values_list("last_login", flat=True).get(pk=user.pk)
+
+
+@pytest.mark.django_db
+class TestSynchronousFallback:
+
+    def test_without_redis_last_login_is_saved(self, user):
+        # Tests use the local memory cache, which has no Redis connection
+        last_login_recorder.record(user)
+
+        assert stored_last_login(user) == user.last_login
+
+    def test_unreachable_redis_falls_back(self, settings, user):
+        settings.CACHES = {
+            **settings.CACHES,
+            "unreachable": {
+                "BACKEND": "django_redis.cache.RedisCache",
+                "LOCATION": "redis://localhost:1/0",
+            },
+        }
+
+        LastLoginRecorder("unreachable").record(user)
+
+        assert stored_last_login(user) == user.last_login
+
+
+@pytest.mark.django_db
+class TestBufferedLastLogin:
+
+    def test_login_is_buffered(self, redis_cache, user, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            last_login_recorder.record(user)
+
+        assert stored_last_login(user) is None
+
+    def test_flush_writes_in_bulk(self, redis_cache, django_assert_max_num_queries):
+        tenants = TenantFactory.create_batch(2)
+        users = [UserFactory(tenant=tenant) for tenant in tenants for _ in range(3)]
+        users.append(UserFactory(tenant=None))
+        for user in users:
+            last_login_recorder.record(user)
+
+        # One bulk UPDATE per buffer and tenant lookups
+        with django_assert_max_num_queries(len(tenants) * 2 + 1):
+            assert last_login_recorder.flush() == len(users)
+
+        for user in users:
+            assert stored_last_login(user) == user.last_login
+        assert last_login_recorder.flush() == 0
+
+    def test_latest_login_wins(self, redis_cache, user):
+        earlier = timezone.now() - timedelta(hours=1)
+        last_login_recorder.record(user, when=earlier)
+        last_login_recorder.record(user)
+
+        last_login_recorder.flush()
+
+        assert stored_last_login(user) == user.last_login
+
+    def test_stale_buffer_writes_through(self, redis_cache, settings, user):
+        redis_cache.set(
+            FLUSHED_AT_KEY, time.time() - settings.LAST_LOGIN_MAX_STALENESS - 1
+        )
+
+        last_login_recorder.record(user)
+
+        assert stored_last_login(user) == user.last_login
+
+    def test_failed_flush_keeps_the_buffer(self, redis_cache, user, monkeypatch):
+        last_login_recorder.record(user)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("database down")
+
+        monkeypatch.setattr(last_login_recorder, "_write", fail)
+        with pytest.raises(RuntimeError):
+            last_login_recorder.flush()
+        monkeypatch.undo()
+
+        assert last_login_recorder.flush() == 1
+        assert stored_last_login(user) == user.last_login
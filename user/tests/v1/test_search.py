@@ -0,0 +1,127 @@
+import pytest
+
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from auth.utils.tokens import RefreshToken
+from base.search import search
+from tenant.models import Tenant
+from tenant.tests.v1.factories import TenantFactory
+from user.models import User
+from user.tests.v1.factories import UserFactory
+
+
+@pytest.fixture
+def tenant():
+    return TenantFactory()
+
+
+@pytest.fixture
+def ada(tenant):
+    return UserFactory(
+        email="ada.lovelace@example.com",
+        first_name="Ada",
+        last_name="Lovelace",
+        tenant=tenant,
+    )
+
+
+@pytest.fixture
+def grace(tenant):
+    return UserFactory(
+        email="grace@navy.mil", first_name="Grace", last_name="Hopper", tenant=tenant
+    )
+
+
+def found(term, queryset=None):
+    return list(search(queryset or User.objects.all(), term))
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    @pytest.mark.parametrize("term", ["ada", "Love", "ada lov", "lovelace@ex"])
+    def test_matches_word_prefixes(self, ada, grace, term):
+        assert found(term) == [ada]
+
+    def test_no_words_match_nothing(self, ada):
+        assert found(" .-@ ") == []
+
+    def test_vector_follows_updates(self, ada):
+        ada.last_name = "King"
+        ada.save()
+
+        assert found("king") == [ada]
+        assert found("lovelace") == [ada]  # Still in the email
+
+        User.objects.filter(pk=ada.pk).update(
+            email="countess@example.com", username="countess"
+        )
+        assert found("lovelace") == []
+
+    def test_names_rank_above_email_words(self, tenant):
+        mil = UserFactory(
+            email="bob@mil.org", first_name="Bob", last_name="", tenant=tenant
+        )
+        milton = UserFactory(
+            email="mf@example.com", first_name="Milton", last_name="", tenant=tenant
+        )
+
+        assert found("mil") == [milton, mil]
+
+    def test_tenants(self):
+        acme = TenantFactory(name="Acme Corporation", subdomain="acme-corp")
+        TenantFactory(name="Globex", subdomain="globex")
+
+        assert found("corp", Tenant.objects.all()) == [acme]
+        assert found("acme corp", Tenant.objects.all()) == [acme]
+
+
+@pytest.mark.django_db
+class TestSearchUsersView:
+
+    def get(self, tenant, user, **params):
+        client = APIClient()
+        access = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client.get(
+            reverse("search-users"), params, HTTP_HOST=f"{tenant.subdomain}.localhost"
+        )
+
+    def test_searches_live_users_of_the_tenant(self, tenant, ada, grace):
+        UserFactory(first_name="Ada", tenant=TenantFactory())
+        UserFactory(first_name="Ada", tenant=tenant).delete()
+
+        response = self.get(tenant, grace, q="ada")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["id"] for user in response.data["results"]] == [ada.pk]
+
+    def test_users_of_other_tenants_are_forbidden(self, tenant, ada):
+        outsider = UserFactory(tenant=TenantFactory())
+
+        response = self.get(tenant, outsider, q="ada")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_requires_a_term(self, tenant, ada):
+        response = self.get(tenant, ada, q=" ")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == {"q": ["This field is required."]}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "changelist, term", [("user_user", "lovelace"), ("tenant_tenant", "acme")]
+)
+def test_admin_search(client, ada, changelist, term):
+    TenantFactory(name="Acme")
+    client.force_login(UserFactory.create_superuser())
+
+    response = client.get(reverse(f"admin:{changelist}_changelist"), {"q": term})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.context["cl"].result_list) == 1
@@ -1,6 +1,10 @@
 import pytest
 
+from django.db import IntegrityError
+
+from tenant.tests.v1.factories import TenantFactory
 from user.models import User
+from user.tests.v1.factories import UserFactory
 
 
 @pytest.mark.django_db
@@ -64,3 +68,49 @@ class TestUserModel:
             assert not user.has_usable_password()
         else:
             assert user.check_password(password)
+
+
+@pytest.mark.django_db
+class TestUserEmail:
+
+    def test_same_email_in_two_tenants(self):
+        first = UserFactory(email="jane@example.com", tenant=TenantFactory())
+        second = UserFactory(email="jane@example.com", tenant=TenantFactory())
+
+        assert first.username == second.username == "jane"
+
+    @pytest.mark.parametrize("tenant", [TenantFactory, lambda: None])
+    def test_email_is_unique_per_tenant_ignoring_case(self, tenant):
+        tenant = tenant()
+        UserFactory(email="jane@example.com", tenant=tenant)
+        user = UserFactory.build(email="Jane@Example.com", tenant=tenant)
+
+        # bulk_create() bypasses the lowercasing of save()
+        with pytest.raises(IntegrityError):
+            User.objects.bulk_create([user])
+
+    def test_get_for_login(self, django_assert_num_queries):
+        tenant = TenantFactory()
+        user = UserFactory(email="jane@example.com", tenant=tenant)
+        UserFactory(email="jane@example.com", tenant=TenantFactory())
+
+        with django_assert_num_queries(1):
+            assert User.objects.get_for_login(tenant, "JANE@example.com") == user
+
+        user.delete()
+        with pytest.raises(User.DoesNotExist):
+            User.objects.get_for_login(tenant, user.email)
+
+    def test_get_by_natural_key_prefers_the_platform_user(self):
+        UserFactory(email="jane@example.com", tenant=TenantFactory())
+        platform_user = UserFactory(email="jane@example.com")
+
+        assert User.objects.get_by_natural_key("Jane@example.com") == platform_user
+
+    def test_get_by_natural_key_rejects_ambiguous_emails(self):
+        user = UserFactory(email="jane@example.com", tenant=TenantFactory())
+        assert User.objects.get_by_natural_key(user.email) == user
+
+        UserFactory(email="jane@example.com", tenant=TenantFactory())
+        with pytest.raises(User.DoesNotExist):
+            User.objects.get_by_natural_key(user.email)
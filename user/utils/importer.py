@@ -0,0 +1,278 @@
+import csv
+import io
+import itertools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import load_workbook
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db.models.functions import Lower
+
+from rest_framework.exceptions import ValidationError
+
+from auth.utils.validator import password_validator
+from tenant.models import Tenant
+from tenant.utils.shards import get_shard
+from user.models import User, UserImport
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("email", "password", "first_name", "last_name")
+# Row numbers in reports count the header as row 1, like spreadsheets do
+FIRST_ROW = 2
+
+
+@dataclass
+class RowError:
+    row: int
+    email: str
+    errors: List[str]
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    skipped: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def add_error(self, row: int, email: str, *errors: str) -> None:
+        self.errors.append(RowError(row, email, list(errors)))
+
+    def as_dict(self) -> Dict:
+        return {
+            "created": self.created,
+            "skipped": self.skipped,
+            "failed": len(self.errors),
+            "errors": [error.__dict__ for error in self.errors],
+        }
+
+
+def read_rows(file: IO, name: str) -> Iterator[Dict[str, str]]:
+    """
+    Stream the rows of a CSV or XLSX (by `name`'s extension) file as dicts
+    keyed by the lowercased header. Nothing but the current row is held in
+    memory.
+    """
+    if name.lower().endswith(".xlsx"):
+        yield from _read_xlsx(file)
+    else:
+        yield from _read_csv(file)
+
+
+def _read_csv(file: IO) -> Iterator[Dict[str, str]]:
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(file)
+    header = [column.strip().lower() for column in next(reader, [])]
+    for values in reader:
+        yield dict(zip(header, (value.strip() for value in values)))
+
+
+def _read_xlsx(file: IO) -> Iterator[Dict[str, str]]:
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value or "").strip().lower() for value in next(rows, ())]
+        for values in rows:
+            yield dict(
+                zip(
+                    header,
+                    ("" if value is None else str(value).strip() for value in values),
+                )
+            )
+    finally:
+        workbook.close()
+
+
+class UserImporter:
+    """
+    Create the users of `tenant` from rows with the `COLUMNS` fields.
+
+    Rows are processed in chunks of `batch_size`: validated (email format,
+    duplicates, `password_validator`), hashed in a pool of `workers`
+    processes, then inserted with one `bulk_create(ignore_conflicts=True)`
+    on the tenant's shard. Emails the tenant already has (ignoring case)
+    are skipped rather than failing the chunk; invalid rows end up in the report's errors.
+    Rows without a password get an unusable one (set it by resetting it).
+
+    `bulk_create` bypasses `User.save()` and signals; the importer applies
+    what `save()` does (lowercase email, username from the email).
+    """
+
+    def __init__(
+        self,
+        tenant: Tenant,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        created_by: Optional[User] = None,
+    ):
+        self.tenant = tenant
+        self.batch_size = batch_size or settings.USER_IMPORT_BATCH_SIZE
+        self.workers = settings.USER_IMPORT_WORKERS if workers is None else workers
+        self.created_by = created_by
+        self.database = get_shard(tenant)
+
+    def run(self, rows: Iterable[Dict[str, str]]) -> ImportReport:
+        report = ImportReport()
+        seen = set()
+        numbered = enumerate(rows, start=FIRST_ROW)
+        with self._executor() as executor:
+            while chunk := list(itertools.islice(numbered, self.batch_size)):
+                self._import_chunk(chunk, seen, executor, report)
+                logger.info(
+                    "Imported users into tenant %s: %d created, %d skipped, %d failed.",
+                    self.tenant.pk,
+                    report.created,
+                    report.skipped,
+                    len(report.errors),
+                )
+        return report
+
+    @contextmanager
+    def _executor(self) -> Iterator[Optional[Executor]]:
+        if self.workers < 1:
+            yield None
+            return
+
+        # Spawned rather than forked: forking a process with threads (web or
+        # Celery workers, database connections) can copy held locks. Spawned
+        # workers start without a configured Django, and can't import this
+        # module (it imports models) until it is.
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            yield executor
+
+    def _import_chunk(
+        self,
+        chunk: List[Tuple[int, Dict[str, str]]],
+        seen: set,
+        executor: Optional[Executor],
+        report: ImportReport,
+    ) -> None:
+        valid = []
+        for number, row in chunk:
+            email = row.get("email", "").lower()
+            errors = self._validate(row, email, seen)
+            if errors:
+                report.add_error(number, email, *errors)
+            else:
+                seen.add(email)
+                valid.append(row | {"email": email})
+
+        existing = self._existing([row["email"] for row in valid])
+        new = [row for row in valid if row["email"] not in existing]
+        report.skipped += len(valid) - len(new)
+        if not new:
+            return
+
+        passwords = self._hash([row.get("password") or None for row in new], executor)
+        users = [
+            User(
+                email=row["email"],
+                username=row["email"].split("@")[0],
+                password=password,
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+                tenant=self.tenant,
+                created_by=self._created_by(),
+            )
+            for row, password in zip(new, passwords)
+        ]
+        emails = [user.email for user in users]
+        # Hashing takes a while: look again for users created concurrently by
+        # someone else, which `ignore_conflicts` silently skips
+        before = self._existing(emails)
+        User._base_manager.db_manager(self.database).bulk_create(
+            users, ignore_conflicts=True
+        )
+        created = len(self._existing(emails) - before)
+        report.created += created
+        report.skipped += len(users) - created
+
+    def _existing(self, emails: List[str]) -> set:
+        """Return which of the lowercase `emails` the tenant already has."""
+        return set(
+            User._base_manager.using(self.database)
+            .annotate(email_lower=Lower("email"))
+            .filter(email_lower__in=emails, tenant=self.tenant)
+            .values_list("email_lower", flat=True)
+        )
+
+    @staticmethod
+    def _validate(row: Dict[str, str], email: str, seen: set) -> List[str]:
+        try:
+            validate_email(email)
+        except DjangoValidationError as exc:
+            return list(exc.messages)
+        if email in seen:
+            return ["Duplicate email in this file."]
+
+        password = row.get("password")
+        if password:
+            try:
+                password_validator(password)
+            except ValidationError as exc:
+                return [str(message) for message in exc.detail]
+        return []
+
+    @staticmethod
+    def _hash(
+        passwords: List[Optional[str]], executor: Optional[Executor]
+    ) -> List[str]:
+        if executor is None:
+            return [make_password(password) for password in passwords]
+        # Unusable passwords need no hashing
+        hashed = iter(executor.map(make_password, filter(None, passwords)))
+        return [
+            next(hashed) if password else make_password(None) for password in passwords
+        ]
+
+    def _created_by(self) -> Optional[User]:
+        # Audit columns may only point at users on the same shard
+        by = self.created_by
+        if by is not None and by.tenant_id == self.tenant.pk:
+            return User(pk=by.pk)
+        return None
+
+
+def run_import(import_id: int, using: str) -> None:
+    """
+    Run the pending `UserImport` `import_id` stored on database `using`:
+    import its file, store the report and delete the file.
+    """
+    user_import = (
+        UserImport._base_manager.using(using)
+        .select_related("tenant", "created_by")
+        .get(pk=import_id)
+    )
+    if user_import.status != UserImport.StatusChoices.PENDING:
+        return
+
+    user_import.status = UserImport.StatusChoices.RUNNING
+    user_import.save(update_fields=["status", "updated_at"])
+    try:
+        with user_import.file.open("rb") as file:
+            report = UserImporter(
+                user_import.tenant, created_by=user_import.created_by
+            ).run(read_rows(file, user_import.file.name))
+    except Exception:
+        user_import.status = UserImport.StatusChoices.FAILED
+        user_import.save(update_fields=["status", "updated_at"])
+        raise
+
+    user_import.status = UserImport.StatusChoices.DONE
+    user_import.report = report.as_dict()
+    user_import.file.delete(save=False)
+    user_import.save(update_fields=["status", "report", "file", "updated_at"])
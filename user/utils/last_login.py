@@ -0,0 +1,129 @@
+import logging
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Dict, Optional
+
+from django_redis import get_redis_connection
+
+from django.conf import settings
+from django.utils import timezone
+
+from tenant.utils.shards import get_shard_for_id
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "user:last_login"
+TENANTS_KEY = f"{KEY_PREFIX}:tenants"
+FLUSHED_AT_KEY = f"{KEY_PREFIX}:flushed_at"
+# Buffer of users without a tenant (platform admins)
+NO_TENANT = "none"
+
+
+class LastLoginRecorder:
+    """
+    Record `last_login` in Redis instead of issuing an UPDATE per login.
+
+    Each login sets `user id → timestamp` in a hash per tenant
+    (`user:last_login:<tenant id>`); the `flush_last_logins` beat task
+    writes them to the database with `bulk_update` every
+    `LAST_LOGIN_FLUSH_INTERVAL` seconds.
+
+    Logins write `last_login` directly, as before, when Redis isn't
+    available or the buffer hasn't been flushed for
+    `LAST_LOGIN_MAX_STALENESS` seconds (e.g. beat isn't running), so a
+    timestamp is never older than that bound.
+    """
+
+    def __init__(self, cache_alias: str = "default"):
+        self.cache_alias = cache_alias
+
+    @property
+    def client(self):
+        # Raises NotImplementedError for caches other than django_redis
+        return get_redis_connection(self.cache_alias)
+
+    @staticmethod
+    def buffer_key(tenant: str) -> str:
+        return f"{KEY_PREFIX}:{tenant}"
+
+    def record(self, user: User, when: Optional[datetime] = None) -> None:
+        """Record that `user` logged in `when` (now by default)."""
+        user.last_login = when or timezone.now()
+        try:
+            buffered = self._buffer(user)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to buffer last_login, saving it.", exc_info=True)
+            buffered = False
+
+        if not buffered:
+            user.save(update_fields=["last_login"])
+
+    def flush(self, batch_size: Optional[int] = None) -> int:
+        """Write every buffered timestamp to the database; return the count."""
+        batch_size = batch_size or settings.LAST_LOGIN_FLUSH_BATCH_SIZE
+        client = self.client
+        flushed = 0
+        for member in client.smembers(TENANTS_KEY):
+            tenant = member.decode()
+            key = self.buffer_key(tenant)
+            # Take the whole hash atomically; logins arriving meanwhile start
+            # a new one.
+            with client.pipeline() as pipe:
+                pipe.hgetall(key).delete(key).srem(TENANTS_KEY, tenant)
+                entries, *_ = pipe.execute()
+
+            try:
+                flushed += self._write(tenant, entries, batch_size)
+            except Exception:
+                self._restore(client, tenant, entries)
+                raise
+
+        client.set(FLUSHED_AT_KEY, time.time())
+        return flushed
+
+    def _buffer(self, user: User) -> bool:
+        tenant = str(user.tenant_id or NO_TENANT)
+        with self.client.pipeline(transaction=False) as pipe:
+            pipe.hset(self.buffer_key(tenant), user.pk, user.last_login.timestamp())
+            pipe.sadd(TENANTS_KEY, tenant)
+            pipe.get(FLUSHED_AT_KEY)
+            *_, flushed_at = pipe.execute()
+
+        # Without recent flushes the buffer would only grow stale
+        if flushed_at is None:
+            return False
+        return time.time() - float(flushed_at) <= settings.LAST_LOGIN_MAX_STALENESS
+
+    def _write(self, tenant: str, entries: Dict[bytes, bytes], batch_size: int) -> int:
+        users = [
+            User(
+                pk=int(pk),
+                last_login=datetime.fromtimestamp(float(value), tz=dt_timezone.utc),
+            )
+            for pk, value in entries.items()
+        ]
+        if not users:
+            return 0
+
+        User._base_manager.db_manager(self._get_database(tenant)).bulk_update(
+            users, ["last_login"], batch_size=batch_size
+        )
+        return len(users)
+
+    @staticmethod
+    def _get_database(tenant: str) -> str:
+        return get_shard_for_id(None if tenant == NO_TENANT else int(tenant))
+
+    def _restore(self, client, tenant: str, entries: Dict[bytes, bytes]) -> None:
+        # Put the batch back for the next flush without overwriting newer logins
+        key = self.buffer_key(tenant)
+        with client.pipeline(transaction=False) as pipe:
+            for pk, value in entries.items():
+                pipe.hsetnx(key, pk, value)
+            pipe.sadd(TENANTS_KEY, tenant)
+            pipe.execute()
+
+
+last_login_recorder = LastLoginRecorder()
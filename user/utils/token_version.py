@@ -0,0 +1,123 @@
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from tenant.models import Tenant
+from tenant.utils.resolver import tenant_resolver
+from tenant.utils.shards import get_shard_for_id
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "user:token_version"
+# Changing any of these invalidates the tokens issued so far
+TOKEN_FIELDS = (
+    "password",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "user_type",
+    "tenant_id",
+    "deleted_at",
+)
+# Cached for users that don't exist or can't log in anymore
+REVOKED = -1
+
+
+def cache_key(user_id) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+def get_token_version(user_id, tenant_id: Optional[int] = None) -> Optional[int]:
+    """
+    Return the current `token_version` of a user who may still use their
+    tokens, or None if the user was deleted or deactivated.
+
+    Versions are cached in `CACHES["default"]` for
+    `TOKEN_VERSION_CACHE_TIMEOUT` seconds and read from the primary of the
+    user's shard on a miss.
+    """
+    cache = caches["default"]
+    key = cache_key(user_id)
+    try:
+        version = cache.get(key)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("Unable to read the token version.", exc_info=True)
+        return _load(user_id, tenant_id)
+
+    if version is None:
+        version = _load(user_id, tenant_id)
+        try:
+            cache.set(
+                key,
+                REVOKED if version is None else version,
+                timeout=settings.TOKEN_VERSION_CACHE_TIMEOUT,
+            )
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to cache the token version.", exc_info=True)
+    return None if version == REVOKED else version
+
+
+def invalidate_token_version(user_id) -> None:
+    """
+    Forget the cached version now and again once the transaction commits,
+    so a request that cached the old version in between is corrected.
+    """
+    key = cache_key(user_id)
+
+    def invalidate():
+        try:
+            caches["default"].delete(key)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("Unable to invalidate the token version.", exc_info=True)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def get_tenant_token_version(tenant_id) -> Optional[int]:
+    """
+    Return the `token_version` of a tenant, or None if it was deleted.
+
+    Read from the tenant resolver's snapshot, so it's usually free; a bump
+    reaches other workers once their `TENANT_LOCAL_CACHE_TTL` expires.
+    """
+    snapshot = tenant_resolver.resolve_id(tenant_id)
+    return snapshot.token_version if snapshot is not None else None
+
+
+def revoke_user_tokens(user: User) -> None:
+    """Revoke every token issued to `user` ("log out everywhere")."""
+    User._base_manager.using(get_shard_for_id(user.tenant_id)).filter(
+        pk=user.pk
+    ).update(token_version=F("token_version") + 1)
+    invalidate_token_version(user.pk)
+
+
+def revoke_tenant_tokens(tenant: Tenant) -> None:
+    """
+    Revoke every token issued to the users of `tenant`, with one UPDATE of
+    the tenant rather than one per user or session.
+    """
+    Tenant._base_manager.using(DEFAULT_DB_ALIAS).filter(pk=tenant.pk).update(
+        token_version=F("token_version") + 1
+    )
+
+    def invalidate():
+        tenant_resolver.invalidate(subdomains=[tenant.subdomain], ids=[tenant.pk])
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def _load(user_id, tenant_id: Optional[int]) -> Optional[int]:
+    return (
+        User._base_manager.using(get_shard_for_id(tenant_id))
+        .filter(pk=user_id, is_active=True, deleted_at__isnull=True)
+        .values_list("token_version", flat=True)
+        .first()
+    )